@@ -1,12 +1,54 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date, timedelta
+from datetime import date
+import os
+import tempfile
 from github import Github
-import io
+
+from safety_core import SPECIAL_EDU_OPTIONS, ROLES, HEALTH_PHASES, sanitize_config_df, build_main_frame, dday_status, health_status, refresh_main_frame, FrameCache, frame_fingerprint, apply_editor_delta
+from safety_core import compact_roster, to_editor, memory_report, RosterIndex, select_labels
+from safety_core import PAGE_SIZES, page_window, iter_upload_chunks, upsert_roster, DeptRules
+from safety_core import SITES_ROOT_ENV, SiteShards, parse_sources
+from safety_core import active_mask, manager_mask, waste_mask, hire_year_mask, special_edu_mask, health_mask, dashboard_counts
+from safety_core import RunTrace, append_jsonl
+from safety_core import DUE_SOON_DAYS, REPORT_KINDS, DueIndex, upcoming_deadlines, deadline_calendar
+from safety_core import DATA_FILE, CONFIG_FILE, BlobCache, roster_files, commit_files, snapshot_available, blob_sha, config_to_csv, list_blob_shas
+from safety_core import StaleBaseError, load_roster_journaled, RosterStore, ConflictError, WriteBehindSaver
+from safety_core import export_sheets, write_xlsx, write_csv
+from safety_core import SmtpNotifier, StatusMaterializer
+from safety_core import TREND_METRICS, GithubHistory, TrendCache, compliance_trend, trend_rates
 
 # --- [1. 시스템 설정] ---
 st.set_page_config(page_title="안전보건 대시보드 Pro", layout="wide", page_icon="🛡️", initial_sidebar_state="expanded")
 
+# 재실행 한 번의 단계별 시간/메모리 기록. 사이드바 '성능 디버그'에서 보고, 원하면 JSONL 로 남김
+TRACE_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "trace.jsonl")
+# 다중 사업장 모드에서 읽을 수 있는 로컬 사업장 폴더의 상위 폴더 (이 밖의 경로는 거부)
+SITES_ROOT = os.environ.get(SITES_ROOT_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), "sites")
+def start_trace():
+    run = RunTrace(trigger=st.session_state.pop('_rerun_trigger', None))
+    counts = st.session_state.setdefault('_rerun_counts', {})
+    counts[run.trigger] = counts.get(run.trigger, 0) + 1
+    return run
+
+trace = start_trace()
+partial_run = False     # 탭 fragment 만 다시 실행 중인지
+rerun_counts = st.session_state['_rerun_counts']
+trace.mark("setup")
+
+def finish_trace(interrupted_by=None):
+    record = trace.finish(interrupted_by)
+    if st.session_state.get('trace_log'): append_jsonl(TRACE_LOG, record)
+    return record
+
+# 폼/버튼 처리 후 재실행. 다음 실행의 기록에 어떤 폼/버튼 때문인지 남김
+# 탭 폼은 scope="fragment" 로 그 탭만 다시 실행한다. 전체 실행 중이거나 사이드바 명부 편집기가 열려 있으면 전체를 다시 그린다
+def rerun(trigger, scope="app"):
+    st.session_state._interrupted_trace = finish_trace(trigger)
+    st.session_state._rerun_trigger = trigger
+    if scope == "fragment" and (not partial_run or st.session_state.get('roster_edit_open')): scope = "app"
+    st.rerun(scope=scope)
+
 st.markdown("""
 <style>
     div[data-testid="stMetricValue"] {font-size: 24px; font-weight: bold; color: #31333F;}
@@ -25,60 +67,127 @@ st.markdown("---")
 # ==========================================
 # [0. 초기 설정 및 공통 함수]
 # ==========================================
-SPECIAL_EDU_OPTIONS = [
-    "해당없음",
-    "4. 폭발성·물반응성·자기반응성·자기발열성 물질, 자연발화성 액체·고체 및 인화성 액체의 제조 또는 취급작업",
-    "35. 허가 및 관리 대상 유해물질의 제조 또는 취급작업"
-]
-ROLES = ["안전보건관리책임자", "관리감독자", "폐기물담당자", "일반근로자"]
-HEALTH_PHASES = ["배치전(미실시)", "1차검진 완료(다음:6개월)", "정기검진(다음:1년)"]
-
-def sanitize_config_df(df):
-    target_cols = ['특별교육과목1', '특별교육과목2']
-    for col in target_cols:
-        if col not in df.columns: df[col] = "해당없음"
-    for col in target_cols:
-        df[col] = df[col].astype(str).str.strip()
-        df[col] = df[col].apply(lambda x: x if x in SPECIAL_EDU_OPTIONS else "해당없음")
-    if '담당관리감독자' not in df.columns: df['담당관리감독자'] = ""
-    else: df['담당관리감독자'] = df['담당관리감독자'].fillna("")
-    if '유해인자' not in df.columns: df['유해인자'] = "없음"
-    else: df['유해인자'] = df['유해인자'].fillna("없음")
-    return df
-
-def add_days(d, days):
-    try: 
-        if pd.isna(d) or str(d) == "NaT" or str(d).strip() == "": return None
-        d = pd.to_datetime(d)
-        return d + timedelta(days=days)
-    except: return None
-
-def calculate_job_training_date(row):
-    last_date = row.get('최근_직무교육일')
-    if pd.isna(last_date) or str(last_date) == 'NaT' or str(last_date).strip() == "": return None
-    try: last_date = pd.to_datetime(last_date)
-    except: return None
-    role = str(row.get('직책', '')).replace(" ", "").strip()
-    try:
-        if '책임자' in role: return last_date + timedelta(days=730)
-        elif '폐기물' in role: return last_date + timedelta(days=1095)
-        elif '감독자' in role: return last_date + timedelta(days=365)
-        else: return None
-    except: return None
-
-def get_dday_status(target_date):
-    if pd.isna(target_date) or str(target_date) == 'NaT' or str(target_date).strip() == "": return "-"
-    try:
-        target_ts = pd.to_datetime(target_date)
-        today_ts = pd.Timestamp(date.today())
-        diff = (target_ts - today_ts).days
-        if diff < 0: return "🔴 초과"
-        elif diff < 30: return "🟡 임박"
-        else: return "🟢 양호"
-    except: return "-"
-
-# 1. 근로자 명부 초기화 (df_final)
-if 'df_final' not in st.session_state:
+# GitHub 클라이언트/저장소 핸들과 파싱된 파일은 프로세스 단위로 재사용
+@st.cache_resource(show_spinner=False)
+def open_github_repo(token, repo_name):
+    return Github(token).get_repo(repo_name)
+
+@st.cache_resource(show_spinner=False)
+def github_login(token):
+    try: return Github(token).get_user().login
+    except Exception: return None
+
+@st.cache_resource(show_spinner=False)
+def github_blob_cache():
+    return BlobCache(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "github"))
+
+# 레포별 커밋 이력 집계. 처리한 커밋과 집계는 파일로도 남아 다시 띄워도 새 커밋만 계산
+@st.cache_resource(show_spinner=False)
+def trend_cache(repo_name):
+    return TrendCache(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "trends", repo_name.replace("/", "__")))
+
+# 프로세스의 모든 세션이 함께 읽는 명부 저장소 (저장소 이름별로 하나: 기본 "local", 불러온 뒤에는 레포 이름)
+# 세션은 버전이 붙은 스냅숏을 그대로 읽고, 고치기 시작할 때만 사본을 만들어 보류 변경(_pending)을 쌓는다
+@st.cache_resource(show_spinner=False)
+def roster_store(name):
+    return RosterStore(name)
+
+def get_store():
+    return roster_store(st.session_state.get('_store_name', "local"))
+
+# 하루 한 번(그리고 공유 명부가 바뀔 때마다) 근로자×의무 상태표를 미리 계산하는 백그라운드 작업. 저장소마다 하나
+# SAFETY_SMTP_HOST 가 설정돼 있으면 새로 임박/초과가 된 대상자를 메일로 알림
+@st.cache_resource(show_spinner=False)
+def status_job(name):
+    store = roster_store(name)
+    def source(day):
+        version, roster, config = store.snapshot()
+        key, (frame, _) = store.main_frame(version, roster, DeptRules.compile(config), day)
+        return key, frame
+    job = StatusMaterializer(source, notifier=SmtpNotifier.from_env())
+    store.subscribe(job.poke)
+    return job.start()
+
+# 사업장별 계산 결과. 세션 간에 공유해 같은 사업장은 한 번만 읽고 계산함
+@st.cache_resource(show_spinner=False)
+def shared_site_shards():
+    return SiteShards(blob_cache=github_blob_cache())
+
+# 공유 명부를 GitHub 에 올리는 백그라운드 저장기. 저장소마다 하나라서 여러 세션의 저장 요청을 모아 한 번에 올림
+@st.cache_resource(show_spinner=False)
+def store_saver(name):
+    return WriteBehindSaver(roster_store(name))
+
+# 마지막으로 저장/불러온 data.csv 이후의 변경 기록 (변경분만 저장할 때 사용, 저장소가 관리)
+def get_journal():
+    return get_store().journal
+
+def roster_is_private():
+    return '_pending' in st.session_state
+
+def session_dirty():
+    return roster_is_private() or bool(st.session_state.get('_config_dirty'))
+
+# 세션 명부가 바뀔 때마다 올리는 번호. 세션 파생 프레임의 캐시 키로 써서 재실행마다 명부 전체를 해시하지 않는다
+def set_session_roster(df):
+    st.session_state.df_final = df
+    st.session_state._roster_rev = st.session_state.get('_roster_rev', 0) + 1
+
+# 고친 것이 없는 세션은 매 실행마다 저장소의 최신 버전을 따라간다
+def follow_store():
+    if session_dirty(): return
+    version, roster, config = get_store().snapshot()
+    st.session_state._store_version = version
+    if st.session_state.get('df_final') is not roster: set_session_roster(roster)
+    st.session_state.dept_config_final = config
+
+# 보류 변경과 세션 사본/캐시를 버리고 저장소 최신 버전으로 돌아감
+def discard_session_changes():
+    for key in ('_pending', '_rewrite', '_config_dirty', '_conflict', '_dirty_rows', '_roster_index', '_main_frame_cache', '_main_frame_key', '_due_index'):
+        st.session_state.pop(key, None)
+    follow_store()
+
+# 저장소 스냅숏은 여러 세션이 함께 읽으므로 처음 고칠 때 세션 사본을 만든다 (검색 색인은 복사해 이어서 고침)
+def private_roster():
+    if not roster_is_private():
+        df = st.session_state.df_final.copy()
+        st.session_state._roster_index = get_roster_index().copy(df)
+        st.session_state.df_final = df
+        st.session_state._pending = []
+    return st.session_state.df_final
+
+# 셀 단위로 바뀐 명부를 반영하고, 바뀐 행만 다음 재실행에서 다시 계산되도록 표시
+def commit_roster_patch(df, patch):
+    if not patch and not st.session_state._pending and not st.session_state.get('_rewrite') and not st.session_state.get('_config_dirty'):
+        return discard_session_changes()    # 바뀐 것이 없으면 사본을 버리고 공유 스냅숏으로
+    index = st.session_state.get('_roster_index')
+    if index is not None and index.is_for(st.session_state.df_final): index.apply_patch(df, patch)
+    if patch: st.session_state._pending.append(patch)
+    set_session_roster(df)
+    if patch.structural: st.session_state.pop('_dirty_rows', None)
+    elif patch: st.session_state._dirty_rows = st.session_state.get('_dirty_rows', set()) | patch.dirty
+
+# 에디터 변경분을 명부에 셀 단위로 반영
+def apply_editor_patch(editor_key, row_labels, columns=None):
+    df, patch = apply_editor_delta(private_roster(), row_labels, st.session_state.get(editor_key), columns)
+    commit_roster_patch(df, patch)
+    if editor_key in st.session_state: del st.session_state[editor_key]
+    return patch
+
+# 이름(초성 포함)/부서/직책 검색 색인. 공유 스냅숏은 저장소의 색인을 쓰고, 세션 사본은 명부가 통째로 바뀌었을 때만 다시 만든다
+def get_roster_index():
+    if not roster_is_private():
+        index = get_store().roster_index()
+        if index.is_for(st.session_state.df_final): return index
+    index = st.session_state.get('_roster_index')
+    if index is None or not index.is_for(st.session_state.df_final):
+        index = RosterIndex.build(st.session_state.df_final)
+        st.session_state._roster_index = index
+    return index
+
+# 1. 근로자 명부 초기화: 저장소가 비어 있으면 예시 명부로 채움
+store = get_store()
+if store.roster is None:
     data = {
         '성명': ['김철수', '이영희', '박신규', '최신규', '정전기', '강폐기'],
         '직책': ['안전보건관리책임자', '관리감독자', '일반근로자', '일반근로자', '일반근로자', '폐기물담당자'],
@@ -95,45 +204,42 @@ if 'df_final' not in st.session_state:
         '최근_특수검진일': [None, None, None, None, date(2024, 12, 1), None],
         '특수검진_대상': [True, True, True, True, True, False] 
     }
-    st.session_state.df_final = pd.DataFrame(data)
-
-# 날짜/체크박스 타입 보장
-date_cols = ['입사일', '최근_직무교육일', '최근_특수검진일']
-for col in date_cols:
-    if col in st.session_state.df_final.columns:
-        st.session_state.df_final[col] = pd.to_datetime(st.session_state.df_final[col].astype(str), errors='coerce')
-
-bool_cols = ['퇴사여부', '특수검진_대상', '신규교육_이수', '공통8H', '과목1_온라인4H', '과목1_감독자4H', '과목2_온라인4H', '과목2_감독자4H']
-for col in bool_cols:
-    if col not in st.session_state.df_final.columns:
-        default_val = True if col == '특수검진_대상' else False
-        st.session_state.df_final[col] = default_val
-    else:
-        st.session_state.df_final[col] = st.session_state.df_final[col].fillna(False).astype(bool)
-
-# 2. 관리자 설정 초기화 (dept_config_final)
-if 'dept_config_final' not in st.session_state:
-    st.session_state.dept_config_final = pd.DataFrame({
+    # 2. 관리자 설정 초기화
+    sample_config = sanitize_config_df(pd.DataFrame({
         '정렬순서': [1, 2, 3, 4],
         '부서명': ['용접팀', '전기팀', '밀폐작업팀', '일반관리팀'],
         '특별교육과목1': ["해당없음"] * 4, '특별교육과목2': ["해당없음"] * 4,
         '유해인자': ['용접흄, 분진', '전류(감전)', '산소결핍', '없음'],
         '담당관리감독자': ['-', '-', '-', '-']
-    })
-st.session_state.dept_config_final = sanitize_config_df(st.session_state.dept_config_final)
+    }))
+    store.seed(compact_roster(pd.DataFrame(data), sample_config['부서명']), sample_config)
+status_job(store.name)
+
+# 저장소를 거치지 않고 세션에 들어온 명부/설정은 (처음 한 번) 통째로 바꾼 보류 변경으로 취급
+if '_store_version' not in st.session_state:
+    version, roster, config = store.snapshot()
+    if 'df_final' in st.session_state:
+        st.session_state.update(_pending=[], _rewrite=True)
+        set_session_roster(st.session_state.df_final)
+    if 'dept_config_final' in st.session_state: st.session_state._config_dirty = True
+    st.session_state.setdefault('df_final', roster)
+    st.session_state.setdefault('dept_config_final', config)
+    st.session_state._store_version = version
+follow_store()
+
+# 세션에서 바꾼 설정/명부만 정리. 명부는 범주형 + 체크박스 비트 플래그로 압축해 보관 (이미 압축돼 있으면 변환하지 않음)
+if st.session_state.get('_config_dirty'): st.session_state.dept_config_final = sanitize_config_df(st.session_state.dept_config_final)
+if roster_is_private(): st.session_state.df_final = compact_roster(st.session_state.df_final, st.session_state.dept_config_final['부서명'])
 
 supervisor_list = sorted(st.session_state.df_final[st.session_state.df_final['직책'].astype(str).str.contains("관리감독자", na=False)]['성명'].dropna().unique().tolist())
 if "-" not in supervisor_list: supervisor_list.insert(0, "-")
 
-DEPT_S1 = dict(zip(st.session_state.dept_config_final['부서명'], st.session_state.dept_config_final['특별교육과목1']))
-DEPT_S2 = dict(zip(st.session_state.dept_config_final['부서명'], st.session_state.dept_config_final['특별교육과목2']))
-DEPT_FAC = dict(zip(st.session_state.dept_config_final['부서명'], st.session_state.dept_config_final['유해인자']))
-DEPT_SUP = dict(zip(st.session_state.dept_config_final['부서명'], st.session_state.dept_config_final['담당관리감독자']))
 DEPTS_LIST = list(st.session_state.dept_config_final['부서명'])
 
 # ==========================================
 # [사이드바] 통합 메뉴
 # ==========================================
+trace.mark("sidebar")
 with st.sidebar:
     st.header("⚙️ 통합 관리자 메뉴")
     
@@ -142,86 +248,175 @@ with st.sidebar:
         if st.button("🔄 새로고침", type="primary"):
             st.cache_data.clear()
             st.session_state.clear()
-            st.rerun()
+            rerun("refresh")
             
     # 1. GitHub 설정
     with st.expander("☁️ GitHub 연동 설정", expanded=False):
         GITHUB_TOKEN = st.text_input("🔑 GitHub 토큰", type="password")
         REPO_NAME = st.text_input("📂 레포지토리 (user/repo)")
-        DATA_FILE = "data.csv"
-        CONFIG_FILE = "config.csv"
 
         def get_github_repo():
             if not GITHUB_TOKEN or not REPO_NAME: return None
-            try: return Github(GITHUB_TOKEN).get_repo(REPO_NAME)
+            try: return open_github_repo(GITHUB_TOKEN, REPO_NAME)
             except: return None
 
-        def save_all_to_github(data_df, config_df):
+        save_snapshot = st.checkbox("📦 Parquet 스냅숏 함께 저장", value=snapshot_available(), disabled=not snapshot_available(),
+                                    help="타입이 보존된 data.parquet 을 같이 저장해 불러오기 시 날짜 파싱을 생략합니다.")
+
+        journal_mode = st.toggle("📝 변경분만 저장", key="journal_mode",
+                                 help="명부 전체 대신 바뀐 셀만 journal/ 에 기록합니다. 기록이 쌓이면 저장할 때 data.csv 로 합칩니다.")
+
+        # 원격 저장. 저장기 스레드가 저장소의 저장 안 된 버전들을 모아 부르므로 세션 상태나 위젯 값은 읽지 않는다
+        def push_to_github(repo, data_df, config_df, journal, compact=False, journal_mode=False, snapshot=False, by=None):
+            # 불러온 data.csv 가 그대로일 때만 저장 (불러온 적 없으면 원격에 data.csv 가 없을 때만)
+            expect = {DATA_FILE: journal.base_sha}
+            if journal_mode and not compact and not journal.should_compact():
+                # 마지막 data.csv 이후의 변경 기록만 파일 하나로 추가 (원격 data.csv 가 그대로일 때만)
+                files = {CONFIG_FILE: config_to_csv(config_df)}
+                if journal.pending:
+                    path, content = journal.pending_file(by=by)
+                    files[path] = content
+                changed = commit_files(repo, files, expect=expect)
+                if journal.pending: journal.saved(path)
+            else:
+                # 원격과 내용이 같은 파일은 건너뛰고, 바뀐 파일만 커밋 하나로 저장. 이전 변경 기록은 data.csv 에 합쳐졌으므로 지움
+                files = roster_files(data_df, config_df, snapshot=snapshot)
+                changed = commit_files(repo, files, deleted=journal.files, expect=expect)
+                journal.rebase(blob_sha(files[DATA_FILE]), data_df)
+            return changed
+
+        # 세션의 보류 변경을 공유 저장소에 반영(다른 세션이 먼저 바꿨으면 겹치지 않는 한 그 위에 다시 적용)하고
+        # GitHub 업로드는 저장기에 맡김. 잠깐 사이에 이어진 저장은 커밋 하나로 모이고, 화면은 업로드를 기다리지 않는다
+        def save_all_to_github(compact=False):
             repo = get_github_repo()
-            if not repo: 
-                st.error("토큰 필요")
-                return
+            store = get_store()
+            ss = st.session_state
+            if repo and store.name != REPO_NAME:
+                # 이 레포를 불러오지 않은 세션: 원격에 명부가 없을 때만 이 명부로 레포 저장소를 시작한다
+                try: remote_has_roster = DATA_FILE in list_blob_shas(repo)
+                except Exception as e:
+                    st.error(f"저장 실패: {e}")
+                    return
+                if remote_has_roster:
+                    st.error("레포에 이미 명부가 있습니다. 📂 불러오기 후 다시 저장하세요.")
+                    return
             try:
-                save_df = data_df.copy()
-                date_cols = ['입사일', '최근_직무교육일', '최근_특수검진일', '다음_직무교육일', '다음_특수검진일']
-                for col in date_cols:
-                    if col in save_df.columns:
-                        save_df[col] = save_df[col].apply(lambda x: x.strftime('%Y-%m-%d') if not pd.isna(x) else '')
-
-                data_content = save_df.to_csv(index=False)
-                try:
-                    contents = repo.get_contents(DATA_FILE)
-                    repo.update_file(DATA_FILE, f"Update data: {datetime.now()}", data_content, contents.sha)
-                except:
-                    repo.create_file(DATA_FILE, "Init data", data_content)
-                
-                config_content = config_df.to_csv(index=False)
-                try:
-                    contents = repo.get_contents(CONFIG_FILE)
-                    repo.update_file(CONFIG_FILE, f"Update config: {datetime.now()}", config_content, contents.sha)
-                except:
-                    repo.create_file(CONFIG_FILE, "Init config", config_content)
-                st.toast("✅ 저장 완료!", icon="☁️")
+                with trace.span("store:commit"):
+                    version, _ = store.commit(ss._store_version, ss.df_final, ss.get('_pending', []),
+                                              config=ss.dept_config_final if ss.get('_config_dirty') else None,
+                                              rewrite=bool(ss.get('_rewrite')), index=ss.get('_roster_index'))
+            except ConflictError as e:
+                ss._conflict = e
+                return
             except Exception as e:
                 st.error(f"저장 실패: {e}")
+                return
+            hand_over_frames(store, version)
+            if repo and store.name != REPO_NAME:
+                target = roster_store(REPO_NAME)
+                target.replace(store.roster, store.config)      # 기준 data.csv 가 없는 저널
+                ss._store_name, store, compact = REPO_NAME, target, True    # 처음 한 번은 data.csv 전체를 올림
+            discard_session_changes()
+            if not repo:
+                st.warning("GitHub 토큰이 없어 이 서버의 공유 명부에만 반영했습니다.")
+                return
+            if not store.dirty and not compact:
+                st.toast("변경사항 없음", icon="☁️")
+                return
+            options = dict(journal_mode=journal_mode, snapshot=save_snapshot, by=github_login(GITHUB_TOKEN))
+            store_saver(store.name).request(lambda data_df, config_df, journal, compact: push_to_github(repo, data_df, config_df, journal, compact, **options), compact)
+            st.toast("저장 요청 완료. 잠시 후 GitHub 에 올라갑니다.", icon="☁️")
+            rerun("github_save")        # 불러오기 버튼과 저장 상태 fragment 의 run_every 를 '저장 중' 으로 다시 그림
+
+        # 세션 사본이 그대로 새 버전이 됐으면, 이미 만든 파생 프레임/기한 색인을 저장소 캐시로 넘겨 다시 계산하지 않음
+        def hand_over_frames(store, version):
+            key, due = st.session_state.get('_main_frame_key'), st.session_state.get('_due_index')
+            frame = st.session_state.get('_main_frame_cache', FrameCache()).get(key)
+            if (frame is None or due is None or due[0] != key or st.session_state.get('_dirty_rows')
+                    or store.roster is not st.session_state.df_final or key[0] != st.session_state.get('_roster_rev')): return
+            store.derived(store.frame_key(version, key[1], key[2]), lambda: (frame, due[1]))
 
         def load_all_from_github():
             repo = get_github_repo()
-            if not repo: return None, None
-            loaded_data, loaded_config = None, None
-            try:
-                contents = repo.get_contents(DATA_FILE)
-                csv_string = contents.decoded_content.decode("utf-8")
-                loaded_data = pd.read_csv(io.StringIO(csv_string))
-                date_cols = ['입사일', '최근_직무교육일', '최근_특수검진일']
-                for col in date_cols:
-                    if col in loaded_data.columns:
-                        loaded_data[col] = pd.to_datetime(loaded_data[col].astype(str), errors='coerce')
-                if '검진단계' not in loaded_data.columns: loaded_data['검진단계'] = "배치전(미실시)"
-                else: loaded_data['검진단계'] = loaded_data['검진단계'].fillna("배치전(미실시)")
-            except: pass
+            if not repo: return None, None, None
             try:
-                contents = repo.get_contents(CONFIG_FILE)
-                csv_string = contents.decoded_content.decode("utf-8")
-                loaded_config = pd.read_csv(io.StringIO(csv_string))
-                loaded_config = sanitize_config_df(loaded_config)
-            except: pass
-            return loaded_data, loaded_config
-
+                # 원격 SHA 가 지난번과 같으면 다운로드/파싱 없이 캐시된 결과를 사용
+                # data.csv 이후의 변경 기록(journal/)이 있으면 재생
+                with trace.span("github:load"):
+                    loaded, journal = load_roster_journaled(repo, github_blob_cache())
+            except: return None, None, None
+            loaded_data = loaded[DATA_FILE][1] if DATA_FILE in loaded else None
+            loaded_config = loaded[CONFIG_FILE][1] if CONFIG_FILE in loaded else None
+            return loaded_data, loaded_config, journal
+
+        saver = store_saver(get_store().name)
         col_s1, col_s2 = st.columns(2)
         with col_s1:
-            if st.button("📂 불러오기"):
-                ld, lc = load_all_from_github()
-                if ld is not None: 
-                    st.session_state.df_final = ld
+            # 올리는 중인 저장이 있으면 끝날 때까지 불러오기를 막는다 (끝나면 저장 상태 fragment 가 전체를 다시 그림)
+            if st.button("⏳ 저장 중..." if saver.busy else "📂 불러오기", disabled=saver.busy):
+                ld, lc, journal = load_all_from_github()
+                if ld is not None:
+                    # 이 레포를 연 세션들이 함께 쓰는 저장소로 옮기고, 보류 변경은 버림 (같은 원격 상태면 저장소는 그대로)
+                    st.session_state._store_name = REPO_NAME
+                    config = sanitize_config_df(lc) if lc is not None else st.session_state.dept_config_final
+                    get_store().replace(compact_roster(ld, config['부서명']), config, journal)
+                    discard_session_changes()
                     st.toast("로드 완료!", icon="✅")
-                if lc is not None: st.session_state.dept_config_final = lc
-                st.rerun()
+                elif lc is not None:
+                    st.session_state.dept_config_final = lc
+                    st.session_state._config_dirty = True
+                rerun("github_load")
         with col_s2:
             if st.button("💾 저장하기"):
-                if 'df_final' in st.session_state and 'dept_config_final' in st.session_state:
-                    save_all_to_github(st.session_state.df_final, st.session_state.dept_config_final)
-                else: st.error("데이터 없음")
+                save_all_to_github()
+
+        # 백그라운드 저장 상태. 올리는 중에는 이 부분만 주기적으로 다시 그리고, 다 올리면 전체를 다시 그린다
+        # (run_every 와 불러오기 버튼은 전체 실행에서만 바뀜)
+        st.session_state._saver_busy = saver.busy
+        @st.fragment(run_every=1 if saver.busy else None)
+        def save_status():
+            status = saver.status()
+            if st.session_state.get('_saver_busy') and not saver.busy: rerun("save_done")
+            if status.state == "pending": st.caption(f"☁️ 저장 대기 중 · 버전 {status.unsaved}개 ({status.due:.0f}초 후 업로드)")
+            elif status.state == "saving": st.caption("☁️ GitHub 에 올리는 중...")
+            elif status.state == "retrying": st.caption(f"⚠️ 저장 재시도 {status.attempts}/{saver.retries} ({status.due:.0f}초 후) · {status.error}")
+            elif status.state == "failed":
+                if isinstance(status.error, StaleBaseError): st.error("저장 실패: 다른 곳에서 명부가 먼저 저장되었습니다. 불러온 뒤 다시 저장하세요.")
+                else:
+                    st.error(f"저장 실패: {status.error}")
+                    if st.button("🔁 다시 올리기"): save_all_to_github()
+            elif status.last_saved is not None:
+                st.caption(f"✅ v{status.saved_version} 저장 완료 {status.last_saved:%H:%M:%S}" + ("" if status.last_result else " (변경사항 없음)"))
+        save_status()
+        conflict = st.session_state.get('_conflict')
+        if conflict is not None:
+            roster = get_store().roster
+            name = lambda label: roster.at[label, '성명'] if label in roster.index else ("" if label is None else label)
+            cells = [f"{name(label)} {col or '행 삭제'}".strip() for label, col in (conflict.cells or [])[:5]]
+            st.error(f"저장 실패: 다른 사용자가 먼저 바꾼 내용과 겹칩니다 ({', '.join(cells) or '명부 전체 변경'}). 내 변경을 버리고 최신 명부를 받은 뒤 다시 고치세요.")
+            if st.button("↩️ 내 변경 버리고 최신 명부 받기"):
+                discard_session_changes()
+                rerun("discard_changes")
+        st.caption(f"공유 명부 v{st.session_state._store_version} · 저장 안 한 내 변경 {sum(len(p.changes) + len(p.added) + len(p.deleted) for p in st.session_state.get('_pending', []))}건"
+                   + (" · 정렬/파일 교체 포함" if st.session_state.get('_rewrite') else ""))
+        if journal_mode:
+            journal = get_journal()
+            st.caption(f"저장 안 된 변경 {len(journal)}건 · 저장된 기록 {journal.saved_records}건 ({len(journal.files)}개 파일)"
+                       + (" · 다음 저장은 data.csv 전체" if journal.should_compact() else ""))
+            if st.button("🗜️ data.csv 로 합쳐 저장", help="변경 기록을 data.csv 에 합쳐 새 기준 파일로 저장하고 기록 파일을 지웁니다."):
+                save_all_to_github(compact=True)
+
+    # 여러 사업장의 명부를 각각 계산해 합친 현황 (조회 전용)
+    with st.expander("🏭 다중 사업장 현황", expanded=False):
+        multi_site = st.toggle("다중 사업장 모드", key="multi_site_mode")
+        site_text = st.text_area("사업장 목록 (한 줄에 하나: 이름=폴더 또는 user/repo)", key="site_sources",
+                                 placeholder="본사=hq\n2공장=acme/plant2-safety",
+                                 help=f"폴더는 {SITES_ROOT} 아래의 경로만 읽습니다.")
+        check_remote = st.button("🔄 사업장 다시 확인", disabled=not multi_site,
+                                 help="GitHub 사업장의 변경 여부를 다시 확인합니다. 로컬 폴더는 매번 확인합니다.")
+
+    soon_days = st.number_input("🟡 임박 기준 (남은 일수)", min_value=1, max_value=365, value=DUE_SOON_DAYS, step=1, key="soon_days",
+                                help="다음 교육/검진일까지 남은 날이 이보다 적으면 '임박'으로 표시합니다.")
 
     st.divider()
 
@@ -243,7 +438,8 @@ with st.sidebar:
                             final_d = pd.concat([st.session_state.dept_config_final[cols], new_d[cols]]).drop_duplicates(['부서명'], keep='last').reset_index(drop=True)
                             final_d.insert(0, '정렬순서', range(1, len(final_d)+1))
                             st.session_state.dept_config_final = final_d
-                            st.rerun()
+                            st.session_state._config_dirty = True
+                            rerun("dept_upload")
                 except Exception as e: st.error(str(e))
 
         st.caption("담당 관리감독자는 명부에 있는 '관리감독자'만 선택 가능합니다.")
@@ -262,8 +458,9 @@ with st.sidebar:
             )
             if st.form_submit_button("설정 적용"):
                 st.session_state.dept_config_final = edited_dept_config
+                st.session_state._config_dirty = True
                 if "dept_editor_sidebar" in st.session_state: del st.session_state["dept_editor_sidebar"]
-                st.rerun()
+                rerun("dept_config_form")
 
     # -----------------------------------------------
     # [3. 근로자 명부 관리 - 정렬 기능 포함]
@@ -273,22 +470,26 @@ with st.sidebar:
         with st.popover("📂 명부 파일 등록 (Excel/CSV)"):
             up_file = st.file_uploader("파일 선택", type=['csv', 'xlsx'], key="worker_up")
             if up_file:
-                try:
-                    new_df = pd.read_csv(up_file) if up_file.name.endswith('.csv') else pd.read_excel(up_file)
-                    if st.button("명부 병합하기"):
-                        if '성명' not in new_df.columns: st.error("성명 컬럼 필수")
-                        else:
-                            for c in st.session_state.df_final.columns:
-                                if c not in new_df.columns: new_df[c] = None
-                            if '특수검진_대상' in new_df.columns:
-                                new_df['특수검진_대상'] = new_df['특수검진_대상'].fillna(True).astype(bool)
-                            else: new_df['특수검진_대상'] = True
-                            st.session_state.df_final = pd.concat([st.session_state.df_final, new_df[st.session_state.df_final.columns]], ignore_index=True)
-                            st.rerun()
-                except Exception as e: st.error(str(e))
+                st.caption("같은 근로자(사번, 없으면 성명+입사일)는 새로 추가하지 않고 바뀐 값만 고칩니다. 빈 칸은 기존 값을 유지합니다.")
+                if st.button("명부 병합하기"):
+                    try:
+                        # 파일을 조각 단위로 읽으며 명부에 추가/수정 (전체를 한 번에 올리지 않음)
+                        with trace.span("import:upsert"):
+                            df, patch, summary = upsert_roster(private_roster(), iter_upload_chunks(up_file, up_file.name), DEPTS_LIST)
+                        commit_roster_patch(df, patch)
+                        st.toast(f"명부 병합 완료: {summary}")
+                        rerun("roster_upload")
+                    except Exception as e: st.error(str(e))
 
         st.caption("특수검진 제외는 여기서 체크 해제 후 [명부 수정사항 적용] 클릭")
 
+        with st.popover("🧮 메모리 사용량"):
+            if st.button("측정하기", key="mem_report_btn"):
+                report = memory_report(st.session_state.df_final)
+                st.write(f"근로자 {report['rows']:,}명")
+                st.write(f"펼친 형태: {report['expanded_bytes'] / 1024:,.1f} KB (1인당 {report['expanded_per_worker']:,.0f} B)")
+                st.write(f"압축 형태: {report['compact_bytes'] / 1024:,.1f} KB (1인당 {report['compact_per_worker']:,.0f} B)")
+
         # --- 명부 정렬 설정 ---
         st.write("▼ 명부 정렬 설정")
         sort_c1, sort_c2, sort_c3 = st.columns([2, 2, 1])
@@ -299,9 +500,14 @@ with st.sidebar:
         with sort_c3:
             if st.button("정렬 적용", use_container_width=True):
                 is_asc = (sort_order == "오름차순")
-                # 원본 데이터를 정렬하고 인덱스를 초기화하여 에디터 오류 방지
-                st.session_state.df_final = st.session_state.df_final.sort_values(by=sort_col, ascending=is_asc).reset_index(drop=True)
-                st.rerun()
+                # 원본 데이터를 정렬하되 인덱스(행 ID)는 유지해 에디터 변경분이 같은 행에 반영되도록 함
+                # 범주형(부서/직책)은 범주 순서가 아니라 이름 순으로 정렬
+                by_name = lambda s: s.astype(str) if isinstance(s.dtype, pd.CategoricalDtype) else s
+                set_session_roster(st.session_state.df_final.sort_values(by=sort_col, ascending=is_asc, key=by_name, kind='stable'))
+                # 행 순서는 셀 변경으로 옮길 수 없으므로 통째 변경으로 저장 (다음 저장은 data.csv 전체)
+                st.session_state.setdefault('_pending', [])
+                st.session_state._rewrite = True
+                rerun("roster_sort")
         st.markdown("---")
         
         view_cols = [
@@ -311,139 +517,288 @@ with st.sidebar:
             '공통8H', '과목1_온라인4H', '과목1_감독자4H', '과목2_온라인4H', '과목2_감독자4H'
         ]
 
-        with st.form("worker_main_form"):
-            edited_df = st.data_editor(
-                st.session_state.df_final[view_cols],
-                num_rows="dynamic",
-                use_container_width=True,
-                key="main_editor_sidebar",
-                column_config={
-                    "퇴사여부": st.column_config.CheckboxColumn("퇴사", default=False, width="small"),
-                    "특수검진_대상": st.column_config.CheckboxColumn("검진대상", default=True, width="small"),
-                    "성명": st.column_config.TextColumn("성명", width="medium"),
-                    "직책": st.column_config.SelectboxColumn("직책", options=ROLES, width="medium"),
-                    "부서": st.column_config.SelectboxColumn("부서", options=DEPTS_LIST, width="medium"),
-                    "입사일": st.column_config.DateColumn(format="YYYY-MM-DD"),
-                    "최근_직무교육일": st.column_config.DateColumn(format="YYYY-MM-DD"),
-                    "최근_특수검진일": st.column_config.DateColumn(format="YYYY-MM-DD"),
-                    "검진단계": st.column_config.SelectboxColumn(options=HEALTH_PHASES),
-                    "신규교육_이수": st.column_config.CheckboxColumn("신규이수", width="small"),
-                    "공통8H": st.column_config.CheckboxColumn("공통8H", width="small"),
-                    "과목1_온라인4H": st.column_config.CheckboxColumn("1-온라인", width="small"),
-                    "과목1_감독자4H": st.column_config.CheckboxColumn("1-감독자", width="small"),
-                    "과목2_온라인4H": st.column_config.CheckboxColumn("2-온라인", width="small"),
-                    "과목2_감독자4H": st.column_config.CheckboxColumn("2-감독자", width="small")
-                }
-            )
+        # 편집을 열었을 때만 에디터를 그리고, 검색/정렬된 명부 중 현재 페이지 구간만 에디터로 보냄
+        if st.toggle("명부 편집 열기", key="roster_edit_open"):
+            roster = st.session_state.df_final
+            pg_c1, pg_c2, pg_c3 = st.columns([2, 1, 1])
+            roster_query = pg_c1.text_input("명부 검색", key="roster_query", placeholder="이름 (초성 가능)", label_visibility="collapsed")
+            page_size = pg_c2.selectbox("페이지 크기", PAGE_SIZES, index=1, key="roster_page_size", label_visibility="collapsed")
+            matched = get_roster_index().filter(name=roster_query)
+            labels = roster.index if matched is None else select_labels(roster, matched).index
+            page_labels, page, n_pages = page_window(labels, st.session_state.get('roster_page', 1), page_size)
+            st.session_state.roster_page = page
+            pg_c3.number_input("페이지", min_value=1, max_value=n_pages, step=1, key="roster_page", label_visibility="collapsed")
+            st.caption(f"{page} / {n_pages} 페이지 · {len(labels):,}명")
+
+            # 보이는 구간이 바뀌면 이전 구간 기준의 에디터 변경분(위치 기반)은 버림
+            window = tuple(page_labels.tolist())
+            if st.session_state.get('_roster_window') != window:
+                st.session_state.pop("main_editor_sidebar", None)
+                st.session_state._roster_window = window
+
+            with st.form("worker_main_form"):
+                edited_df = st.data_editor(
+                    to_editor(roster.loc[page_labels], view_cols),
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    key="main_editor_sidebar",
+                    column_config={
+                        "퇴사여부": st.column_config.CheckboxColumn("퇴사", default=False, width="small"),
+                        "특수검진_대상": st.column_config.CheckboxColumn("검진대상", default=True, width="small"),
+                        "성명": st.column_config.TextColumn("성명", width="medium"),
+                        "직책": st.column_config.SelectboxColumn("직책", options=ROLES, width="medium"),
+                        "부서": st.column_config.SelectboxColumn("부서", options=DEPTS_LIST, width="medium"),
+                        "입사일": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                        "최근_직무교육일": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                        "최근_특수검진일": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                        "검진단계": st.column_config.SelectboxColumn(options=HEALTH_PHASES),
+                        "신규교육_이수": st.column_config.CheckboxColumn("신규이수", width="small"),
+                        "공통8H": st.column_config.CheckboxColumn("공통8H", width="small"),
+                        "과목1_온라인4H": st.column_config.CheckboxColumn("1-온라인", width="small"),
+                        "과목1_감독자4H": st.column_config.CheckboxColumn("1-감독자", width="small"),
+                        "과목2_온라인4H": st.column_config.CheckboxColumn("2-온라인", width="small"),
+                        "과목2_감독자4H": st.column_config.CheckboxColumn("2-감독자", width="small")
+                    }
+                )
             
-            # 수정사항 적용 로직 완전 변경 (데이터 보존 및 인덱스 처리)
-            if st.form_submit_button("명부 수정사항 적용"):
-                all_cols = st.session_state.df_final.columns
-                hidden_cols = [c for c in all_cols if c not in view_cols]
-                
-                hidden_df = st.session_state.df_final[hidden_cols].reindex(edited_df.index)
-                new_final_df = pd.concat([edited_df, hidden_df], axis=1)
-                new_final_df = new_final_df[all_cols]
-                
-                date_cols_fix = ['입사일', '최근_직무교육일', '최근_특수검진일']
-                for col in date_cols_fix:
-                    if col in new_final_df.columns:
-                        new_final_df[col] = pd.to_datetime(new_final_df[col], errors='coerce')
-                
-                bool_cols_fix = ['퇴사여부', '특수검진_대상', '신규교육_이수', '공통8H', '과목1_온라인4H', '과목1_감독자4H', '과목2_온라인4H', '과목2_감독자4H']
-                for col in bool_cols_fix:
-                    if col in new_final_df.columns:
-                        new_final_df[col] = new_final_df[col].fillna(False).astype(bool)
-
-                # 수정사항 저장할 때도 인덱스를 초기화해서 깔끔하게 유지합니다
-                st.session_state.df_final = new_final_df.reset_index(drop=True)
-                
-                if "main_editor_sidebar" in st.session_state:
-                    del st.session_state["main_editor_sidebar"]
-                
-                st.rerun()
+                # 수정사항 적용 로직 완전 변경 (데이터 보존 및 인덱스 처리)
+                if st.form_submit_button("명부 수정사항 적용"):
+                    apply_editor_patch("main_editor_sidebar", page_labels, view_cols)
+                    rerun("worker_main_form")
+
+    # 성능 디버그 패널 자리 (스크립트 끝에서 이번 재실행 기록으로 채움)
+    debug_panel = st.container()
 
 # ==========================================
 # [메인 화면] 계산 및 대시보드
 # ==========================================
 
-df = st.session_state.df_final.copy()
-today = date.today()
-
-if '성명' in df.columns:
-    df = df.dropna(subset=['성명'])
-    df = df[df['성명'].astype(str).str.strip() != '']
-
-for col in ['입사일', '최근_직무교육일', '최근_특수검진일']:
-    if col in df.columns: 
-        df[col] = pd.to_datetime(df[col], errors='coerce')
-
-df['특별교육_과목1'] = df['부서'].map(DEPT_S1).fillna("설정필요")
-df['특별교육_과목2'] = df['부서'].map(DEPT_S2).fillna("해당없음")
-df['유해인자'] = df['부서'].map(DEPT_FAC).fillna("없음")
-df['담당관리감독자'] = df['부서'].map(DEPT_SUP).fillna("-")
+# 사이드바 '성능 디버그': 이번 재실행의 단계별 시간, 재실행 원인별 횟수, 최대 메모리, 프레임 크기
+def render_trace_panel(**frames):
+    with debug_panel:
+        show = st.toggle("🐞 성능 디버그", key="trace_debug")
+        if show: st.checkbox("재실행 기록을 JSONL 로 저장", key="trace_log", help=TRACE_LOG)
+        if show or st.session_state.get('trace_log'):
+            for name, frame in frames.items(): trace.frame(name, frame)
+        record = finish_trace()
+        if not show: return
+        peak = record['peak_rss_bytes']
+        st.caption(f"원인: {record['trigger']} · 전체 {record['total_s'] * 1000:.0f} ms"
+                   + (f" · 최대 RSS {peak / 2**20:.0f} MiB" if peak else ""))
+        st.dataframe(pd.DataFrame([{'단계': s['name'], 'ms': round(s['s'] * 1000, 1)} for s in record['spans']]), hide_index=True, use_container_width=True)
+        interrupted = st.session_state.get('_interrupted_trace')
+        if interrupted:
+            st.caption(f"직전 실행: {interrupted['rerun_by']} 처리 후 재실행 · {interrupted['total_s'] * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame([{'원인': k, '횟수': v} for k, v in sorted(rerun_counts.items(), key=lambda kv: -kv[1])]), hide_index=True, use_container_width=True)
+        if record['frames']:
+            st.dataframe(pd.DataFrame([{'프레임': k, '행': f['rows'], '열': f['cols'], 'MiB': round(f['bytes'] / 2**20, 2)} for k, f in record['frames'].items()]), hide_index=True, use_container_width=True)
 
-mask_no_factor = df['유해인자'].isin(['없음', '', '해당없음'])
-df.loc[mask_no_factor, '특수검진_대상'] = False
-
-df['입사일_dt'] = pd.to_datetime(df['입사일'].astype(str), errors='coerce')
-df['입사연도'] = df['입사일_dt'].dt.year
-df['법적_신규자'] = df['입사일_dt'].apply(lambda x: (pd.Timestamp(today) - x).days < 90 if pd.notnull(x) else False)
-
-df['다음_직무교육일'] = df.apply(calculate_job_training_date, axis=1)
+today = date.today()
 
-def calc_next_health(row):
-    if not row.get('특수검진_대상', True): return None 
-    if row['검진단계'] == "배치전(미실시)" or pd.isna(row['최근_특수검진일']): return None
-    cycle = 180 if row['검진단계'] == "1차검진 완료(다음:6개월)" else 365
-    return add_days(row['최근_특수검진일'], cycle)
+if multi_site:
+    trace.mark("multi_site")
+    sources = parse_sources(site_text, SITES_ROOT)
+    site_shards = shared_site_shards()
+    def open_site_repo(repo_name):
+        if not GITHUB_TOKEN: raise ValueError("폴더가 없거나 GitHub 토큰이 필요합니다")
+        return open_github_repo(GITHUB_TOKEN, repo_name)
+    site_shards.refresh(sources, today, open_repo=open_site_repo, check_remote=check_remote, soon_days=soon_days)
+    for name, error in site_shards.errors(sources).items(): st.warning(f"{name}: {error or type(error).__name__}")
+    if not sources: st.info("사업장 목록을 입력하세요.")
+    counts, tabs = site_shards.merged(sources)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1: st.metric("👥 조회 인원(재직)", f"{counts.get('재직', 0)}명")
+    with col2: st.metric("🌱 올해 신규 입사자", f"{counts.get('올해입사', 0)}명")
+    with col3: st.metric("👔 책임자/감독자", f"{counts.get('책임자감독자', 0)}명")
+    with col4: st.metric("🏥 검진 대상", f"{counts.get('검진대상', 0)}명")
+    st.caption(" · ".join(f"{shard.name} {shard.rows}명" for shard in site_shards.shards(sources)))
+    st.divider()
 
-df['다음_특수검진일'] = df.apply(calc_next_health, axis=1)
+    date_cols = {col: st.column_config.DateColumn(format="YYYY-MM-DD") for col in ['입사일', '최근_직무교육일', '다음_직무교육일', '최근_특수검진일', '다음_특수검진일']}
+    # 선택된 탭만 그린다 (탭을 바꾸면 재실행)
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["👔 책임자/감독자", "♻️ 폐기물 담당자", "🌱 신규 입사자", "⚠️ 특별교육", "🏥 특수건강검진"], key="site_tab", on_change="rerun")
+    if tab1.open:
+        with tab1: st.dataframe(tabs['책임자감독자'], use_container_width=True, hide_index=True, column_config=date_cols)
+    if tab2.open:
+        with tab2: st.dataframe(tabs['폐기물'], use_container_width=True, hide_index=True, column_config=date_cols)
+    if tab3.open:
+        with tab3:
+            sel_y = st.radio("입사년도 선택", [today.year, today.year-1, today.year-2], horizontal=True, key="multi_site_year")
+            hires = tabs['신규입사']
+            st.dataframe(hires[hires['입사연도'] == sel_y].drop(columns=['입사연도']), use_container_width=True, hide_index=True, column_config=date_cols)
+    if tab4.open:
+        with tab4: st.dataframe(tabs['특별교육'], use_container_width=True, hide_index=True, column_config=date_cols)
+    if tab5.open:
+        with tab5: st.dataframe(tabs['특수검진'], use_container_width=True, hide_index=True, column_config=date_cols)
+    render_trace_panel(df_final=st.session_state.df_final)
+    st.stop()
+
+# 명부/부서설정/날짜가 그대로면 이전 재실행에서 만든 파생 프레임을 재사용 (검색어 입력 등)
+# 부서 설정은 내용이 바뀔 때만 규칙표로 다시 컴파일
+def get_dept_rules():
+    config_fp = frame_fingerprint(st.session_state.dept_config_final)
+    cached = st.session_state.get('_dept_rules')
+    if cached is None or cached[0] != config_fp:
+        cached = (config_fp, DeptRules.compile(st.session_state.dept_config_final))
+        st.session_state._dept_rules = cached
+    return cached[1]
+
+# 저장소 키(('store', 이름, 버전))의 프레임/기한 색인은 세션들이 함께 쓰므로 고치지 않고 복사해서 고침
+def is_shared_key(key):
+    return isinstance(key[0], tuple)
+
+def get_main_frame():
+    cache = st.session_state.setdefault('_main_frame_cache', FrameCache(maxsize=2))
+    rules = get_dept_rules()
+    store = get_store()
+    if not session_dirty():
+        # 고치지 않은 세션은 저장소 버전으로 찾아, 다른 세션이 이미 만든 파생 프레임/기한 색인을 그대로 씀
+        key, (frame, index) = store.main_frame(st.session_state._store_version, st.session_state.df_final, rules, today)
+        cache.put(key, frame)
+        st.session_state.pop('_dirty_rows', None)
+        st.session_state._main_frame_key = key
+        st.session_state._main_frame_rules = rules
+        st.session_state._due_index = (key, index)
+        return frame
+    # 명부나 설정을 고친 세션의 프레임은 세션 명부 수정 번호로 찾는다
+    key = (st.session_state.get('_roster_rev', 0), rules.version, today)
+    frame = cache.get(key)
+    dirty = st.session_state.pop('_dirty_rows', None)
+    refreshed = None
+    if frame is None:
+        # 직전 프레임에서 에디터로 바뀐 행과 규칙이 바뀐 부서의 행만 다시 계산 (날짜가 같을 때)
+        # 직전 프레임이 같은 버전의 공유 프레임이고 명부를 고치지 않았으면(설정만 바꿈) 그 복사본에서 시작
+        base_key = st.session_state.get('_main_frame_key')
+        base_rules = st.session_state.get('_main_frame_rules')
+        changed = rules.changed_depts(base_rules)
+        same_roster = base_key is not None and (base_key[0] == key[0] or (not roster_is_private()
+                      and base_key[0] == store.frame_key(st.session_state._store_version, None, None)[0]))
+        if base_key in cache and base_key[2] == today and changed is not None and (dirty or same_roster):
+            roster = st.session_state.df_final
+            labels = set(dirty or ())
+            if changed: labels |= set(roster.index[roster['부서'].isin(list(changed))])
+            base = cache.pop(base_key)
+            frame = refresh_main_frame(base.copy() if is_shared_key(base_key) else base, roster, labels, rules, today)
+            if frame is not None: refreshed = (base_key, labels)
+        if frame is None:
+            frame = build_main_frame(st.session_state.df_final, rules, today)
+        cache.put(key, frame)
+    st.session_state._main_frame_key = key
+    st.session_state._main_frame_rules = rules
+    update_due_index(key, frame, refreshed)
+    return frame
+
+# 기한 색인은 파생 프레임과 같은 키로 보관하고, 일부 행만 다시 계산했으면 그 행만 고친다
+def update_due_index(key, frame, refreshed=None):
+    cached = st.session_state.get('_due_index')
+    if cached is not None and cached[0] == key: return cached[1]
+    if cached is not None and refreshed is not None and cached[0] == refreshed[0]:
+        index = cached[1].copy() if is_shared_key(cached[0]) else cached[1]
+        index.update(frame, refreshed[1])
+    else:
+        index = DueIndex.build(frame)
+    st.session_state._due_index = (key, index)
+    return index
+
+# 상태 컬럼: 공유 스냅숏을 기본 임박 기준으로 보는 세션은 배치 작업이 만든 오늘 상태표를 읽기만 하고, 그 밖에는 compute 로 계산
+def read_status(kind, target, compute):
+    snapshot = status_job(get_store().name).current
+    if (snapshot is not None and not roster_is_private() and snapshot.day == today and snapshot.soon_days == soon_days
+            and snapshot.key == st.session_state.get('_main_frame_key')):
+        status = snapshot.status(kind).reindex(target.index)
+        if not status.isna().any(): return status
+    return compute(target)
+
+trace.mark("main_frame")
+df = get_main_frame()
 
 # 필터링
+trace.mark("filter")
 with st.expander("🔍 데이터 필터링 (이름/부서/직책 검색)", expanded=False):
     c1, c2, c3 = st.columns(3)
-    search_name = c1.text_input("이름 검색 (엔터)")
-    all_depts = sorted(df['부서'].dropna().unique())
-    all_roles = sorted(df['직책'].dropna().unique())
+    search_name = c1.text_input("이름 검색 (엔터)", help="초성 검색 가능 (예: ㄱㄷㅈ)")
+    roster_index = get_roster_index()
+    all_depts = roster_index.values('부서')
+    all_roles = roster_index.values('직책')
     search_dept = c2.multiselect("부서 선택", options=all_depts)
     search_role = c3.multiselect("직책 선택", options=all_roles)
 
-view_df = df.copy()
-if search_name:
-    view_df = view_df[view_df['성명'].astype(str).str.contains(search_name)]
-if search_dept:
-    view_df = view_df[view_df['부서'].isin(search_dept)]
-if search_role:
-    view_df = view_df[view_df['직책'].isin(search_role)]
+view_df = df
+matched = roster_index.filter(name=search_name, 부서=search_dept, 직책=search_role)
+if matched is not None:
+    view_df = select_labels(df, matched)
 
-active_df = view_df[view_df['퇴사여부'] == False]
-this_year_hires_count = len(view_df[view_df['입사연도'] == today.year])
+active_df = view_df[active_mask(view_df)]
+counts = dashboard_counts(view_df, today)
 
 # 2. 대시보드
+trace.mark("metrics")
 col1, col2, col3, col4 = st.columns(4)
-with col1: st.metric("👥 조회 인원(재직)", f"{len(active_df)}명")
-with col2: st.metric("🌱 올해 신규 입사자", f"{this_year_hires_count}명")
-with col3: st.metric("👔 책임자/감독자", f"{len(active_df[active_df['직책'].isin(['안전보건관리책임자', '관리감독자'])])}명")
-with col4: st.metric("🏥 검진 대상", f"{len(active_df[active_df['특수검진_대상'] == True])}명")
+with col1: st.metric("👥 조회 인원(재직)", f"{counts['재직']}명")
+with col2: st.metric("🌱 올해 신규 입사자", f"{counts['올해입사']}명")
+with col3: st.metric("👔 책임자/감독자", f"{counts['책임자감독자']}명")
+with col4: st.metric("🏥 검진 대상", f"{counts['검진대상']}명")
+
+# 점검 제출용 내보내기 (현재 검색 조건의 대상자). 파일은 다운로드를 누를 때 별도 스레드에서 조각 단위로 만든다
+with st.popover("📥 보고서 내보내기"):
+    export_format = st.radio("형식", ["XLSX (탭별 시트)", "CSV"], horizontal=True, key="export_format")
+    export_view = view_df
+    if export_format == "CSV":
+        export_sheet = st.selectbox("시트", [sheet.name for sheet in export_sheets(today)], key="export_sheet")
+        export_gzip = st.checkbox("gzip 압축", key="export_gzip")
+        write_export = lambda f: write_csv(f, export_view, export_sheet, today, soon_days, compress=export_gzip)
+        file_name = f"{export_sheet}_{today:%Y%m%d}.csv" + (".gz" if export_gzip else "")
+        mime = "application/gzip" if export_gzip else "text/csv"
+    else:
+        write_export = lambda f: write_xlsx(f, export_view, today, soon_days)
+        file_name = f"안전보건_점검자료_{today:%Y%m%d}.xlsx"
+        mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    def export_data():
+        with tempfile.TemporaryFile() as f:
+            write_export(f)
+            f.seek(0)
+            return f.read()
+    st.download_button("⬇️ 다운로드", export_data, file_name=file_name, mime=mime, on_click="ignore")
 
 st.divider()
 
 # 3. 탭 구성
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["👔 책임자/감독자", "♻️ 폐기물 담당자", "🌱 신규 입사자", "⚠️ 특별교육", "🏥 특수건강검진"])
-
-with tab1:
+# 선택된 탭만 계산해서 그린다 (탭을 바꾸면 재실행). 탭 본문은 fragment 라서 탭 안의 폼 저장과
+# 위젯 조작은 그 탭만 다시 실행한다. 이때는 바뀐 명부로 파생 프레임(바뀐 행만 재계산)과 검색 결과를 다시 만든다
+def tab_fragment(name):
+    def wrap(render):
+        @st.fragment
+        def run():
+            global trace, partial_run
+            partial = partial_run = trace.finished     # 전체 실행은 이미 끝났고 이 탭만 다시 실행되는 중
+            if partial: trace = start_trace()
+            trace.mark(f"tab:{name}")
+            tab_view = view_df
+            if partial:
+                frame = get_main_frame()
+                tab_view = frame if matched is None else select_labels(frame, matched)
+            try: render(tab_view, tab_view[active_mask(tab_view)])
+            finally:
+                if partial: finish_trace()
+        return run
+    return wrap
+
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["👔 책임자/감독자", "♻️ 폐기물 담당자", "🌱 신규 입사자", "⚠️ 특별교육", "🏥 특수건강검진", "📅 기한 일정", "📈 준수율 추세"],
+                                                   key="main_tab", on_change="rerun")
+
+@tab_fragment("manager")
+def manager_tab(view_df, active_df):
     st.subheader("안전보건관리책임자 (2년) / 관리감독자 (1년)")
-    mask_mgr = active_df['직책'].astype(str).str.replace(" ", "").str.contains("책임자|감독자", na=False)
-    target_indices = active_df[mask_mgr].index
+    target_indices = active_df[manager_mask(active_df)].index
     target = active_df.loc[target_indices].copy()
     
     if not target.empty:
-        target['상태'] = target['다음_직무교육일'].apply(get_dday_status)
+        target['상태'] = read_status('직무교육', target, lambda t: dday_status(t['다음_직무교육일'], today, soon_days))
         
         with st.form("mgr_form"):
             edited_target = st.data_editor(
-                target[['성명','직책','최근_직무교육일','다음_직무교육일','상태']], 
+                to_editor(target, ['성명','직책','최근_직무교육일','다음_직무교육일','상태']),
                 use_container_width=True, hide_index=True,
                 key="mgr_editor", 
                 column_config={
@@ -452,24 +807,22 @@ with tab1:
                 }
             )
             if st.form_submit_button("변경사항 적용"):
-                if '최근_직무교육일' in edited_target.columns:
-                    st.session_state.df_final.loc[target_indices, '최근_직무교육일'] = pd.to_datetime(edited_target['최근_직무교육일'])
-                    if "mgr_editor" in st.session_state: del st.session_state["mgr_editor"]
-                    st.rerun()
+                apply_editor_patch("mgr_editor", target_indices, ['최근_직무교육일'])
+                rerun("mgr_form", scope="fragment")
     else: st.info("대상자 없음")
 
-with tab2:
+@tab_fragment("waste")
+def waste_tab(view_df, active_df):
     st.subheader("폐기물 담당자 (3년)")
-    mask_waste = active_df['직책'].astype(str).str.replace(" ", "").str.contains("폐기물", na=False)
-    target_indices = active_df[mask_waste].index
+    target_indices = active_df[waste_mask(active_df)].index
     target = active_df.loc[target_indices].copy()
     
     if not target.empty:
-        target['상태'] = target['다음_직무교육일'].apply(get_dday_status)
+        target['상태'] = read_status('직무교육', target, lambda t: dday_status(t['다음_직무교육일'], today, soon_days))
         
         with st.form("waste_form"):
             edited_target = st.data_editor(
-                target[['성명','부서','최근_직무교육일','다음_직무교육일','상태']], 
+                to_editor(target, ['성명','부서','최근_직무교육일','다음_직무교육일','상태']),
                 use_container_width=True, hide_index=True,
                 key="waste_editor",
                 column_config={
@@ -478,22 +831,22 @@ with tab2:
                 }
             )
             if st.form_submit_button("변경사항 적용"):
-                st.session_state.df_final.loc[target_indices, '최근_직무교육일'] = pd.to_datetime(edited_target['최근_직무교육일'])
-                if "waste_editor" in st.session_state: del st.session_state["waste_editor"]
-                st.rerun()
+                apply_editor_patch("waste_editor", target_indices, ['최근_직무교육일'])
+                rerun("waste_form", scope="fragment")
     else: st.info("대상자 없음")
 
-with tab3:
+@tab_fragment("new_hire")
+def new_hire_tab(view_df, active_df):
     years = [today.year, today.year-1, today.year-2]
     sel_y = st.radio("입사년도 선택", years, horizontal=True)
     
-    target_indices = view_df[view_df['입사연도'] == sel_y].index
+    target_indices = view_df[hire_year_mask(view_df, sel_y)].index
     target = view_df.loc[target_indices].copy()
     
     if not target.empty:
         with st.form("new_hire_form"):
             edited_target = st.data_editor(
-                target[['신규교육_이수','퇴사여부','성명','입사일','부서','담당관리감독자']],
+                to_editor(target, ['신규교육_이수','퇴사여부','성명','입사일','부서','담당관리감독자']),
                 hide_index=True, use_container_width=True,
                 key="new_edu_editor",
                 column_config={
@@ -506,18 +859,15 @@ with tab3:
                 }
             )
             if st.form_submit_button("변경사항 적용"):
-                st.session_state.df_final.loc[target_indices, '신규교육_이수'] = edited_target['신규교육_이수']
-                if "new_edu_editor" in st.session_state: del st.session_state["new_edu_editor"]
-                st.rerun()
+                apply_editor_patch("new_edu_editor", target_indices, ['신규교육_이수'])
+                rerun("new_hire_form", scope="fragment")
     else: st.info("대상자 없음")
 
-with tab4:
+@tab_fragment("special_edu")
+def special_edu_tab(view_df, active_df):
     st.subheader("특별안전보건교육 이수 관리")
     
-    target_indices = active_df[
-        (active_df['특별교육_과목1'] != '해당없음') & 
-        (active_df['특수검진_대상'] == True)
-    ].index
+    target_indices = active_df[special_edu_mask(active_df)].index
     target = active_df.loc[target_indices].copy()
     
     if not target.empty:
@@ -525,7 +875,7 @@ with tab4:
         
         with st.form("special_edu_form"):
             edited_target = st.data_editor(
-                target[cols_to_show],
+                to_editor(target, cols_to_show),
                 hide_index=True, use_container_width=True,
                 key="special_edu_editor",
                 column_config={
@@ -542,23 +892,23 @@ with tab4:
             )
             if st.form_submit_button("변경사항 적용"):
                 check_cols = ['공통8H','과목1_온라인4H','과목1_감독자4H','과목2_온라인4H','과목2_감독자4H']
-                st.session_state.df_final.loc[target_indices, check_cols] = edited_target[check_cols]
-                if "special_edu_editor" in st.session_state: del st.session_state["special_edu_editor"]
-                st.rerun()
+                apply_editor_patch("special_edu_editor", target_indices, check_cols)
+                rerun("special_edu_form", scope="fragment")
     else: st.info("특별교육 대상자가 없습니다. (검진대상 체크 여부 확인)")
 
-with tab5:
+@tab_fragment("health")
+def health_tab(view_df, active_df):
     st.subheader("특수건강검진 현황")
     
-    target_indices = active_df[active_df['특수검진_대상'] == True].index
+    target_indices = active_df[health_mask(active_df)].index
     target = active_df.loc[target_indices].copy()
     
     if not target.empty:
-        target['상태'] = target.apply(lambda r: "🔴 검진필요" if r['검진단계']=="배치전(미실시)" else get_dday_status(r['다음_특수검진일']), axis=1)
+        target['상태'] = read_status('특수검진', target, lambda t: health_status(t, today, soon_days))
         
         with st.form("health_form"):
             edited_target = st.data_editor(
-                target[['성명','부서','유해인자','검진단계','최근_특수검진일','다음_특수검진일','상태']],
+                to_editor(target, ['성명','부서','유해인자','검진단계','최근_특수검진일','다음_특수검진일','상태']),
                 use_container_width=True,
                 hide_index=True,
                 key="health_editor_fix",
@@ -570,11 +920,72 @@ with tab5:
                 }
             )
             if st.form_submit_button("변경사항 적용"):
-                compare_cols = ['검진단계', '최근_특수검진일']
-                if '최근_특수검진일' in edited_target.columns:
-                    edited_target['최근_특수검진일'] = pd.to_datetime(edited_target['최근_특수검진일'])
-                st.session_state.df_final.loc[target_indices, compare_cols] = edited_target[compare_cols]
-                if "health_editor_fix" in st.session_state: del st.session_state["health_editor_fix"]
-                st.rerun()
+                apply_editor_patch("health_editor_fix", target_indices, ['검진단계', '최근_특수검진일'])
+                rerun("health_form", scope="fragment")
     else: 
         st.info("대상자가 없습니다.")
+
+@tab_fragment("deadlines")
+def deadlines_tab(view_df, active_df):
+    st.subheader("다가오는 교육/검진 기한 (지난 기한 포함)")
+    job = status_job(get_store().name)
+    snapshot = job.current
+    if snapshot is not None and snapshot.day == today and not snapshot.delta.empty:
+        with st.expander(f"📣 전날보다 새로 임박/초과가 된 대상 {len(snapshot.delta)}건 (전체 명부)"):
+            st.dataframe(snapshot.delta, use_container_width=True, hide_index=True,
+                         column_config={"기한": st.column_config.DateColumn(format="YYYY-MM-DD")})
+    if job.last_error is not None: st.caption(f"상태표 작업/알림 오류: {job.last_error}")
+    c1, c2 = st.columns([1, 2])
+    horizon = c1.radio("기간", [30, 60, 90], horizontal=True, format_func=lambda d: f"{d}일 이내", key="deadline_days")
+    kinds = c2.multiselect("구분", REPORT_KINDS, default=REPORT_KINDS, key="deadline_kinds")
+    deadlines = upcoming_deadlines(view_df, st.session_state._due_index[1], today, horizon, kinds, soon_days)
+
+    if not deadlines.empty:
+        overdue = int((deadlines['D-day'] < 0).sum())
+        st.caption(f"전체 {len(deadlines)}건 · 초과 {overdue}건 · {horizon}일 이내 {len(deadlines) - overdue}건")
+        st.dataframe(deadlines, use_container_width=True, hide_index=True,
+                     column_config={"기한": st.column_config.DateColumn(format="YYYY-MM-DD")})
+
+        # 오늘부터 기간 끝까지의 달력 (월별 건수)
+        end = pd.Timestamp(today) + pd.Timedelta(days=horizon)
+        months = pd.period_range(pd.Timestamp(today), end, freq='M')
+        month = st.selectbox("달력", months, format_func=lambda m: f"{m.year}년 {m.month}월", key="deadline_month")
+        st.dataframe(deadline_calendar(deadlines[deadlines['D-day'] >= 0], month.year, month.month), use_container_width=True, hide_index=True)
+    else: st.info("기간 안에 기한이 돌아오는 대상자가 없습니다.")
+
+@tab_fragment("trends")
+def trends_tab(view_df, active_df):
+    st.subheader("저장 이력으로 본 준수율 추세 (전체 명부)")
+    repo = get_github_repo()
+    if repo is None:
+        st.info("GitHub 레포를 연결하면 저장(커밋) 이력으로 부서·의무별 준수율 추세를 봅니다.")
+        return
+    # 처음 보는 커밋만 받아서 계산하고, 나머지는 레포별 집계 캐시에서 읽음
+    bar = st.empty()
+    progress = lambda done, total: bar.progress(done / total, text=f"이력 계산 중 {done}/{total}")
+    try:
+        with trace.span("trends:update"):
+            trend = compliance_trend(GithubHistory(repo), trend_cache(REPO_NAME), progress)
+    except Exception as e:
+        st.error(f"저장 이력을 읽지 못했습니다: {e}")
+        return
+    finally: bar.empty()
+    if trend.empty:
+        st.info("data.csv 가 저장된 커밋이 없습니다.")
+        return
+
+    c1, c2 = st.columns([1, 2])
+    metric = c1.selectbox("지표", list(TREND_METRICS), key="trend_metric")
+    depts = c2.multiselect("부서", sorted(trend['부서'].unique()), key="trend_depts")
+    description, higher_is_better = TREND_METRICS[metric]
+    st.caption(f"{description} ({'높을수록' if higher_is_better else '낮을수록'} 좋음) · 커밋 {trend['커밋'].nunique()}개, 커밋 날짜 기준")
+    rates = trend_rates(trend, metric, depts)
+    st.line_chart(rates, y_label="%")
+    with st.expander("표로 보기"):
+        st.dataframe(rates.sort_index(ascending=False), use_container_width=True)
+
+for tab, render in zip([tab1, tab2, tab3, tab4, tab5, tab6, tab7], [manager_tab, waste_tab, new_hire_tab, special_edu_tab, health_tab, deadlines_tab, trends_tab]):
+    if tab.open:
+        with tab: render()
+
+render_trace_panel(df_final=st.session_state.df_final, df=df, view_df=view_df)
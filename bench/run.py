@@ -0,0 +1,181 @@
+"""대시보드 파이프라인 단계별 시간/메모리 측정.
+
+    python -m bench.run --sizes 1000,10000 -o before.json
+    python -m bench.run --sizes 1000,10000 -o after.json --compare before.json
+
+단계마다 입력은 측정 밖에서 새로 준비하고, 시간은 repeat 번 잰 중앙값/최솟값,
+메모리는 tracemalloc 으로 따로 한 번 실행해 잰 최대 할당량(peak_bytes)이다.
+결과는 JSON 으로 저장하며 --compare 로 이전 결과와 단계별 비율을 비교한다.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from safety_core import (
+    DUE_SOON_DAYS, DeptRules, DueIndex, RosterIndex, build_main_frame, compact_roster, dday_status, derive_compliance, ensure_roster_schema,
+    expand_flags, health_status, roster_files, roster_from_csv, sanitize_config_df, select_labels, snapshot_available,
+    status_table, upcoming_deadlines, write_csv, write_xlsx,
+)
+from safety_core.reports import active_mask, manager_mask, waste_mask, hire_year_mask, special_edu_mask, health_mask
+
+from .synth import ROOT, load_samples, synth_roster
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _tab(mask, status=None):
+    def run(frame, today):
+        active = frame[active_mask(frame)]
+        target = active[mask(active)].copy()
+        if status is not None: target['상태'] = status(target, today)
+        return target
+    return run
+
+
+def build_stages(raw, config, today):
+    """(단계 이름, 입력 준비 함수, 측정할 함수) 목록. 준비 함수의 시간은 재지 않는다."""
+    csv_bytes = raw.to_csv(index=False).encode('utf-8')
+    typed = ensure_roster_schema(raw.copy())
+    depts = config['부서명']
+    compact = compact_roster(typed, depts)
+    rules = DeptRules.compile(config)
+    mapped = rules.apply(expand_flags(compact))
+    frame = build_main_frame(compact, rules, today)
+    index = RosterIndex.build(compact)
+    due_index = DueIndex.build(frame)
+    top_dept = compact['부서'].value_counts().index[0]
+
+    def search():
+        labels = index.filter(name='김', 부서=[top_dept], 직책=['일반근로자'])
+        return select_labels(frame, labels)
+
+    stages = [
+        ('parse_csv', lambda: (csv_bytes,), roster_from_csv),
+        ('sanitize_config_df', lambda: (config.copy(),), sanitize_config_df),
+        ('coerce_schema', lambda: (raw.copy(),), ensure_roster_schema),
+        ('compact_roster', lambda: (typed, depts), compact_roster),
+        ('dept_rules_compile', lambda: (config,), DeptRules.compile),
+        ('dept_rules_apply', lambda: (expand_flags(compact),), rules.apply),
+        ('derive_compliance', lambda: (mapped.copy(), today), derive_compliance),
+        ('build_main_frame', lambda: (compact, rules, today), build_main_frame),
+        ('search_index_build', lambda: (compact,), RosterIndex.build),
+        ('search_filter', lambda: (), search),
+        ('tab_manager', lambda: (frame, today), _tab(manager_mask, lambda t, d: dday_status(t['다음_직무교육일'], d))),
+        ('tab_waste', lambda: (frame, today), _tab(waste_mask, lambda t, d: dday_status(t['다음_직무교육일'], d))),
+        ('tab_new_hire', lambda: (frame, today), lambda f, d: f[hire_year_mask(f, d.year)]),
+        ('tab_special_edu', lambda: (frame, today), _tab(special_edu_mask)),
+        ('tab_health', lambda: (frame, today), _tab(health_mask, health_status)),
+        ('due_index_build', lambda: (frame,), DueIndex.build),
+        ('due_upcoming_90d', lambda: (frame, due_index, today, 90), upcoming_deadlines),
+        ('status_table', lambda: (frame, today), status_table),
+        ('serialize_csv', lambda: (compact, config), roster_files),
+        ('export_xlsx', lambda: (io.BytesIO(), frame, today), write_xlsx),
+        ('export_csv_gz', lambda: (io.BytesIO(), frame, '특수검진', today, DUE_SOON_DAYS, True), write_csv),
+    ]
+    if snapshot_available():
+        stages.append(('serialize_snapshot', lambda: (compact, config, True), roster_files))
+    return stages
+
+
+def measure(setup, fn, repeat):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    args = setup()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'repeat': repeat, 'peak_bytes': peak}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat=3, seed=0, today=None, stages=None, log=sys.stderr):
+    data, config = load_samples()
+    today = today or date.today()
+    results = []
+    for n in sizes:
+        raw = synth_roster(n, data, seed)
+        for name, setup, fn in build_stages(raw, config, today):
+            if stages and name not in stages: continue
+            result = measure(setup, fn, repeat if n < 1_000_000 else 1)
+            results.append({'rows': n, 'stage': name, **result})
+            print(f"{n:>9,} {name:<20} {result['median_s'] * 1000:10.2f} ms {result['peak_bytes'] / 2**20:9.1f} MiB", file=log)
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git': _git_revision(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'today': today.isoformat(),
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(base, current, threshold):
+    """(rows, stage) 별 중앙값 비율. threshold 를 넘는 단계 목록을 돌려준다."""
+    before = {(r['rows'], r['stage']): r for r in base['results']}
+    regressions = []
+    for r in current['results']:
+        old = before.get((r['rows'], r['stage']))
+        if not old or not old['median_s']: continue
+        ratio = r['median_s'] / old['median_s']
+        mem = r['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('nan')
+        flag = " <-" if ratio > threshold else ""
+        print(f"{r['rows']:>9,} {r['stage']:<20} 시간 x{ratio:5.2f}  메모리 x{mem:5.2f}{flag}", file=sys.stderr)
+        if ratio > threshold: regressions.append((r['rows'], r['stage'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="파이프라인 단계별 벤치마크")
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)), help="쉼표로 구분한 명부 크기")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--today', type=date.fromisoformat, default=None)
+    parser.add_argument('--stage', action='append', help="측정할 단계만 지정 (여러 번 가능)")
+    parser.add_argument('-o', '--output', default=None, help="결과 JSON 경로 (기본: 표준 출력)")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument('--threshold', type=float, default=1.25, help="이 비율보다 느려지면 회귀로 보고 종료 코드 1")
+    args = parser.parse_args(argv)
+
+    report = run([int(s) for s in args.sizes.split(',') if s], args.repeat, args.seed, args.today, args.stage)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f: base = json.load(f)
+        return 1 if compare(base, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
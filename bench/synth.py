@@ -0,0 +1,88 @@
+"""data.csv/config.csv 의 스키마와 값 분포를 따라 임의 크기의 명부를 만든다.
+
+    python -m bench.synth 100000 -o /tmp/data_100k.csv
+
+- 직책/부서/검진단계 등 문자열 컬럼: 원본의 값 빈도대로 뽑는다 (빈 값 비율 포함).
+- 날짜 컬럼: 원본 날짜 하나를 고른 뒤 ±DATE_JITTER_DAYS 일 흔들고, 빈 값 비율을 유지한다.
+- 체크박스 컬럼: 원본의 참 비율과 빈 값 비율을 유지한다.
+- 성명: 원본 성명의 첫 글자(성)와 나머지 글자를 섞어 만든다.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from safety_core import DATE_COLS, sanitize_config_df
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATE_JITTER_DAYS = 180
+
+
+def load_samples(data_path=None, config_path=None):
+    data = pd.read_csv(data_path or os.path.join(ROOT, "data.csv"))
+    config = sanitize_config_df(pd.read_csv(config_path or os.path.join(ROOT, "config.csv")))
+    return data, config
+
+
+def _pick(rng, values, n):
+    counts = values.value_counts(dropna=False)
+    return rng.choice(counts.index.to_numpy(dtype=object), size=n, p=(counts / counts.sum()).to_numpy())
+
+
+def _names(rng, names, n):
+    names = names.dropna().astype(str)
+    names = names[names.str.len() >= 2]
+    surnames = names.str[0].to_numpy(dtype=object)
+    given = names.str[1:].to_numpy(dtype=object)
+    first = rng.choice(surnames, size=n)
+    second = rng.choice(given, size=n)
+    return pd.Series(first + second, dtype=object)
+
+
+def _dates(rng, values, n):
+    parsed = pd.to_datetime(values, errors='coerce')
+    present = parsed.dropna().to_numpy(dtype='datetime64[D]')
+    if len(present) == 0: return pd.Series([None] * n, dtype=object)
+    picked = rng.choice(present, size=n) + rng.integers(-DATE_JITTER_DAYS, DATE_JITTER_DAYS + 1, size=n).astype('timedelta64[D]')
+    out = pd.Series(pd.to_datetime(picked).strftime('%Y-%m-%d'), dtype=object)
+    return out.where(rng.random(n) >= parsed.isna().mean(), None)
+
+
+def _flags(rng, values, n):
+    missing = values.isna().mean()
+    rate = values.dropna().astype(bool).mean() if values.notna().any() else 0.0
+    out = pd.Series(rng.random(n) < rate, dtype=object)
+    return out.where(rng.random(n) >= missing, None) if missing else out.astype(bool)
+
+
+def synth_roster(n, data, seed=0):
+    """data 와 같은 컬럼/분포를 가진 n 명의 명부 (CSV 로 읽은 것과 같은 문자열 날짜)."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for col in data.columns:
+        values = data[col]
+        if col == '성명':
+            columns[col] = _names(rng, values, n)
+        elif col in DATE_COLS:
+            columns[col] = _dates(rng, values, n)
+        elif pd.api.types.is_bool_dtype(values) or pd.api.types.infer_dtype(values, skipna=True) == 'boolean':
+            columns[col] = _flags(rng, values, n)
+        else:
+            columns[col] = pd.Series(_pick(rng, values, n), dtype=object)
+    return pd.DataFrame(columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.synth", description="합성 명부 생성")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', default=None, help="분포를 따올 명부 (기본: 저장소의 data.csv)")
+    args = parser.parse_args(argv)
+    data, _ = load_samples(args.data)
+    synth_roster(args.rows, data, args.seed).to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+from .compliance import (
+    SPECIAL_EDU_OPTIONS, ROLES, HEALTH_PHASES, DUE_SOON_DAYS,
+    derive_compliance, apply_dept_config, build_main_frame, refresh_main_frame, dday_status, health_status,
+)
+from .cache import FrameCache, frame_fingerprint
+from .rules import DeptRules, sanitize_config_df
+from .schema import DATE_COLS, BOOL_COLS, BOOL_DEFAULTS, ensure_roster_schema
+from .patch import RosterPatch, apply_editor_delta
+from .github_store import (
+    DATA_FILE, CONFIG_FILE, BlobCache, blob_sha,
+    roster_to_csv, config_to_csv, roster_from_csv, config_from_csv, roster_files,
+    commit_files, list_blob_shas, load_files, load_roster_files, StaleBaseError, retry_after,
+)
+from .snapshot import SNAPSHOT_FILE, snapshot_available, roster_to_snapshot, roster_from_snapshot
+from .compact import (
+    FLAGS_COL, compact_roster, expand_roster, expand_flags, to_editor, concat_rosters, memory_report,
+)
+from .name_index import RosterIndex, choseong, select_labels
+from .paging import PAGE_SIZES, page_window
+from .importer import ImportSummary, iter_upload_chunks, upsert_roster
+from .reports import (
+    REPORT_KINDS, active_mask, manager_mask, waste_mask, hire_year_mask, special_edu_mask, health_mask,
+    dashboard_counts, iter_statuses, iter_reports, site_report,
+)
+from .sites import SITES_ROOT_ENV, SiteSource, SiteShard, SiteShards, parse_sources, merge_counts, merge_tabs
+from .deadlines import SPECIAL_EDU_DAYS, DueIndex, due_dates, upcoming_deadlines, deadline_calendar
+from .journal import JOURNAL_DIR, ChangeJournal, load_roster_journaled, replay
+from .store import RosterStore, ConflictError
+from .saver import SaveStatus, WriteBehindSaver
+from .export import ExportSheet, export_sheets, write_xlsx, write_csv
+from .materialize import SmtpNotifier, StatusMaterializer, StatusSnapshot, status_table, status_delta
+from .trends import (
+    TREND_METRICS, LocalGitHistory, GithubHistory, TrendCache, compliance_counts, compliance_trend, trend_rates,
+)
+from .telemetry import RunTrace, frame_size, peak_rss_bytes, append_jsonl
@@ -0,0 +1,100 @@
+"""명부 기한 보고서 배치 실행.
+
+    python -m safety_core 사업장A/ 사업장B/ -o report.csv
+    python -m safety_core data.csv,config.csv --today 2025-01-01 --format jsonl
+
+사업장은 data.csv/config.csv 가 든 디렉터리 또는 "명부파일,설정파일" 쌍으로 지정한다.
+여러 사업장은 프로세스 풀에서 나눠 계산하고, 끝나는 순서대로 결과를 바로 써 내보낸다.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from .compliance import DUE_SOON_DAYS
+from .github_store import DATA_FILE, CONFIG_FILE
+from .reports import REPORT_KINDS, REPORT_COLUMNS, site_report
+
+OUTPUT_COLUMNS = ['사업장'] + REPORT_COLUMNS
+
+
+def parse_site(spec):
+    """사업장 지정 → (이름, 명부 경로, 설정 경로)."""
+    if os.path.isdir(spec):
+        return os.path.basename(os.path.abspath(spec)), os.path.join(spec, DATA_FILE), os.path.join(spec, CONFIG_FILE)
+    data_path, sep, config_path = spec.partition(',')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"디렉터리 또는 '명부,설정' 쌍이어야 합니다: {spec}")
+    name = os.path.basename(os.path.dirname(os.path.abspath(data_path))) or os.path.splitext(os.path.basename(data_path))[0]
+    return name, data_path, config_path
+
+
+def _cell(value):
+    if value is None or value != value: return ""   # None, NaN, NaT
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else value
+
+
+def _run(site, today, soon_days, kinds):
+    name, data_path, config_path = site
+    return name, site_report(data_path, config_path, today, soon_days, kinds).to_dict('records')
+
+
+class ReportWriter:
+    def __init__(self, stream, fmt):
+        self.stream, self.fmt, self.rows = stream, fmt, 0
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(stream, fieldnames=OUTPUT_COLUMNS)
+            self._csv.writeheader()
+
+    def write(self, site, records):
+        for record in records:
+            row = {'사업장': site, **{col: _cell(record.get(col)) for col in REPORT_COLUMNS}}
+            if self.fmt == 'csv': self._csv.writerow(row)
+            else: self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self.rows += 1
+        self.stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m safety_core", description="사업장별 교육/검진 초과·임박 대상자 보고서")
+    parser.add_argument('sites', nargs='+', type=parse_site, metavar='SITE', help="data.csv/config.csv 가 든 디렉터리 또는 '명부,설정' 경로 쌍")
+    parser.add_argument('-o', '--output', default='-', help="결과 파일 (기본: 표준 출력)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    parser.add_argument('--today', type=date.fromisoformat, default=None, help="기준일 YYYY-MM-DD (기본: 오늘)")
+    parser.add_argument('--soon-days', type=int, default=DUE_SOON_DAYS, help="임박으로 볼 남은 일수")
+    parser.add_argument('--kind', action='append', choices=REPORT_KINDS, help="보고서 구분 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="동시에 계산할 사업장 수 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    today = args.today or date.today()
+    kinds = args.kind or REPORT_KINDS
+    jobs = min(args.jobs or os.cpu_count() or 1, len(args.sites))
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8-sig' if args.format == 'csv' else 'utf-8')
+    failed = 0
+    try:
+        writer = ReportWriter(out, args.format)
+        if jobs <= 1:
+            for site in args.sites:
+                try: writer.write(*_run(site, today, args.soon_days, kinds))
+                except Exception as e:
+                    failed += 1
+                    print(f"{site[0]}: {e}", file=sys.stderr)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {pool.submit(_run, site, today, args.soon_days, kinds): site for site in args.sites}
+                for future in as_completed(futures):
+                    try: writer.write(*future.result())
+                    except Exception as e:
+                        failed += 1
+                        print(f"{futures[future][0]}: {e}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout: out.close()
+    print(f"{len(args.sites) - failed}/{len(args.sites)}개 사업장, {writer.rows}건", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
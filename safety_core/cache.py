@@ -0,0 +1,44 @@
+"""Streamlit 재실행 사이에 파생 프레임을 재사용하기 위한 지문(fingerprint)과 LRU 캐시."""
+import hashlib
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_fingerprint(df):
+    """컬럼 구성과 모든 셀 값(인덱스 포함)으로 만든 내용 해시."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class FrameCache:
+    """최대 maxsize개를 보관하고, 넘치면 가장 오래 쓰지 않은 항목부터 버린다."""
+
+    def __init__(self, maxsize=2):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        if key not in self._entries: return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        self._entries.clear()
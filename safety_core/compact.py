@@ -0,0 +1,133 @@
+"""메모리를 적게 쓰는 명부 표현.
+
+코드표로 정해진 컬럼(직책, 부서, 검진단계 및 부서설정에서 온 파생 컬럼)은 범주형으로,
+8개의 체크박스 컬럼은 uint8 하나(FLAGS_COL)의 비트로 보관한다. 화면의 에디터와
+CSV/스냅숏 저장은 펼친(expanded) 형태를 쓰므로, 그 경계에서만 변환한다.
+"""
+import numpy as np
+import pandas as pd
+
+from .schema import ROLES, HEALTH_PHASES, BOOL_COLS, ensure_roster_schema
+
+FLAGS_COL = '플래그'
+FLAG_BITS = {col: np.uint8(1 << i) for i, col in enumerate(BOOL_COLS)}
+CODE_COLS = {'직책': ROLES, '검진단계': HEALTH_PHASES, '부서': []}
+
+
+def is_compact(df):
+    return FLAGS_COL in df.columns
+
+
+def logical_columns(df):
+    """펼쳤을 때의 컬럼 이름 (FLAGS_COL 자리에 체크박스 컬럼들)."""
+    if not is_compact(df): return list(df.columns)
+    cols = [c for c in df.columns if c != FLAGS_COL]
+    return cols + [c for c in BOOL_COLS if c not in cols]
+
+
+def as_category(values, base=()):
+    """base 순서를 앞에 두고, 그 밖의 값은 뒤에 붙인 범주형."""
+    values = pd.Series(values).astype(object)
+    values = values.where(values.isna(), values.astype(str))
+    base = list(dict.fromkeys(base))
+    extra = sorted(set(pd.unique(values.dropna())) - set(base))
+    return values.astype(pd.CategoricalDtype(base + extra))
+
+
+def pack_flags(df):
+    flags = np.zeros(len(df), dtype=np.uint8)
+    for col, bit in FLAG_BITS.items():
+        flags |= np.where(df[col].to_numpy(dtype=bool), bit, np.uint8(0))
+    return flags
+
+
+def compact_roster(df, depts=()):
+    """명부를 범주형 + 비트 플래그 형태로 바꾼다. 이미 압축된 프레임은 범주만 보강한다."""
+    if not is_compact(df):
+        df = ensure_roster_schema(df.copy())
+        df[FLAGS_COL] = pack_flags(df)
+        df = df.drop(columns=BOOL_COLS)
+    for col, base in CODE_COLS.items():
+        if col not in df.columns: continue
+        base = list(depts) if col == '부서' else base
+        current = df[col].dtype
+        if isinstance(current, pd.CategoricalDtype) and set(base) <= set(current.categories): continue
+        df[col] = as_category(df[col], base)
+    return df
+
+
+def expand_flags(df):
+    """FLAGS_COL 을 체크박스(bool) 컬럼들로 펼친다. 범주형 컬럼은 그대로 둔다."""
+    if not is_compact(df): return df
+    flags = df[FLAGS_COL].to_numpy()
+    df = df.drop(columns=[FLAGS_COL])
+    for col, bit in FLAG_BITS.items():
+        df[col] = (flags & bit) != 0
+    return df
+
+
+def expand_roster(df):
+    """저장/에디터용으로 완전히 펼친 명부 (범주형 → 문자열, 플래그 → bool 컬럼)."""
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if not cats: return expand_flags(df)
+    df = expand_flags(df) if is_compact(df) else df.copy()
+    for col in cats: df[col] = df[col].astype(object)
+    return df
+
+
+def to_editor(df, columns=None):
+    """st.data_editor 에 넘길 프레임. 필요한 컬럼만 펼친다."""
+    if columns is not None:
+        picked = [c for c in columns if c in df.columns]
+        if is_compact(df) and any(c in FLAG_BITS for c in columns): picked.append(FLAGS_COL)
+        df = df[picked]
+    df = expand_roster(df)
+    return df[columns] if columns is not None else df
+
+
+def get_cell(df, label, col):
+    if col in FLAG_BITS and is_compact(df):
+        return bool(df.at[label, FLAGS_COL] & FLAG_BITS[col])
+    return df.at[label, col]
+
+
+def set_cell(df, label, col, value):
+    """셀 하나를 바꾼다. 범주에 없는 값이면 범주를 늘리고, 체크박스는 해당 비트만 바꾼다."""
+    if col in FLAG_BITS and is_compact(df):
+        current = df.at[label, FLAGS_COL]
+        df.at[label, FLAGS_COL] = (current | FLAG_BITS[col]) if value else (current & ~FLAG_BITS[col])
+        return
+    dtype = df[col].dtype
+    if isinstance(dtype, pd.CategoricalDtype) and not pd.isna(value) and value not in dtype.categories:
+        df[col] = df[col].cat.add_categories([value])
+    df.at[label, col] = value
+
+
+def align_categories(a, b):
+    """두 프레임에서 모두 범주형인 컬럼의 범주를 합쳐, 이어붙이거나 값을 옮길 수 있게 한다."""
+    for col in a.columns.intersection(b.columns):
+        da, db = a[col].dtype, b[col].dtype
+        if not (isinstance(da, pd.CategoricalDtype) and isinstance(db, pd.CategoricalDtype)): continue
+        missing_a = [c for c in db.categories if c not in da.categories]
+        missing_b = [c for c in da.categories if c not in db.categories]
+        if missing_a: a[col] = a[col].cat.add_categories(missing_a)
+        if missing_b or missing_a: b[col] = b[col].cat.set_categories(a[col].cat.categories)
+    return a, b
+
+
+def concat_rosters(a, b):
+    """압축된 명부 두 개를 범주형을 유지한 채 이어붙인다."""
+    a, b = align_categories(a.copy(), b.copy())
+    return pd.concat([a, b])
+
+
+def memory_report(df):
+    """펼친 형태와 압축 형태의 전체 바이트 수와 근로자 1인당 바이트 수."""
+    expanded = expand_roster(df).memory_usage(index=True, deep=True).sum()
+    compact = compact_roster(df).memory_usage(index=True, deep=True).sum()
+    rows = max(len(df), 1)
+    return {
+        'rows': len(df),
+        'expanded_bytes': int(expanded), 'compact_bytes': int(compact),
+        'expanded_per_worker': expanded / rows, 'compact_per_worker': compact / rows,
+    }
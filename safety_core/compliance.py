@@ -0,0 +1,148 @@
+"""근로자 명부의 파생 컬럼(다음 교육/검진일, 상태)을 컬럼 단위로 계산한다.
+
+행 단위 df.apply 대신 직책→주기 조회표와 datetime64 배열 연산을 사용하며,
+기준일(today)은 호출 시 한 번만 정해서 모든 행에 공통으로 적용한다.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .compact import is_compact, expand_flags, align_categories
+from .rules import DeptRules
+from .schema import SPECIAL_EDU_OPTIONS, ROLES, HEALTH_PHASES, DATE_COLS
+
+# 직책 키워드 → 직무교육 주기(일). 위에서부터 먼저 포함되는 키워드를 적용
+JOB_TRAINING_CYCLES = [('책임자', 730), ('폐기물', 1095), ('감독자', 365)]
+FIRST_HEALTH_CYCLE = 180
+REGULAR_HEALTH_CYCLE = 365
+NEW_HIRE_DAYS = 90
+DUE_SOON_DAYS = 30
+
+_DAY = np.timedelta64(1, 'D')
+_NAT = np.datetime64('NaT', 'ns')
+
+
+def _today64(today):
+    if today is None: today = date.today()
+    return pd.Timestamp(today).normalize().to_datetime64().astype('datetime64[ns]')
+
+
+def _dates(values):
+    return pd.to_datetime(pd.Series(values), errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+
+def _flags(values, default):
+    return pd.Series(values).fillna(default).astype(bool).to_numpy()
+
+
+def _role_cycle(role):
+    role = str(role).replace(" ", "").strip()
+    for keyword, days in JOB_TRAINING_CYCLES:
+        if keyword in role: return days
+    return np.nan
+
+
+def job_training_cycle_days(roles):
+    # 직책 종류는 몇 개뿐이므로 고유값에 대해서만 키워드를 판별하고 코드로 펼친다
+    codes, uniques = pd.factorize(pd.Series(roles), use_na_sentinel=False)
+    table = np.array([_role_cycle(r) for r in uniques], dtype=float)
+    return table[codes]
+
+
+def _add_cycle(start, cycle):
+    has_cycle = ~np.isnan(cycle)
+    offset = np.where(has_cycle, cycle, 0).astype('int64') * _DAY
+    return np.where(has_cycle, start + offset, _NAT)
+
+
+def next_job_training_date(df):
+    return pd.Series(_add_cycle(_dates(df['최근_직무교육일']), job_training_cycle_days(df['직책'])), index=df.index)
+
+
+def next_health_date(df):
+    phase = df['검진단계']
+    is_target = _flags(df['특수검진_대상'], True) if '특수검진_대상' in df.columns else np.ones(len(df), dtype=bool)
+    cycle = np.select(
+        [(phase == HEALTH_PHASES[0]).to_numpy(dtype=bool, na_value=False) | ~is_target,
+         (phase == HEALTH_PHASES[1]).to_numpy(dtype=bool, na_value=False)],
+        [np.nan, FIRST_HEALTH_CYCLE],
+        REGULAR_HEALTH_CYCLE
+    ).astype(float)
+    return pd.Series(_add_cycle(_dates(df['최근_특수검진일']), cycle), index=df.index)
+
+
+def is_legal_new_hire(hire_dates, today=None):
+    hired = _dates(hire_dates)
+    return ~np.isnat(hired) & ((_today64(today) - hired) < NEW_HIRE_DAYS * _DAY)
+
+
+def dday_status(target_dates, today=None, soon_days=DUE_SOON_DAYS):
+    target = _dates(target_dates)
+    diff = target - _today64(today)
+    status = np.select(
+        [np.isnat(target), diff < 0 * _DAY, diff < soon_days * _DAY],
+        ["-", "🔴 초과", "🟡 임박"],
+        "🟢 양호"
+    )
+    index = target_dates.index if isinstance(target_dates, pd.Series) else None
+    return pd.Series(status, index=index, dtype=object)
+
+
+def health_status(df, today=None, soon_days=DUE_SOON_DAYS):
+    not_done = (df['검진단계'] == HEALTH_PHASES[0]).to_numpy(dtype=bool, na_value=False)
+    status = dday_status(df['다음_특수검진일'], today, soon_days)
+    return status.where(~not_done, "🔴 검진필요")
+
+
+def derive_compliance(df, today=None):
+    """입사일/직책/검진 정보로 법적 신규자 여부와 다음 직무교육일·특수검진일을 채운다."""
+    df['입사일_dt'] = pd.to_datetime(df['입사일'], errors='coerce')
+    df['입사연도'] = df['입사일_dt'].dt.year.astype(float)
+    df['법적_신규자'] = is_legal_new_hire(df['입사일_dt'], today)
+    df['다음_직무교육일'] = next_job_training_date(df)
+    df['다음_특수검진일'] = next_health_date(df)
+    return df
+
+
+def apply_dept_config(df, dept_config):
+    """부서 설정(특별교육 과목, 유해인자, 담당 관리감독자)을 부서명 기준으로 붙인다.
+
+    dept_config 는 설정 프레임이나 미리 컴파일한 DeptRules 를 받는다.
+    """
+    rules = dept_config if isinstance(dept_config, DeptRules) else DeptRules.compile(dept_config)
+    return rules.apply(df)
+
+
+def build_main_frame(roster, dept_config, today=None):
+    """메인 화면용 파생 프레임: 빈 성명 제거, 날짜 정리, 부서 설정 매핑, 다음 일정 계산.
+
+    roster 는 압축 형태여도 되며, 결과에서는 체크박스 플래그가 bool 컬럼으로 펼쳐진다.
+    """
+    df = expand_flags(roster) if is_compact(roster) else roster.copy()
+    if '성명' in df.columns:
+        df = df.dropna(subset=['성명'])
+        df = df[df['성명'].astype(str).str.strip() != '']
+
+    for col in DATE_COLS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    df = apply_dept_config(df, dept_config)
+    return derive_compliance(df, today)
+
+
+def refresh_main_frame(frame, roster, labels, dept_config, today=None):
+    """labels 행만 다시 계산해 frame 에 덮어쓴다.
+
+    성명이 비거나 새로 채워져 frame 의 행 구성이 달라지는 경우에는 None 을 돌려주며,
+    이때는 build_main_frame 으로 전체를 다시 만들어야 한다.
+    """
+    labels = [label for label in labels if label in roster.index]
+    part = build_main_frame(roster.loc[labels], dept_config, today)
+    if set(frame.index.intersection(labels)) != set(part.index):
+        return None
+    if len(part):
+        frame, part = align_categories(frame, part)
+        frame.loc[part.index, part.columns] = part
+    return frame
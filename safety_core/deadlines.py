@@ -0,0 +1,139 @@
+"""교육/검진 기한의 정렬 색인과 "N일 이내 기한" 조회.
+
+구분(직무교육/특별교육/신규교육/특수검진)별로 (기한 일수, 행 인덱스) 를 정렬된 리스트로
+두고 bisect 로 기간을 잘라 낸다. 일부 행만 바뀌면 그 행의 항목만 빼고 다시 넣으므로
+전체를 다시 정렬하지 않는다. 기한은 build_main_frame 결과에서 재직자만 대상으로 정한다.
+
+- 직무교육: 다음_직무교육일 (책임자/감독자/폐기물 담당자)
+- 특수검진: 다음_특수검진일, 배치전(미실시)이면 배치(입사)일
+- 신규교육: 입사일 (법적 신규자 중 미이수자)
+- 특별교육: 입사일 + SPECIAL_EDU_DAYS (대상자 중 미이수자)
+"""
+import bisect
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .compliance import DUE_SOON_DAYS, dday_status
+from .reports import REPORT_KINDS, _checked, active_mask, manager_mask, waste_mask, special_edu_mask, health_mask, special_edu_status
+from .schema import HEALTH_PHASES
+
+SPECIAL_EDU_DAYS = 90      # 특별교육 잔여 시간은 작업 배치 후 3개월 이내에 나눠 이수
+DEADLINE_COLUMNS = ['구분', '성명', '부서', '직책', '기한', 'D-day', '상태']
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+
+
+def _day(value):
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype('int64'))
+
+
+def due_dates(frame, kind):
+    """구분별 기한 (대상이 아니면 NaT)."""
+    target = active_mask(frame)
+    if kind == '직무교육':
+        target &= manager_mask(frame) | waste_mask(frame)
+        due = frame['다음_직무교육일']
+    elif kind == '특수검진':
+        target &= health_mask(frame)
+        not_done = (frame['검진단계'] == HEALTH_PHASES[0]).fillna(False).astype(bool)
+        due = frame['다음_특수검진일'].where(~not_done, frame['입사일_dt'])
+    elif kind == '신규교육':
+        target &= frame['법적_신규자'].fillna(False).astype(bool) & ~_checked(frame, '신규교육_이수')
+        due = frame['입사일_dt']
+    elif kind == '특별교육':
+        target &= special_edu_mask(frame)
+        target &= special_edu_status(frame) != "🟢 이수"
+        due = frame['입사일_dt'] + pd.Timedelta(days=SPECIAL_EDU_DAYS)
+    else:
+        raise ValueError(f"알 수 없는 기한 구분: {kind}")
+    return pd.to_datetime(due, errors='coerce').where(target)
+
+
+def _due_days(frame, kind):
+    due = due_dates(frame, kind).to_numpy(dtype='datetime64[ns]')
+    present = ~np.isnat(due)
+    return due[present].astype('datetime64[D]').astype('int64'), frame.index[present]
+
+
+class DueIndex:
+    """구분별 기한 정렬 색인. build 로 만들고 update 로 바뀐 행만 고친다."""
+
+    def __init__(self):
+        self._entries = {kind: [] for kind in REPORT_KINDS}   # 구분 → 정렬된 (기한 일수, 행 인덱스)
+        self._due = {kind: {} for kind in REPORT_KINDS}       # 구분 → 행 인덱스 → 기한 일수
+
+    @classmethod
+    def build(cls, frame):
+        index = cls()
+        for kind in REPORT_KINDS:
+            days, labels = _due_days(frame, kind)
+            entries = sorted(zip(days.tolist(), labels.tolist()))
+            index._entries[kind] = entries
+            index._due[kind] = {label: day for day, label in entries}
+        return index
+
+    def copy(self):
+        index = DueIndex()
+        index._entries = {kind: list(entries) for kind, entries in self._entries.items()}
+        index._due = {kind: dict(due) for kind, due in self._due.items()}
+        return index
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def update(self, frame, labels):
+        """labels 행의 기한을 frame 기준으로 다시 넣는다. frame 에 없는 행은 색인에서 빠진다."""
+        labels = list(labels)
+        part = frame.loc[frame.index.intersection(labels)]
+        for kind in REPORT_KINDS:
+            entries, due = self._entries[kind], self._due[kind]
+            for label in labels:
+                day = due.pop(label, None)
+                if day is not None: del entries[bisect.bisect_left(entries, (day, label))]
+            days, found = _due_days(part, kind)
+            for day, label in zip(days.tolist(), found.tolist()):
+                bisect.insort(entries, (day, label))
+                due[label] = day
+
+    def between(self, start=None, end=None, kinds=REPORT_KINDS):
+        """기한이 start 이상 end 이하인 (구분, 기한 일수, 행 인덱스) 목록. None 인 경계는 열어 둔다."""
+        found = []
+        for kind in kinds:
+            entries = self._entries[kind]
+            lo = 0 if start is None else bisect.bisect_left(entries, (_day(start),))
+            hi = len(entries) if end is None else bisect.bisect_left(entries, (_day(end) + 1,))
+            found.extend((kind, day, label) for day, label in entries[lo:hi])
+        return found
+
+
+def upcoming_deadlines(frame, index, today=None, days=DUE_SOON_DAYS, kinds=REPORT_KINDS, soon_days=DUE_SOON_DAYS):
+    """오늘부터 days 일 이내 기한(이미 지난 것 포함)의 대상자 표. frame 에 있는 행만 담는다."""
+    if today is None: today = date.today()
+    found = index.between(end=today + timedelta(days=days), kinds=kinds)
+    found = [entry for entry in found if entry[2] in frame.index]
+    if not found: return pd.DataFrame(columns=DEADLINE_COLUMNS)
+    kind, day, labels = zip(*found)
+    rows = frame.loc[list(labels)]
+    due = pd.Series(pd.to_datetime(np.array(day, dtype='datetime64[D]')), index=rows.index)
+    out = pd.DataFrame({
+        '구분': kind,
+        '성명': rows['성명'].astype(object).to_numpy(),
+        '부서': rows['부서'].astype(object).to_numpy(),
+        '직책': rows['직책'].astype(object).to_numpy(),
+        '기한': due.to_numpy(),
+        'D-day': (due - pd.Timestamp(today)).dt.days.to_numpy(),
+        '상태': dday_status(due, today, soon_days).to_numpy(),
+    }, index=rows.index)
+    return out.sort_values('기한', kind='stable')
+
+
+def deadline_calendar(deadlines, year, month):
+    """upcoming_deadlines 결과를 달력(주 × 요일)으로 센다. 칸은 "일 · n건" 또는 "일"."""
+    due = pd.to_datetime(deadlines['기한'])
+    in_month = due[(due.dt.year == year) & (due.dt.month == month)]
+    counts = in_month.dt.day.value_counts().to_dict()
+    weeks = calendar.Calendar(firstweekday=0).monthdayscalendar(year, month)
+    cells = [[("" if d == 0 else f"{d} · {counts[d]}건" if d in counts else str(d)) for d in week] for week in weeks]
+    return pd.DataFrame(cells, columns=WEEKDAYS)
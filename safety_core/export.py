@@ -0,0 +1,112 @@
+"""점검/감사 제출용 탭별 대상자 내보내기 (XLSX 여러 시트, CSV/gzip CSV).
+
+파생 프레임(build_main_frame 결과)을 chunk_rows 행씩 잘라 조각마다 대상자를 고르고
+값을 바꿔 바로 쓴다. 시트별 대상자 DataFrame 을 따로 만들지 않으므로 명부가 커져도
+메모리는 조각 크기만큼만 쓴다. XLSX 는 openpyxl write_only 모드(행을 임시 파일로
+흘려 씀)로 만든다.
+"""
+import csv
+import gzip
+import io
+from datetime import date
+
+import pandas as pd
+
+from .compact import to_editor
+from .compliance import DUE_SOON_DAYS, dday_status, health_status
+from .reports import (
+    NEW_HIRE_YEARS, TAB_COLUMNS, active_mask, manager_mask, waste_mask, hire_year_mask, special_edu_mask, health_mask,
+    special_edu_status,
+)
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - xlsx 내보내기에만 필요
+    openpyxl = None
+
+CHUNK_ROWS = 5000
+STATUS_COL = '상태'
+
+
+class ExportSheet:
+    """시트 하나: 대상자 조건(select), 컬럼, 상태 컬럼을 만드는 함수(status, 없으면 None)."""
+
+    def __init__(self, name, select, columns, status=None):
+        self.name, self.select, self.columns, self.status = name, select, list(columns), status
+
+    def iter_rows(self, frame, chunk_rows=CHUNK_ROWS):
+        """대상자 행을 튜플로 차례로 돌려준다 (날짜는 date, 빈 값은 None)."""
+        source = [col for col in self.columns if col != STATUS_COL]
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows]
+            target = chunk[self.select(chunk).to_numpy()]
+            if target.empty: continue
+            part = to_editor(target, source)
+            if self.status is not None: part = part.assign(**{STATUS_COL: self.status(target)})
+            yield from zip(*(_python_values(part[col]) for col in self.columns))
+
+
+def _python_values(s):
+    if pd.api.types.is_datetime64_any_dtype(s.dtype): s = s.dt.date
+    s = s.astype(object)
+    return s.where(s.notna(), None).tolist()
+
+
+def export_sheets(today=None, soon_days=DUE_SOON_DAYS):
+    """화면 탭과 같은 대상자의 시트 목록. 신규입사는 입사연도별로 나눈다."""
+    if today is None: today = date.today()
+    active = lambda mask: lambda df: active_mask(df) & mask(df)
+    hire_columns = [col for col in TAB_COLUMNS['신규입사'] if col != '입사연도']
+    sheets = [
+        ExportSheet('책임자감독자', active(manager_mask), TAB_COLUMNS['책임자감독자'], lambda t: dday_status(t['다음_직무교육일'], today, soon_days)),
+        ExportSheet('폐기물', active(waste_mask), TAB_COLUMNS['폐기물'], lambda t: dday_status(t['다음_직무교육일'], today, soon_days)),
+    ]
+    for year in range(today.year, today.year - NEW_HIRE_YEARS, -1):
+        sheets.append(ExportSheet(f'신규입사_{year}', lambda df, year=year: hire_year_mask(df, year), hire_columns))
+    sheets += [
+        ExportSheet('특별교육', active(special_edu_mask), TAB_COLUMNS['특별교육'] + [STATUS_COL], special_edu_status),
+        ExportSheet('특수검진', active(health_mask), TAB_COLUMNS['특수검진'], lambda t: health_status(t, today, soon_days)),
+    ]
+    return sheets
+
+
+def write_xlsx(target, frame, today=None, soon_days=DUE_SOON_DAYS, chunk_rows=CHUNK_ROWS):
+    """시트별 대상자를 XLSX 로 target(경로 또는 바이너리 파일)에 쓰고 {시트: 행 수} 를 돌려준다."""
+    if openpyxl is None:
+        raise ValueError("xlsx 로 내보내려면 openpyxl 이 필요합니다")
+    wb = openpyxl.Workbook(write_only=True)
+    counts = {}
+    for sheet in export_sheets(today, soon_days):
+        ws = wb.create_sheet(sheet.name)
+        ws.freeze_panes = 'A2'
+        ws.append(sheet.columns)
+        counts[sheet.name] = 0
+        for row in sheet.iter_rows(frame, chunk_rows):
+            ws.append(row)
+            counts[sheet.name] += 1
+    wb.save(target)
+    return counts
+
+
+def write_csv(target, frame, sheet_name, today=None, soon_days=DUE_SOON_DAYS, compress=False, chunk_rows=CHUNK_ROWS):
+    """시트 하나를 CSV(엑셀에서 바로 열리도록 UTF-8 BOM)로 target(바이너리 파일)에 쓰고 행 수를 돌려준다.
+
+    compress 면 gzip 으로 압축해 쓴다.
+    """
+    sheets = {sheet.name: sheet for sheet in export_sheets(today, soon_days)}
+    if sheet_name not in sheets: raise ValueError(f"알 수 없는 시트: {sheet_name}")
+    sheet = sheets[sheet_name]
+    raw = gzip.GzipFile(fileobj=target, mode='wb') if compress else target
+    text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    rows = 0
+    try:
+        writer = csv.writer(text)
+        writer.writerow(sheet.columns)
+        for row in sheet.iter_rows(frame, chunk_rows):
+            writer.writerow(row)
+            rows += 1
+    finally:
+        text.flush()
+        text.detach()
+        if compress: raw.close()
+    return rows
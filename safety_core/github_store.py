@@ -0,0 +1,252 @@
+"""GitHub 저장소에 명부/설정 CSV를 저장하고 불러온다.
+
+PyGithub Repository 객체에서 get_git_ref, get_git_commit, get_git_tree, create_git_blob,
+create_git_tree, create_git_commit, create_file, get_contents, get_git_blob 만
+사용하므로 같은 메서드를 가진 가짜 객체로 바꿔 끼워 시험할 수 있다.
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from .compact import expand_roster
+from .rules import sanitize_config_df
+from .schema import HEALTH_PHASES, DATE_COLS
+from .snapshot import SNAPSHOT_FILE, snapshot_available, roster_to_snapshot, roster_from_snapshot, write_snapshot, read_snapshot
+
+try:
+    from github import GithubException, InputGitTreeElement
+except ImportError:  # pragma: no cover - 배치 보고서(CLI)처럼 GitHub 연동 없이 쓰는 경우
+    GithubException = InputGitTreeElement = None
+
+DATA_FILE = "data.csv"
+CONFIG_FILE = "config.csv"
+KEEP_SNAPSHOTS = 32          # BlobCache.prune 가 남기는 쓰지 않는 스냅숏 파일 수
+
+
+def blob_sha(content):
+    """git 이 blob 객체에 매기는 SHA-1 (`git hash-object` 와 동일)."""
+    if isinstance(content, str): content = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _text(data):
+    return data.decode("utf-8") if isinstance(data, bytes) else data
+
+
+def roster_to_csv(df):
+    return df.to_csv(index=False, date_format='%Y-%m-%d')
+
+
+def config_to_csv(df):
+    return df.to_csv(index=False)
+
+
+def roster_from_csv(data):
+    df = pd.read_csv(io.StringIO(_text(data)))
+    for col in DATE_COLS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    if '검진단계' not in df.columns: df['검진단계'] = HEALTH_PHASES[0]
+    else: df['검진단계'] = df['검진단계'].fillna(HEALTH_PHASES[0])
+    return df
+
+
+def config_from_csv(data):
+    return sanitize_config_df(pd.read_csv(io.StringIO(_text(data))))
+
+
+def roster_files(data_df, config_df, snapshot=False):
+    """저장할 {경로: 내용}. snapshot 이면 같은 명부의 Parquet 스냅숏도 함께 넣는다."""
+    data_df = expand_roster(data_df)
+    data_csv = roster_to_csv(data_df)
+    files = {DATA_FILE: data_csv, CONFIG_FILE: config_to_csv(config_df)}
+    if snapshot and snapshot_available():
+        files[SNAPSHOT_FILE] = roster_to_snapshot(data_df, source_sha=blob_sha(data_csv))
+    return files
+
+
+def remote_blob_shas(repo, commit):
+    return {el.path: el.sha for el in repo.get_git_tree(commit.tree.sha, recursive=True).tree if el.type == "blob"}
+
+
+def _tree_element(repo, path, content):
+    if isinstance(content, bytes):
+        # 트리 생성 API 의 content 는 텍스트만 받으므로 바이너리는 blob 을 먼저 만든다
+        blob = repo.create_git_blob(base64.b64encode(content).decode("ascii"), "base64")
+        return InputGitTreeElement(path, "100644", "blob", sha=blob.sha)
+    return InputGitTreeElement(path, "100644", "blob", content=content)
+
+
+class StaleBaseError(ValueError):
+    """저장하려는 변경의 기준 파일이 원격에서 이미 바뀌었다."""
+
+
+def retry_after(error):
+    """다시 시도하면 될 오류(사용량 제한, 서버 오류, 네트워크)면 기다릴 초(모르면 0), 아니면 None."""
+    if GithubException is not None and isinstance(error, GithubException):
+        headers = {key.lower(): value for key, value in (error.headers or {}).items()}
+        if error.status in (403, 429) and ('retry-after' in headers or headers.get('x-ratelimit-remaining') == '0'):
+            if 'retry-after' in headers: return float(headers['retry-after'])
+            return max(float(headers.get('x-ratelimit-reset', 0)) - time.time(), 0)
+        return 0 if error.status is not None and error.status >= 500 else None
+    return 0 if isinstance(error, OSError) else None     # 연결 실패/시간 초과 (requests 예외도 OSError)
+
+
+def commit_files(repo, files, message=None, branch=None, deleted=(), expect=None):
+    """내용이 바뀐 파일만 골라 하나의 커밋(트리 1개, 커밋 1개, ref 갱신 1번)으로 올린다.
+
+    files 는 {경로: 내용(str 또는 bytes)}, deleted 는 함께 지울 경로. 실제로 올리거나
+    지운 경로 목록을 돌려주며, 바뀐 파일이 없으면 빈 목록. expect({경로: blob SHA})를
+    주면 원격의 그 파일이 그 SHA 가 아닐 때 StaleBaseError 를 낸다. SHA 가 None 이면
+    그 파일이 원격에 없어야 한다 (불러온 적 없는 명부로 원격 명부를 덮어쓰지 않음).
+    """
+    branch = branch or repo.default_branch
+    try:
+        ref = repo.get_git_ref(f"heads/{branch}")
+    except GithubException as e:
+        if e.status not in (404, 409): raise
+        missing = [path for path, sha in (expect or {}).items() if sha is not None]
+        if missing: raise StaleBaseError(f"원격에 {', '.join(missing)} 없음")
+        # 커밋이 하나도 없는 빈 저장소: Git Data API 로는 부모 커밋을 만들 수 없으므로 파일 단위로 초기화
+        for path, content in files.items():
+            repo.create_file(path, message or f"Init {path}", content, branch=branch)
+        return list(files)
+
+    head = repo.get_git_commit(ref.object.sha)
+    remote = remote_blob_shas(repo, head)
+    for path, sha in (expect or {}).items():
+        if remote.get(path) != sha: raise StaleBaseError(f"원격 {path} 가 바뀌었습니다" if sha else f"원격에 이미 {path} 가 있습니다")
+    changed = [path for path, content in files.items() if remote.get(path) != blob_sha(content)]
+    removed = [path for path in deleted if path in remote and path not in files]
+    if not changed and not removed: return []
+
+    elements = [_tree_element(repo, path, files[path]) for path in changed]
+    elements += [InputGitTreeElement(path, "100644", "blob", sha=None) for path in removed]
+    tree = repo.create_git_tree(elements, base_tree=head.tree)
+    commit = repo.create_git_commit(message or f"Update {', '.join(changed + removed)}: {datetime.now()}", tree, [head])
+    ref.edit(commit.sha)
+    return changed + removed
+
+
+class BlobCache:
+    """(저장소, 경로) 별로 마지막에 받은 blob SHA 와 파싱 결과를 보관한다. 세션 간에 공유된다.
+
+    directory 를 주면 파싱 결과를 SHA 이름의 스냅숏 파일로도 남겨, 프로세스를 다시
+    띄운 뒤에도 같은 SHA 는 내려받거나 파싱하지 않는다.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory if snapshot_available() else None
+        self._entries = {}
+        self._lock = threading.Lock()
+        if self.directory: os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, sha):
+        return os.path.join(self.directory, f"{sha}.parquet")
+
+    def get(self, key, sha):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == sha: return entry[1]
+        if self.directory and os.path.exists(self._path(sha)):
+            try: value = read_snapshot(self._path(sha))
+            except (OSError, ValueError): return None
+            with self._lock:
+                self._entries[key] = (sha, value)
+            return value
+        return None
+
+    def put(self, key, sha, value):
+        with self._lock:
+            self._entries[key] = (sha, value)
+        if self.directory and not os.path.exists(self._path(sha)):
+            try: write_snapshot(value, self._path(sha))
+            except (OSError, ValueError, TypeError): pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def prune(self, keep=KEEP_SNAPSHOTS):
+        """지금 항목이 가리키지 않는 스냅숏 파일을 지운다. 지운 파일 수를 돌려준다.
+
+        같은 폴더를 다른 저장소(사업장)도 쓸 수 있으므로 최근에 쓴 keep 개는 남긴다.
+        """
+        if not self.directory: return 0
+        with self._lock:
+            live = {f"{sha}.parquet" for sha, _ in self._entries.values()}
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".parquet") and n not in live]
+            names.sort(key=lambda n: os.path.getmtime(os.path.join(self.directory, n)), reverse=True)
+        except OSError: return 0
+        removed = 0
+        for name in names[keep:]:
+            try: os.remove(os.path.join(self.directory, name))
+            except OSError: continue
+            removed += 1
+        return removed
+
+
+def list_blob_shas(repo):
+    """루트 디렉터리 목록 한 번으로 각 파일의 blob SHA 를 얻는다."""
+    return {c.path: c.sha for c in repo.get_contents("")}
+
+
+def _fetch_blob(repo, sha):
+    blob = repo.get_git_blob(sha)
+    if blob.encoding == "base64": return base64.b64decode(blob.content)
+    return blob.content.encode("utf-8")
+
+
+def load_files(repo, parsers, cache, shas=None):
+    """parsers({경로: 파싱 함수})의 파일을 읽어 {경로: (blob SHA, DataFrame)} 으로 돌려준다.
+
+    cache 에 같은 SHA 의 파싱 결과가 있으면 그대로 쓰고, 바뀐 파일만 동시에 내려받아
+    파싱한다. 저장소에 없는 파일은 결과에서 빠진다. 세션이 제자리 수정하므로 복사본을 돌려준다.
+    새로 받은 파일이 있으면 더는 쓰지 않는 스냅숏 파일을 정리한다.
+    """
+    if shas is None: shas = list_blob_shas(repo)
+    shas = {path: sha for path, sha in shas.items() if path in parsers}
+    key = lambda path: (repo.full_name, path)
+
+    frames = {path: cache.get(key(path), sha) for path, sha in shas.items()}
+    stale = [path for path, frame in frames.items() if frame is None]
+    if stale:
+        def fetch(path):
+            return parsers[path](_fetch_blob(repo, shas[path]))
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            for path, frame in zip(stale, pool.map(fetch, stale)):
+                cache.put(key(path), shas[path], frame)
+                frames[path] = frame
+        cache.prune()
+    return {path: (shas[path], frame.copy()) for path, frame in frames.items()}
+
+
+def load_roster_files(repo, cache, shas=None):
+    """data.csv 와 config.csv 를 읽는다.
+
+    data.csv 와 함께 저장된 스냅숏이 현재 data.csv 에서 만들어진 것이면(source_sha 일치)
+    CSV 대신 스냅숏을 읽어 날짜 문자열 파싱을 건너뛴다.
+    """
+    if shas is None: shas = list_blob_shas(repo)
+    use_snapshot = snapshot_available() and SNAPSHOT_FILE in shas and DATA_FILE in shas
+    parsers = {CONFIG_FILE: config_from_csv}
+    parsers.update({SNAPSHOT_FILE: roster_from_snapshot} if use_snapshot else {DATA_FILE: roster_from_csv})
+    try:
+        loaded = load_files(repo, parsers, cache, shas)
+    except ValueError:  # 읽을 수 없는 스냅숏 버전
+        loaded, use_snapshot = load_files(repo, {CONFIG_FILE: config_from_csv}, cache, shas), False
+
+    snap = loaded.pop(SNAPSHOT_FILE, None)
+    if snap is not None and snap[1].attrs.get("snapshot", {}).get("source_sha") == shas[DATA_FILE]:
+        loaded[DATA_FILE] = (shas[DATA_FILE], snap[1])
+    elif DATA_FILE in shas:
+        loaded.update(load_files(repo, {DATA_FILE: roster_from_csv}, cache, shas))
+    return loaded
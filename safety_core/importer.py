@@ -0,0 +1,233 @@
+"""명부 파일(CSV/XLSX) 가져오기.
+
+파일 전체를 한 번에 읽지 않고 chunksize 행씩 읽어 근로자 키(사번 또는 성명+입사일)로
+기존 명부와 맞춰 본다. 키가 있으면 바뀐 셀만 고치고(update), 없으면 새 행으로 추가한다
+(insert). 같은 파일을 다시 올려도 명부가 늘어나지 않는다.
+
+빈 칸은 "정보 없음" 으로 보고 기존 값을 덮어쓰지 않는다.
+"""
+import numpy as np
+import pandas as pd
+
+from .compact import is_compact, logical_columns, set_cell, compact_roster, concat_rosters, to_editor
+from .patch import RosterPatch
+from .schema import DATE_COLS, BOOL_COLS, BOOL_DEFAULTS, ensure_roster_schema
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - xlsx 업로드에만 필요
+    openpyxl = None
+
+CHUNK_ROWS = 5000
+EMPLOYEE_ID_COL = '사번'
+NAME_KEY_COLS = ['성명', '입사일']
+
+_TRUE = {'true', '1', 'y', 'yes', 'o', 'v', '예', '참'}
+_FALSE = {'false', '0', 'n', 'no', 'x', '아니오', '거짓'}
+
+
+class ImportSummary:
+    """가져오기 결과 건수."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0      # 성명이 비어 있는 행
+
+    @property
+    def total(self):
+        return self.inserted + self.updated + self.unchanged + self.skipped
+
+    def __str__(self):
+        text = f"추가 {self.inserted}명 · 수정 {self.updated}명 · 변경없음 {self.unchanged}명"
+        return text + (f" · 건너뜀 {self.skipped}행" if self.skipped else "")
+
+
+def iter_csv_chunks(file, chunksize=CHUNK_ROWS):
+    # 사번의 앞자리 0 등이 사라지지 않도록 모두 문자열로 읽고 타입은 _normalize 에서 맞춘다
+    yield from pd.read_csv(file, dtype=str, chunksize=chunksize)
+
+
+def iter_xlsx_chunks(file, chunksize=CHUNK_ROWS):
+    if openpyxl is None:
+        raise ValueError("xlsx 파일을 읽으려면 openpyxl 이 필요합니다")
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None: return
+        header = [str(h).strip() if h is not None else f"_col{i}" for i, h in enumerate(header)]
+        buf = []
+        for row in rows:
+            buf.append(row[:len(header)])
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf, columns=header)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=header)
+    finally:
+        wb.close()
+
+
+def iter_upload_chunks(file, name, chunksize=CHUNK_ROWS):
+    """업로드 파일 이름의 확장자에 맞춰 DataFrame 조각을 차례로 돌려준다."""
+    if name.lower().endswith('.xlsx'):
+        return iter_xlsx_chunks(file, chunksize)
+    return iter_csv_chunks(file, chunksize)
+
+
+def _flag_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)): return pd.NA
+    if isinstance(value, str):
+        text = value.strip().lower()
+        return True if text in _TRUE else False if text in _FALSE else pd.NA
+    return bool(value)
+
+
+def _to_flags(values):
+    codes, uniques = pd.factorize(values)
+    mapped = pd.array([_flag_value(u) for u in uniques] + [pd.NA], dtype='boolean')
+    return pd.Series(mapped[codes], index=values.index)
+
+
+def column_kinds(df):
+    """명부 컬럼별 값 종류 (date/bool/number/text). 업로드 값을 같은 타입으로 맞출 때 쓴다."""
+    kinds = {}
+    for col in logical_columns(df):
+        dtype = None if col not in df.columns else df[col].dtype
+        if col in DATE_COLS or (dtype is not None and pd.api.types.is_datetime64_any_dtype(dtype)): kinds[col] = 'date'
+        elif col in BOOL_COLS or (dtype is not None and pd.api.types.is_bool_dtype(dtype)): kinds[col] = 'bool'
+        elif dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) == 'boolean': kinds[col] = 'bool'
+        elif dtype is not None and pd.api.types.is_numeric_dtype(dtype): kinds[col] = 'number'
+        else: kinds[col] = 'text'
+    return kinds
+
+
+def _normalize(chunk, kinds):
+    """명부에 있는 컬럼만 남기고 타입을 맞춘다. 체크박스의 빈 칸은 NA 로 둔다."""
+    chunk = chunk.rename(columns=lambda c: str(c).strip())
+    chunk = chunk[[c for c in kinds if c in chunk.columns]].copy()
+    for col in chunk.columns:
+        if kinds[col] == 'date':
+            chunk[col] = pd.to_datetime(chunk[col].astype(str), errors='coerce').dt.normalize()
+        elif kinds[col] == 'bool':
+            chunk[col] = _to_flags(chunk[col])
+        elif kinds[col] == 'number':
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        else:
+            values = chunk[col]
+            if pd.api.types.is_string_dtype(values):
+                text = values.str.strip().astype(object)
+            else:
+                text = values.astype(object).map(lambda v: v.strip() if isinstance(v, str) else v)
+            chunk[col] = text.where(text.notna() & (text != ''))
+    return chunk
+
+
+def _row_keys(df, key_cols):
+    parts = []
+    for col in key_cols:
+        values = df[col]
+        if col in DATE_COLS:
+            parts.append(pd.to_datetime(values, errors='coerce').dt.strftime('%Y-%m-%d').fillna(''))
+        else:
+            parts.append(values.astype(object).where(values.notna(), '').astype(str).str.strip())
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + '\x1f' + part
+    return pd.Series(keys.to_numpy(dtype=object), index=df.index, dtype=object)
+
+
+def key_columns(roster_columns, upload_columns):
+    """사번이 명부와 파일 양쪽에 있으면 사번, 아니면 (성명, 입사일) 을 키로 쓴다."""
+    if EMPLOYEE_ID_COL in roster_columns and EMPLOYEE_ID_COL in upload_columns:
+        return [EMPLOYEE_ID_COL]
+    return NAME_KEY_COLS
+
+
+def _update_rows(df, labels, chunk, patch, summary):
+    """키가 맞은 기존 행들과 chunk 를 컬럼 단위로 비교해 다른 셀만 고친다."""
+    old = to_editor(df.loc[labels], list(chunk.columns))
+    changed_rows = np.zeros(len(labels), dtype=bool)
+    for col in chunk.columns:
+        given = chunk[col].notna().to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(old[col]) and pd.api.types.is_datetime64_any_dtype(chunk[col]):
+            old_values, new_values = old[col].to_numpy('datetime64[ns]'), chunk[col].to_numpy('datetime64[ns]')
+            box = pd.Timestamp
+        else:
+            old_values, new_values = old[col].to_numpy(dtype=object), chunk[col].to_numpy(dtype=object, copy=True)
+            new_values[~given] = None
+            box = None
+        same = old[col].notna().to_numpy() & (old_values == new_values)
+        for pos in np.flatnonzero(given & ~same):
+            old_value, new_value = (old_values[pos], new_values[pos]) if box is None else (box(old_values[pos]), box(new_values[pos]))
+            set_cell(df, labels[pos], col, new_value)
+            patch.changes.append((labels[pos], col, old_value, new_value))
+            changed_rows[pos] = True
+    summary.updated += int(changed_rows.sum())
+    summary.unchanged += int(len(labels) - changed_rows.sum())
+
+
+def _occurrence_keys(keys, seen):
+    """같은 키의 몇 번째 행인지를 붙인다. seen 은 앞 조각까지의 키별 행 수 (제자리 갱신)."""
+    occurrence = keys.groupby(keys, sort=False).cumcount() + np.array([seen.get(key, 0) for key in keys], dtype=int)
+    for key, count in keys.value_counts(sort=False).items():
+        seen[key] = seen.get(key, 0) + count
+    return keys + '\x1e' + occurrence.astype(str)
+
+
+def upsert_roster(df, chunks, depts=()):
+    """chunks(DataFrame 조각들) 를 df 에 키 기준으로 추가/수정한다.
+
+    (df, RosterPatch, ImportSummary) 를 돌려준다. 기존 행의 수정은 제자리에서
+    셀 단위로 하고, 새 행이 있을 때만 새 프레임을 만든다. df 는 펼친 명부와
+    압축 명부 모두 받는다. 같은 키의 행이 여럿이면 파일의 n 번째 행을 명부의
+    n 번째 행과 맞춘다.
+    """
+    kinds = column_kinds(df)
+    all_cols = list(kinds)
+    patch, summary = RosterPatch(), ImportSummary()
+    index = key_cols = None
+    seen = {}
+    next_label = (df.index.max() + 1) if len(df) else 0
+    new_frames = []
+
+    for chunk in chunks:
+        if '성명' not in chunk.rename(columns=lambda c: str(c).strip()).columns:
+            raise ValueError("성명 컬럼 필수")
+        chunk = _normalize(chunk, kinds)
+        if key_cols is None:
+            key_cols = key_columns(all_cols, chunk.columns)
+            missing = [c for c in key_cols if c not in chunk.columns]
+            if missing: raise ValueError(f"{', '.join(missing)} 컬럼 필수")
+            existing = _occurrence_keys(_row_keys(df, key_cols), {})
+            index = dict(zip(existing.tolist(), existing.index.tolist()))
+
+        named = chunk['성명'].notna()
+        summary.skipped += int((~named).sum())
+        chunk = chunk[named]
+        if chunk.empty: continue
+        chunk.index = pd.Index(_occurrence_keys(_row_keys(chunk, key_cols), seen))
+
+        found = np.array([key in index for key in chunk.index], dtype=bool)
+        if found.any():
+            _update_rows(df, [index[key] for key in chunk.index[found]], chunk[found], patch, summary)
+        if not found.all():
+            frame = chunk[~found].reindex(columns=all_cols).astype(object)
+            frame.index = pd.RangeIndex(next_label, next_label + len(frame))
+            next_label += len(frame)
+            new_frames.append(frame)
+            summary.inserted += len(frame)
+
+    if new_frames:
+        new_rows = pd.concat(new_frames)
+        for col, kind in kinds.items():
+            if kind == 'bool': new_rows[col] = new_rows[col].fillna(BOOL_DEFAULTS.get(col, False)).astype(bool)
+        patch.added = list(new_rows.index)
+        if is_compact(df):
+            df = concat_rosters(df, compact_roster(new_rows, depts)[df.columns])
+        else:
+            df = pd.concat([df, ensure_roster_schema(new_rows)[df.columns]])
+
+    return df, patch, summary
@@ -0,0 +1,192 @@
+"""명부 변경 기록(저널): 바뀐 셀만 작은 JSON Lines 파일로 저장하고, 불러올 때 base 위에 재생한다.
+
+base 는 마지막으로 통째 저장한 data.csv 이고(blob SHA 로 구분), 그 뒤의 변경은
+journal/<base SHA 앞 12자리>/<저장 시각>.jsonl 에 저장 순서대로 쌓인다. 기록의 row 는
+base 의 행 위치(추가된 행은 그 뒤 번호)라서 재생한 명부의 행 인덱스와 같다.
+기록이 많아지면 data.csv 를 새로 써서 base 를 바꾸고(compaction) 이전 저널 파일은 지운다.
+
+기록 한 줄: {"op": "set"|"add"|"delete", "row": 행 번호, "col", "old", "new" (set),
+"values" (add), "ts": 변경 시각, "by": 저장한 사용자}
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import pandas as pd
+
+from .compact import logical_columns, get_cell
+from .github_store import DATA_FILE, GithubException, blob_sha, _fetch_blob, list_blob_shas, load_roster_files
+from .patch import coerce_cell
+from .schema import BOOL_COLS, BOOL_DEFAULTS
+
+JOURNAL_DIR = "journal"
+COMPACT_RECORDS = 2000     # base 이후 기록이 이보다 많으면 다음 저장은 data.csv 를 새로 쓴다
+COMPACT_FILES = 50         # 저널 파일 수 기준
+
+
+def journal_dir(base_sha):
+    return f"{JOURNAL_DIR}/{base_sha[:12]}"
+
+
+def _json_value(value):
+    if value is None: return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return None if pd.isna(value) else value.strftime('%Y-%m-%d')
+    if pd.api.types.is_scalar(value) and pd.isna(value): return None
+    if hasattr(value, 'item'): return value.item()      # numpy 스칼라
+    return value
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class ChangeJournal:
+    """base 이후의 변경 기록. 세션의 행 인덱스 ↔ 저널 행 번호 대응을 함께 관리한다.
+
+    base 가 없거나(처음 저장 전) 정렬처럼 기록으로 남길 수 없는 변경이 있으면
+    should_compact() 가 참이 되어 다음 저장은 data.csv 전체를 쓴다.
+    """
+
+    def __init__(self):
+        self.base_sha = None
+        self.files = []            # 이미 저장된 저널 파일 경로 (base 기준)
+        self.saved_records = 0
+        self.pending = []          # 아직 저장하지 않은 기록
+        self.needs_base = False
+        self._keys = None          # 행 인덱스 → 저널 행 번호
+        self._next_key = 0
+
+    @classmethod
+    def loaded(cls, base_sha, df, files=(), records=0):
+        """base 에 저널을 재생해 불러온 명부용 (행 인덱스가 곧 저널 행 번호)."""
+        journal = cls()
+        journal.base_sha = base_sha
+        journal.files = list(files)
+        journal.saved_records = records
+        journal._keys = {label: label for label in df.index.tolist()}
+        journal._next_key = (max(journal._keys) + 1) if journal._keys else 0
+        return journal
+
+    def rebase(self, base_sha, df):
+        """df 를 data.csv 로 통째 저장한 뒤 호출한다. 저널 행 번호는 df 의 행 위치가 된다."""
+        self.base_sha = base_sha
+        self.files, self.saved_records, self.pending, self.needs_base = [], 0, [], False
+        self._keys = dict(zip(df.index.tolist(), range(len(df))))
+        self._next_key = len(df)
+
+    def __len__(self):
+        return len(self.pending)
+
+    def mark_rewrite(self):
+        self.needs_base = True
+
+    def should_compact(self):
+        return (self.base_sha is None or self.needs_base
+                or self.saved_records + len(self.pending) > COMPACT_RECORDS or len(self.files) >= COMPACT_FILES)
+
+    def record(self, df, patch):
+        """RosterPatch 를 기록으로 남긴다. df 는 patch 를 반영한 뒤의 명부."""
+        if self._keys is None or not patch: return
+        ts = _now()
+        for label, col, old, new in patch.changes:
+            key = self._keys.get(label)
+            if key is None: continue
+            self.pending.append({'op': 'set', 'row': key, 'col': col, 'old': _json_value(old), 'new': _json_value(new), 'ts': ts})
+        for label in patch.deleted:
+            key = self._keys.pop(label, None)
+            if key is not None: self.pending.append({'op': 'delete', 'row': key, 'ts': ts})
+        if patch.added:
+            cols = logical_columns(df)
+            for label in patch.added:
+                key = self._keys[label] = self._next_key
+                self._next_key += 1
+                values = {col: _json_value(get_cell(df, label, col)) for col in cols}
+                self.pending.append({'op': 'add', 'row': key, 'values': values, 'ts': ts})
+
+    def pending_file(self, by=None):
+        """저장할 (경로, 내용). 저장에 성공하면 saved(경로) 를 호출한다."""
+        path = f"{journal_dir(self.base_sha)}/{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.jsonl"
+        lines = [json.dumps({**record, 'by': by}, ensure_ascii=False) for record in self.pending]
+        return path, "\n".join(lines) + "\n"
+
+    def saved(self, path):
+        self.files.append(path)
+        self.saved_records += len(self.pending)
+        self.pending = []
+
+
+def parse_journal(text):
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def replay(df, records):
+    """records 를 순서대로 df 에 반영한다 (df 를 제자리에서 고친다).
+
+    추가 행은 모아서 한 번에 붙이고, 삭제도 끝에서 한 번에 한다.
+    """
+    added, deleted = {}, set()
+    for record in records:
+        op, row = record['op'], record['row']
+        if op == 'set':
+            col, value = record['col'], coerce_cell(record['col'], record['new'])
+            if row in added: added[row][col] = value
+            elif row in df.index and row not in deleted:
+                if col not in df.columns: df[col] = None
+                df.at[row, col] = value
+        elif op == 'add':
+            added[row] = {col: coerce_cell(col, value) for col, value in record['values'].items()}
+        elif op == 'delete':
+            if added.pop(row, None) is None: deleted.add(row)
+    if deleted: df = df.drop(index=[row for row in deleted if row in df.index])
+    if added:
+        rows = pd.DataFrame(list(added.values()), index=pd.Index(list(added), dtype=df.index.dtype))
+        for col in BOOL_COLS:
+            if col in rows.columns: rows[col] = rows[col].where(rows[col].notna(), BOOL_DEFAULTS[col]).astype(bool)
+        df = pd.concat([df, rows])
+    return df
+
+
+def list_journal(repo, base_sha):
+    """base 에 딸린 저널 파일 [(경로, blob SHA)] 를 저장 순서대로."""
+    try:
+        contents = repo.get_contents(journal_dir(base_sha))
+    except GithubException as e:
+        if e.status == 404: return []
+        raise
+    return sorted((c.path, c.sha) for c in contents if c.path.endswith('.jsonl'))
+
+
+def load_journal(repo, base_sha):
+    """(기록 목록, 파일 경로 목록). 파일은 한 번 저장되면 바뀌지 않으므로 동시에 내려받는다."""
+    entries = list_journal(repo, base_sha)
+    if not entries: return [], []
+    with ThreadPoolExecutor(max_workers=min(8, len(entries))) as pool:
+        texts = list(pool.map(lambda entry: _fetch_blob(repo, entry[1]).decode('utf-8'), entries))
+    return [record for text in texts for record in parse_journal(text)], [path for path, _ in entries]
+
+
+def load_roster_journaled(repo, cache, shas=None):
+    """load_roster_files 결과의 명부에 base 이후 저널을 재생한다. (loaded, ChangeJournal) 를 돌려준다.
+
+    루트에 journal/ 이 없으면 저널 목록을 묻지 않는다 (바뀌지 않은 명부를 다시 불러오면 요청 한 번).
+    """
+    if shas is None: shas = list_blob_shas(repo)
+    loaded = load_roster_files(repo, cache, shas)
+    if DATA_FILE not in loaded: return loaded, ChangeJournal()
+    sha, df = loaded[DATA_FILE]
+    records, files = load_journal(repo, sha) if JOURNAL_DIR in shas else ([], [])
+    if records: df = replay(df, records)
+    loaded[DATA_FILE] = (sha, df)
+    return loaded, ChangeJournal.loaded(sha, df, files, len(records))
+
+
+def read_local_journal(directory, data_bytes):
+    """저장소를 내려받은 폴더의 journal/ 에서 data.csv 내용에 맞는 기록을 읽는다."""
+    path = os.path.join(directory, *journal_dir(blob_sha(data_bytes)).split('/'))
+    if not os.path.isdir(path): return []
+    records = []
+    for name in sorted(n for n in os.listdir(path) if n.endswith('.jsonl')):
+        with open(os.path.join(path, name), encoding='utf-8') as f: records.extend(parse_journal(f.read()))
+    return records
@@ -0,0 +1,166 @@
+"""근로자 × 의무(직무교육/특별교육/신규교육/특수검진) 상태표를 하루 한 번, 그리고 명부가
+바뀔 때마다 미리 계산해 두는 배치 작업.
+
+상태(🔴/🟡/🟢)는 기준일과 명부가 같으면 바뀌지 않으므로 화면마다 다시 계산하지 않고
+StatusMaterializer 가 백그라운드 스레드에서 만든 StatusSnapshot 을 읽는다. 날짜가 바뀌면
+전날 마지막 상태표와 비교해 임박/초과(ALERT_STATUSES)로 새로 넘어간 대상자(delta)를
+만들고, 알림기(notifier.send(subject, body))로 보낸다. 같은 날 같은 대상자는 한 번만 보낸다.
+"""
+import os
+import smtplib
+import threading
+from datetime import date, datetime, timedelta
+from email.message import EmailMessage
+
+import pandas as pd
+
+from .compliance import DUE_SOON_DAYS
+from .reports import REPORT_COLUMNS, ALERT_STATUSES, iter_statuses
+
+DELTA_COLUMNS = ['구분', '성명', '부서', '기한', '이전_상태', '상태']
+POLL_SECONDS = 300       # 날짜 변경을 놓치지 않도록 자정 전이라도 이 간격으로 깨어 확인
+
+
+def status_table(frame, today=None, soon_days=DUE_SOON_DAYS):
+    """build_main_frame 결과의 구분별 대상자 전원의 상태표 (인덱스는 명부 행 인덱스)."""
+    parts = [part for part in iter_statuses(frame, today, soon_days) if len(part)]
+    return pd.concat(parts) if parts else pd.DataFrame(columns=REPORT_COLUMNS)
+
+
+def status_delta(previous, current):
+    """previous 이후 임박/초과로 새로 넘어간 (행, 구분) 목록. previous 가 없으면 빈 표."""
+    if previous is None or current.empty: return pd.DataFrame(columns=DELTA_COLUMNS)
+    before = previous.set_index('구분', append=True)['상태']
+    now = current.set_index('구분', append=True)
+    prior = before.reindex(now.index)
+    moved = now['상태'].isin(ALERT_STATUSES).to_numpy() & (prior.to_numpy() != now['상태'].to_numpy())
+    out = now[moved].assign(이전_상태=prior[moved].fillna("-")).reset_index(level='구분')
+    return out[DELTA_COLUMNS].sort_values('기한', kind='stable', na_position='first')
+
+
+def format_delta(delta, day):
+    """알림 제목과 본문."""
+    subject = f"[안전보건] {day:%Y-%m-%d} 임박/초과 {len(delta)}건"
+    text = lambda value: "" if pd.isna(value) else f"{value:%Y-%m-%d}" if hasattr(value, 'strftime') else str(value)
+    lines = [f"{row.구분}\t{text(row.성명)}\t{text(row.부서)}\t{text(row.기한)}\t{row.이전_상태} → {row.상태}" for row in delta.itertuples()]
+    return subject, "\n".join(lines) + "\n"
+
+
+class SmtpNotifier:
+    """SMTP 로 알림 메일을 보낸다. 로컬 테스트용 SMTP 서버(예: localhost:1025)에도 그대로 쓸 수 있다."""
+
+    def __init__(self, host, port=25, sender="safety@localhost", recipients=(), username=None, password=None, starttls=False):
+        self.host, self.port, self.sender, self.recipients = host, port, sender, list(recipients)
+        self.username, self.password, self.starttls = username, password, starttls
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """SAFETY_SMTP_HOST/PORT/USER/PASSWORD, SAFETY_NOTIFY_FROM/TO(쉼표 구분) 로 만든다. 호스트가 없으면 None."""
+        host = environ.get('SAFETY_SMTP_HOST')
+        if not host: return None
+        recipients = [addr.strip() for addr in environ.get('SAFETY_NOTIFY_TO', '').split(',') if addr.strip()]
+        return cls(host, int(environ.get('SAFETY_SMTP_PORT', 25)), environ.get('SAFETY_NOTIFY_FROM', "safety@localhost"), recipients,
+                   environ.get('SAFETY_SMTP_USER'), environ.get('SAFETY_SMTP_PASSWORD'), environ.get('SAFETY_SMTP_STARTTLS') == '1')
+
+    def send(self, subject, body):
+        message = EmailMessage()
+        message['Subject'], message['From'], message['To'] = subject, self.sender, ", ".join(self.recipients)
+        message.set_content(body)
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls: smtp.starttls()
+            if self.username: smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+
+class StatusSnapshot:
+    def __init__(self, day, key, table, delta, soon_days):
+        self.day, self.key, self.table, self.delta, self.soon_days = day, key, table, delta, soon_days
+        self.created = datetime.now()
+        self._by_kind = {}
+
+    def status(self, kind):
+        """구분 kind 의 행 인덱스 → 상태."""
+        if kind not in self._by_kind: self._by_kind[kind] = self.table.loc[(self.table['구분'] == kind).to_numpy(), '상태']
+        return self._by_kind[kind]
+
+
+class StatusMaterializer:
+    """source(day) → (데이터 키, 파생 프레임) 로 상태표를 만든다.
+
+    start() 하면 스레드가 자정마다(그리고 poke() 로 깨우면) refresh() 한다. 데이터 키와
+    날짜가 그대로면 다시 계산하지 않는다. 날짜별 마지막 상태표는 오늘과 그 전 마지막 날 것만 남긴다.
+    """
+
+    def __init__(self, source, notifier=None, soon_days=DUE_SOON_DAYS, clock=date.today, poll_seconds=POLL_SECONDS):
+        self.source, self.notifier, self.soon_days, self.clock = source, notifier, soon_days, clock
+        self.poll_seconds = poll_seconds
+        self.current = None
+        self.last_error = None
+        self.sent = []             # (보낸 시각, 건수)
+        self._days = {}            # 날짜 → 그날 마지막 StatusSnapshot
+        self._notified = set()     # 오늘 보낸 (행, 구분, 상태)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        day = self.clock()
+        key, frame = self.source(day)
+        with self._lock:
+            current = self.current
+            if current is not None and current.day == day and current.key == key: return current
+            earlier = max((d for d in self._days if d < day), default=None)
+            previous = self._days[earlier].table if earlier is not None else None
+        table = status_table(frame, day, self.soon_days)
+        snapshot = StatusSnapshot(day, key, table, status_delta(previous, table), self.soon_days)
+        with self._lock:
+            self.current = snapshot
+            self._days = {d: s for d, s in self._days.items() if d == earlier}
+            self._days[day] = snapshot
+            self._notified = {entry for entry in self._notified if entry[0] == day}
+        self.last_error = None
+        self._notify(snapshot)
+        return snapshot
+
+    def _notify(self, snapshot):
+        if self.notifier is None or snapshot.delta.empty: return
+        entries = [(snapshot.day, label, kind, status) for label, kind, status in
+                   zip(snapshot.delta.index.tolist(), snapshot.delta['구분'].tolist(), snapshot.delta['상태'].tolist())]
+        fresh = [entry not in self._notified for entry in entries]
+        if not any(fresh): return
+        delta = snapshot.delta[fresh]
+        try:
+            self.notifier.send(*format_delta(delta, snapshot.day))
+        except Exception as e:     # 알림 실패는 다음 변경/다음 날 다시 시도
+            self.last_error = e
+            return
+        self._notified.update(entry for entry, new in zip(entries, fresh) if new)
+        self.sent.append((datetime.now(), len(delta)))
+
+    def poke(self, *_):
+        """명부가 바뀌었을 때 호출한다 (다음 refresh 를 바로 하게 함)."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="status-materializer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None: self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = e
+            now = datetime.now()
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            self._wake.wait(min(self.poll_seconds, (midnight - now).total_seconds() + 1))
+            self._wake.clear()
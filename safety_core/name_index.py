@@ -0,0 +1,143 @@
+"""근로자 명부 검색 색인.
+
+성명은 글자 1-gram/2-gram 과 초성 문자열의 1-gram/2-gram 으로 색인해 "대진" 이나
+"ㄱㄷㅈ", "강ㄷ" 같은 부분 검색을 후보 집합 교집합 + 후보 검증으로 처리한다.
+부서/직책은 값별 행 인덱스 집합을 두어 여러 조건을 집합 교집합으로 합친다.
+"""
+import weakref
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from .compact import get_cell
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JAMO = set(CHOSEONG)
+INDEX_FIELDS = ['부서', '직책']
+
+
+def choseong(text):
+    """한글 음절을 초성으로 바꾼다 (강대진 → ㄱㄷㅈ). 한글이 아닌 글자는 그대로 둔다."""
+    return "".join(CHOSEONG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch for ch in text)
+
+
+def _grams(text):
+    return {text[i:i + n] for n in (1, 2) for i in range(len(text) - n + 1)}
+
+
+def _lookup(postings, query):
+    grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+    sets = sorted((postings.get(g, set()) for g in grams), key=len)
+    return sets[0].intersection(*sets[1:])
+
+
+def _matches(name, cho, query):
+    # 질의의 자음(ㄱ..ㅎ)은 초성과, 나머지 글자는 성명 글자와 비교
+    for start in range(len(name) - len(query) + 1):
+        if all(q == name[start + i] or (q in _JAMO and q == cho[start + i]) for i, q in enumerate(query)):
+            return True
+    return False
+
+
+def _key(value):
+    if value is None or (isinstance(value, float) and value != value): return None
+    return value if isinstance(value, str) else (None if pd.isna(value) else str(value))
+
+
+class RosterIndex:
+    def __init__(self):
+        self._rows = {}                        # 행 인덱스 → (성명, 초성, {필드: 값})
+        self._name_grams = defaultdict(set)
+        self._cho_grams = defaultdict(set)
+        self._fields = {field: defaultdict(set) for field in INDEX_FIELDS}
+        self._source = None
+
+    @classmethod
+    def build(cls, df):
+        index = cls()
+        fields = [df[f].astype(object).tolist() if f in df.columns else [None] * len(df) for f in INDEX_FIELDS]
+        for label, name, *values in zip(df.index.tolist(), df['성명'].astype(object).tolist(), *fields):
+            index.add(label, name, dict(zip(INDEX_FIELDS, values)))
+        index._source = weakref.ref(df)
+        return index
+
+    def copy(self, df):
+        """df(이 색인 대상의 사본)용 색인 사본. 다시 만드는 것보다 훨씬 빠르다."""
+        index = RosterIndex()
+        index._rows = dict(self._rows)
+        index._name_grams = defaultdict(set, {g: set(labels) for g, labels in self._name_grams.items()})
+        index._cho_grams = defaultdict(set, {g: set(labels) for g, labels in self._cho_grams.items()})
+        index._fields = {f: defaultdict(set, {v: set(labels) for v, labels in postings.items()}) for f, postings in self._fields.items()}
+        index._source = weakref.ref(df)
+        return index
+
+    def is_for(self, df):
+        return self._source is not None and self._source() is df
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, label, name, fields):
+        name = _key(name) or ""
+        cho = choseong(name)
+        fields = {f: _key(fields.get(f)) for f in INDEX_FIELDS}
+        self._rows[label] = (name, cho, fields)
+        for g in _grams(name): self._name_grams[g].add(label)
+        for g in _grams(cho): self._cho_grams[g].add(label)
+        for f, value in fields.items(): self._fields[f][value].add(label)
+
+    def remove(self, label):
+        entry = self._rows.pop(label, None)
+        if entry is None: return
+        name, cho, fields = entry
+        for g in _grams(name): self._name_grams[g].discard(label)
+        for g in _grams(cho): self._cho_grams[g].discard(label)
+        for f, value in fields.items(): self._fields[f][value].discard(label)
+
+    def apply_patch(self, df, patch):
+        """RosterPatch 의 변경분만 색인에 반영하고, 이후 df 를 색인 대상으로 삼는다."""
+        touched = {label for label, col, _, _ in patch.changes if col == '성명' or col in INDEX_FIELDS}
+        for label in patch.deleted: self.remove(label)
+        for label in touched | set(patch.added):
+            self.remove(label)
+            if label in df.index:
+                self.add(label, get_cell(df, label, '성명'), {f: get_cell(df, label, f) for f in INDEX_FIELDS if f in df.columns})
+        self._source = weakref.ref(df)
+
+    def values(self, field):
+        return sorted(value for value, labels in self._fields[field].items() if value is not None and labels)
+
+    def search_name(self, query):
+        query = query.strip()
+        if not query: return set(self._rows)
+        # 두 글자 이하의 완성 글자/초성 질의는 n-gram 목록 자체가 정답 (반환 집합은 읽기 전용)
+        if not any(ch in _JAMO for ch in query):
+            if len(query) <= 2: return self._name_grams.get(query, set())
+            return {l for l in _lookup(self._name_grams, query) if query in self._rows[l][0]}
+        if all(ch in _JAMO for ch in query):
+            if len(query) <= 2: return self._cho_grams.get(query, set())
+            return {l for l in _lookup(self._cho_grams, query) if query in self._rows[l][1]}
+        candidates = _lookup(self._cho_grams, choseong(query))
+        # 자음과 완성 글자가 섞인 질의: 완성 글자의 1-gram 으로 후보를 더 줄인 뒤 검증
+        for ch in set(query) - _JAMO:
+            candidates &= self._name_grams.get(ch, set())
+        return {l for l in candidates if _matches(self._rows[l][0], self._rows[l][1], query)}
+
+    def filter(self, name=None, **fields):
+        """조건을 모두 만족하는 행 인덱스 집합(읽기 전용). 조건이 하나도 없으면 None."""
+        sets = []
+        if name: sets.append(self.search_name(name))
+        for field, values in fields.items():
+            if not values: continue
+            postings = [self._fields[field].get(str(v), set()) for v in values]
+            sets.append(postings[0] if len(postings) == 1 else set().union(*postings))
+        if not sets: return None
+        sets.sort(key=len)
+        return sets[0] if len(sets) == 1 else sets[0].intersection(*sets[1:])
+
+
+def select_labels(df, labels):
+    """labels 에 해당하는 행을 원래 순서대로 고른다 (df 에 없는 인덱스는 무시)."""
+    positions = df.index.get_indexer(list(labels))
+    return df.iloc[np.sort(positions[positions >= 0])]
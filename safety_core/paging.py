@@ -0,0 +1,23 @@
+"""근로자 명부 에디터를 페이지 단위로 나눠 보여주기 위한 행 구간 계산.
+
+행은 위치가 아니라 명부 인덱스(행 ID)로 다루므로, 정렬/검색 후 잘라낸 구간에서
+나온 에디터 변경분도 apply_editor_delta(df, page_labels, ...) 로 원래 행에 반영된다.
+"""
+import math
+
+PAGE_SIZES = [50, 100, 200, 500]
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_window(labels, page, page_size):
+    """labels 를 page_size 개씩 나눈 page 번째(1부터) 구간을 돌려준다.
+
+    범위를 벗어난 page 는 첫/마지막 페이지로 맞추며 (구간 labels, page, 전체 페이지 수) 를 돌려준다.
+    """
+    n_pages = page_count(len(labels), page_size)
+    page = min(max(int(page), 1), n_pages)
+    start = (page - 1) * page_size
+    return labels[start:start + page_size], page, n_pages
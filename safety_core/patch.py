@@ -0,0 +1,92 @@
+"""st.data_editor 의 변경분(edited_rows/added_rows/deleted_rows)을 명부에 셀 단위로 반영한다.
+
+에디터 상태의 행 번호는 화면에 넘긴 프레임 기준 위치이므로, 호출하는 쪽에서
+그 위치에 대응하는 명부 인덱스(row_labels)를 함께 넘긴다.
+"""
+import pandas as pd
+
+from .compact import is_compact, logical_columns, get_cell, set_cell, compact_roster, concat_rosters
+from .schema import DATE_COLS, BOOL_COLS, BOOL_DEFAULTS
+
+
+class RosterPatch:
+    """한 번의 적용으로 바뀐 셀/행 목록."""
+
+    def __init__(self):
+        self.changes = []   # (행 인덱스, 컬럼, 이전 값, 새 값)
+        self.added = []
+        self.deleted = []
+
+    @property
+    def structural(self):
+        return bool(self.added or self.deleted)
+
+    @property
+    def dirty(self):
+        return {label for label, _, _, _ in self.changes} | set(self.added)
+
+    def __bool__(self):
+        return bool(self.changes or self.added or self.deleted)
+
+
+def coerce_cell(col, value):
+    if col in DATE_COLS:
+        return pd.to_datetime(value, errors='coerce')
+    if col in BOOL_COLS:
+        return BOOL_DEFAULTS[col] if value is None or pd.isna(value) else bool(value)
+    return value
+
+
+def _same(a, b):
+    if pd.isna(a) and pd.isna(b): return True
+    try: return bool(a == b)
+    except (TypeError, ValueError): return False
+
+
+def editor_delta(state):
+    state = state or {}
+    edited = {int(pos): cells for pos, cells in (state.get('edited_rows') or {}).items()}
+    return edited, list(state.get('added_rows') or []), [int(pos) for pos in state.get('deleted_rows') or []]
+
+
+def apply_editor_delta(df, row_labels, state, columns=None):
+    """에디터 변경분을 df 에 반영하고 (df, RosterPatch) 를 돌려준다.
+
+    수정은 해당 셀만 제자리에서 바꾸고, 행 추가/삭제가 있을 때만 새 프레임을 만든다.
+    columns 가 주어지면 그 컬럼의 수정만 받아들인다(표시용 파생 컬럼 제외).
+    df 는 펼친 명부와 압축 명부(compact_roster) 모두 받는다.
+    """
+    all_cols = logical_columns(df)
+    allowed = set(all_cols if columns is None else columns) & set(all_cols)
+    row_labels = list(row_labels)
+    edited, added, deleted = editor_delta(state)
+    patch = RosterPatch()
+
+    for pos, cells in edited.items():
+        if pos >= len(row_labels): continue
+        label = row_labels[pos]
+        for col, value in cells.items():
+            if col not in allowed: continue
+            new = coerce_cell(col, value)
+            old = get_cell(df, label, col)
+            if _same(old, new): continue
+            set_cell(df, label, col, new)
+            patch.changes.append((label, col, old, new))
+
+    if deleted:
+        patch.deleted = [row_labels[pos] for pos in deleted if pos < len(row_labels)]
+        df = df.drop(index=patch.deleted)
+
+    if added:
+        start = (df.index.max() + 1) if len(df) else 0
+        rows = [{col: coerce_cell(col, row.get(col)) for col in all_cols if col in allowed or col in BOOL_DEFAULTS} for row in added]
+        new_rows = pd.DataFrame(rows, columns=all_cols, index=pd.RangeIndex(start, start + len(rows)))
+        for col in BOOL_COLS:
+            if col in new_rows.columns: new_rows[col] = new_rows[col].astype(bool)
+        patch.added = list(new_rows.index)
+        if is_compact(df):
+            df = concat_rosters(df, compact_roster(new_rows)[df.columns])
+        else:
+            df = pd.concat([df, new_rows])
+
+    return df, patch
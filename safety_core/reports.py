@@ -0,0 +1,158 @@
+"""화면 탭과 배치 보고서가 함께 쓰는 대상자 조건과 기한 보고서.
+
+Streamlit 없이 data.csv/config.csv 만으로 같은 결과를 낼 수 있도록 탭의 대상자 선택,
+대시보드 집계, 초과/임박 판정을 여기 둔다.
+"""
+import os
+from datetime import date
+
+import pandas as pd
+
+from .compliance import DUE_SOON_DAYS, build_main_frame, dday_status, health_status
+from .github_store import roster_from_csv, config_from_csv
+from .journal import read_local_journal, replay
+
+REPORT_KINDS = ['직무교육', '특별교육', '신규교육', '특수검진']
+REPORT_COLUMNS = ['구분', '성명', '부서', '직책', '입사일', '기한', '상태']
+ALERT_STATUSES = ["🔴 초과", "🟡 임박", "🔴 검진필요", "🔴 미이수"]
+SPECIAL_EDU_CHECKS = [('공통8H',), ('과목1_온라인4H', '과목1_감독자4H'), ('과목2_온라인4H', '과목2_감독자4H')]
+
+
+def _role_text(df):
+    return df['직책'].astype(str).str.replace(" ", "")
+
+
+def _checked(df, col):
+    return df[col].fillna(False).astype(bool) if col in df.columns else pd.Series(False, index=df.index)
+
+
+def active_mask(df):
+    return ~_checked(df, '퇴사여부')
+
+
+def manager_mask(df):
+    return _role_text(df).str.contains("책임자|감독자", na=False)
+
+
+def waste_mask(df):
+    return _role_text(df).str.contains("폐기물", na=False)
+
+
+def hire_year_mask(df, year):
+    return df['입사연도'] == year
+
+
+def special_edu_mask(df):
+    return (df['특별교육_과목1'] != '해당없음') & _checked(df, '특수검진_대상')
+
+
+def health_mask(df):
+    return _checked(df, '특수검진_대상')
+
+
+def dashboard_counts(df, today=None):
+    """대시보드 지표: 재직 인원, 올해 입사자, 책임자/감독자, 검진 대상."""
+    if today is None: today = date.today()
+    active = df[active_mask(df)]
+    return {
+        '재직': len(active),
+        '올해입사': int(hire_year_mask(df, today.year).sum()),
+        '책임자감독자': int(active['직책'].isin(['안전보건관리책임자', '관리감독자']).sum()),
+        '검진대상': int(health_mask(active).sum()),
+    }
+
+
+# 화면 탭별 대상자와 보여줄 컬럼. 다중 사업장 모드에서는 사업장마다 이 부분만 만들어 합친다
+TAB_COLUMNS = {
+    '책임자감독자': ['성명', '직책', '최근_직무교육일', '다음_직무교육일', '상태'],
+    '폐기물': ['성명', '부서', '최근_직무교육일', '다음_직무교육일', '상태'],
+    '신규입사': ['신규교육_이수', '퇴사여부', '성명', '입사일', '부서', '담당관리감독자', '입사연도'],
+    '특별교육': ['성명', '부서', '특별교육_과목1', '공통8H', '과목1_온라인4H', '과목1_감독자4H', '특별교육_과목2', '과목2_온라인4H', '과목2_감독자4H'],
+    '특수검진': ['성명', '부서', '유해인자', '검진단계', '최근_특수검진일', '다음_특수검진일', '상태'],
+}
+NEW_HIRE_YEARS = 3
+
+
+def tab_partials(frame, today=None, soon_days=DUE_SOON_DAYS):
+    """탭별 대상자 행(TAB_COLUMNS)을 만든다. 신규입사는 최근 NEW_HIRE_YEARS 개 연도만 담는다."""
+    if today is None: today = date.today()
+    active = frame[active_mask(frame)]
+    hire_years = [float(today.year - i) for i in range(NEW_HIRE_YEARS)]
+    targets = {
+        '책임자감독자': active[manager_mask(active)],
+        '폐기물': active[waste_mask(active)],
+        '신규입사': frame[frame['입사연도'].isin(hire_years)],
+        '특별교육': active[special_edu_mask(active)],
+        '특수검진': active[health_mask(active)],
+    }
+    parts = {}
+    for tab, target in targets.items():
+        target = target.copy()
+        if tab in ('책임자감독자', '폐기물'): target['상태'] = dday_status(target['다음_직무교육일'], today, soon_days)
+        if tab == '특수검진': target['상태'] = health_status(target, today, soon_days)
+        parts[tab] = target[TAB_COLUMNS[tab]]
+    return parts
+
+
+def special_edu_status(df):
+    """특별교육 필수 시간(공통 8H, 과목별 온라인/감독자 4H)을 모두 채웠는지."""
+    done = _checked(df, '공통8H')
+    for subject, checks in (('특별교육_과목1', SPECIAL_EDU_CHECKS[1]), ('특별교육_과목2', SPECIAL_EDU_CHECKS[2])):
+        required = df[subject].astype(str) != '해당없음'
+        for col in checks:
+            done &= ~required | _checked(df, col)
+    return pd.Series("🟢 이수", index=df.index, dtype=object).where(done, "🔴 미이수")
+
+
+def _status_frame(kind, target, due, status):
+    return pd.DataFrame({
+        '구분': kind,
+        '성명': target['성명'].astype(object),
+        '부서': target['부서'].astype(object),
+        '직책': target['직책'].astype(object),
+        '입사일': target['입사일_dt'],
+        '기한': due,
+        '상태': status,
+    }, index=target.index)
+
+
+def iter_statuses(frame, today=None, soon_days=DUE_SOON_DAYS, kinds=REPORT_KINDS):
+    """build_main_frame 결과에서 구분별 대상자 전원의 기한과 상태(REPORT_COLUMNS)를 차례로 돌려준다."""
+    active = frame[active_mask(frame)]
+    for kind in kinds:
+        if kind == '직무교육':
+            target = active[manager_mask(active) | waste_mask(active)]
+            yield _status_frame(kind, target, target['다음_직무교육일'], dday_status(target['다음_직무교육일'], today, soon_days))
+        elif kind == '특별교육':
+            target = active[special_edu_mask(active)]
+            yield _status_frame(kind, target, pd.Series(pd.NaT, index=target.index), special_edu_status(target))
+        elif kind == '신규교육':
+            target = active[active['법적_신규자'].fillna(False).astype(bool) & ~_checked(active, '신규교육_이수')]
+            yield _status_frame(kind, target, target['입사일_dt'], pd.Series("🔴 미이수", index=target.index, dtype=object))
+        elif kind == '특수검진':
+            target = active[health_mask(active)]
+            yield _status_frame(kind, target, target['다음_특수검진일'], health_status(target, today, soon_days))
+        else:
+            raise ValueError(f"알 수 없는 보고서 구분: {kind}")
+
+
+def iter_reports(frame, today=None, soon_days=DUE_SOON_DAYS, kinds=REPORT_KINDS):
+    """build_main_frame 결과에서 초과/임박/미이수 대상자를 구분별 DataFrame 으로 차례로 돌려준다."""
+    for part in iter_statuses(frame, today, soon_days, kinds):
+        part = part[part['상태'].isin(ALERT_STATUSES).to_numpy()]
+        yield part.sort_values('기한', kind='stable', na_position='first')
+
+
+def site_report(data_path, config_path, today=None, soon_days=DUE_SOON_DAYS, kinds=REPORT_KINDS):
+    """data.csv/config.csv 한 쌍으로 보고서 행을 만든다 (프로세스 풀 작업 단위).
+
+    data.csv 옆에 journal/ 이 있으면 그 변경 기록을 재생한 명부로 계산한다.
+    """
+    with open(data_path, 'rb') as f: data = f.read()
+    with open(config_path, 'rb') as f: config = config_from_csv(f.read())
+    roster = roster_from_csv(data)
+    records = read_local_journal(os.path.dirname(os.path.abspath(data_path)), data)
+    if records: roster = replay(roster, records)
+    frame = build_main_frame(roster, config, today)
+    parts = [part for part in iter_reports(frame, today, soon_days, kinds) if len(part)]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=REPORT_COLUMNS)
@@ -0,0 +1,93 @@
+"""부서 설정(dept_config)을 부서명 기준 규칙표로 컴파일한다.
+
+규칙표는 부서명마다 특별교육 과목, 유해인자, 담당 관리감독자와 특수검진 제외 여부를
+한 행에 담는다. 명부에는 부서 코드로 행 위치를 한 번 찾아(조인) 모든 컬럼을 붙이며,
+version 은 규칙표 내용의 지문이라 설정이 그대로면 같은 값이 나온다.
+"""
+import numpy as np
+import pandas as pd
+
+from .cache import frame_fingerprint
+from .schema import SPECIAL_EDU_OPTIONS
+
+# (설정 컬럼, 명부에 붙는 컬럼, 설정이 없을 때의 값, 범주 앞쪽에 둘 값)
+RULE_COLUMNS = [
+    ('특별교육과목1', '특별교육_과목1', "설정필요", SPECIAL_EDU_OPTIONS),
+    ('특별교육과목2', '특별교육_과목2', "해당없음", SPECIAL_EDU_OPTIONS),
+    ('유해인자', '유해인자', "없음", ()),
+    ('담당관리감독자', '담당관리감독자', "-", ()),
+]
+NO_FACTOR_VALUES = ['없음', '', '해당없음']
+EXEMPT_COL = '검진제외'
+
+
+def sanitize_config_df(df):
+    target_cols = ['특별교육과목1', '특별교육과목2']
+    for col in target_cols:
+        if col not in df.columns: df[col] = "해당없음"
+    for col in target_cols:
+        df[col] = df[col].astype(str).str.strip()
+        df[col] = df[col].where(df[col].isin(SPECIAL_EDU_OPTIONS), "해당없음")
+    if '담당관리감독자' not in df.columns: df['담당관리감독자'] = ""
+    else: df['담당관리감독자'] = df['담당관리감독자'].fillna("")
+    if '유해인자' not in df.columns: df['유해인자'] = "없음"
+    else: df['유해인자'] = df['유해인자'].fillna("없음")
+    return df
+
+
+class DeptRules:
+    """컴파일된 부서 규칙표. 부서가 없거나 비어 있는 근로자는 마지막 기본 행을 쓴다."""
+
+    def __init__(self, table):
+        self.table = table
+        self.version = frame_fingerprint(table)
+        defaults = {out: default for _, out, default, _ in RULE_COLUMNS}
+        defaults[EXEMPT_COL] = defaults['유해인자'] in NO_FACTOR_VALUES
+        self._columns = {}
+        for _, out, _, base in RULE_COLUMNS:
+            values = table[out].tolist() + [defaults[out]]
+            categories = list(dict.fromkeys(list(base) + values))
+            position = {value: i for i, value in enumerate(categories)}
+            self._columns[out] = (np.array([position[v] for v in values], dtype=np.int32), categories)
+        self._exempt = np.append(table[EXEMPT_COL].to_numpy(dtype=bool), defaults[EXEMPT_COL])
+
+    @classmethod
+    def compile(cls, dept_config):
+        by_dept = dept_config.drop_duplicates('부서명', keep='last')
+        by_dept = by_dept[by_dept['부서명'].notna()]
+        table = pd.DataFrame(index=pd.Index(by_dept['부서명'].astype(object).to_numpy(), name='부서명'))
+        for src, out, default, _ in RULE_COLUMNS:
+            values = by_dept[src] if src in by_dept.columns else pd.Series(None, index=by_dept.index)
+            table[out] = values.astype(object).where(values.notna(), default).to_numpy()
+        table[EXEMPT_COL] = table['유해인자'].isin(NO_FACTOR_VALUES)
+        return cls(table)
+
+    def changed_depts(self, other):
+        """other 와 규칙이 다른 부서명 집합 (한쪽에만 있는 부서 포함)."""
+        if other is None: return None
+        if other.version == self.version: return set()
+        depts = self.table.index.union(other.table.index)
+        a, b = self._expanded(depts), other._expanded(depts)
+        return set(depts[(a != b).any(axis=1).to_numpy()])
+
+    def _expanded(self, depts):
+        rows = self._rows(depts)
+        data = {out: np.asarray(categories, dtype=object)[codes[rows]] for out, (codes, categories) in self._columns.items()}
+        data[EXEMPT_COL] = self._exempt[rows]
+        return pd.DataFrame(data, index=depts)
+
+    def _rows(self, depts):
+        rows = self.table.index.get_indexer(pd.Index(np.asarray(depts, dtype=object)))
+        rows[rows < 0] = len(self.table)
+        return rows
+
+    def apply(self, df):
+        """df['부서'] 로 규칙표를 붙이고, 유해인자가 없는 부서는 특수검진 대상에서 뺀다."""
+        codes, uniques = pd.factorize(df['부서'])
+        rows = np.append(self._rows(uniques), len(self.table))[codes]  # code -1(빈 부서) → 기본 행
+        for out, (value_codes, categories) in self._columns.items():
+            df[out] = pd.Categorical.from_codes(value_codes[rows], categories=categories)
+        exempt = self._exempt[rows]
+        if exempt.any():
+            df.loc[exempt, '특수검진_대상'] = False
+        return df
@@ -0,0 +1,163 @@
+"""공유 명부의 write-behind 저장.
+
+저장 버튼은 세션의 보류 변경을 RosterStore 에 commit 만 하고(겹침 검사까지 바로 끝남)
+곧바로 돌아온다. GitHub 업로드는 저장소마다 하나인 WriteBehindSaver 의 스레드가 한다.
+debounce 초 안에 이어서 들어온 저장 요청은 하나로 모아 저장소의 최신 상태를 한 번(커밋
+하나)만 올리고, 사용량 제한·서버/네트워크 오류는 점점 길게 기다리며 다시 시도한다.
+화면은 status() 로 진행 상황만 읽는다. 프로세스가 끝날 때 남은 저장을 마저 한다(atexit).
+"""
+import atexit
+import threading
+import time
+from datetime import datetime
+
+from .github_store import retry_after
+
+DEBOUNCE_SECONDS = 2.0
+MAX_DELAY_SECONDS = 10.0      # 요청이 계속 들어와도 첫 요청부터 이 시간이 지나면 올린다
+RETRIES = 5
+BACKOFF_SECONDS = 2.0         # 다시 시도할 때마다 두 배
+MAX_BACKOFF_SECONDS = 120.0
+CLOSE_TIMEOUT = 30.0
+
+IDLE, PENDING, SAVING, RETRYING, FAILED = "idle", "pending", "saving", "retrying", "failed"
+
+
+class SaveStatus:
+    """status() 결과. unsaved 는 아직 올리지 않은 저장소 버전 수, due 는 다음 업로드까지 남은 초,
+    saved_version 은 이 저장기가 마지막으로 올린 버전."""
+
+    def __init__(self, state, saved_version, unsaved, error=None, attempts=0, due=None, last_saved=None, last_result=None):
+        self.state, self.saved_version, self.unsaved = state, saved_version, unsaved
+        self.error, self.attempts, self.due = error, attempts, due
+        self.last_saved, self.last_result = last_saved, last_result
+
+
+class WriteBehindSaver:
+    """store 의 저장하지 않은 버전을 백그라운드에서 persist 로 올린다.
+
+    request(persist) 의 persist(roster, config, journal, compact) 가 실제 업로드를 하며(같은
+    메서드를 가진 가짜 저장소로 시험 가능), 모아서 올릴 때는 마지막 요청의 persist 를 쓴다.
+    """
+
+    def __init__(self, store, debounce=DEBOUNCE_SECONDS, max_delay=MAX_DELAY_SECONDS, retries=RETRIES,
+                 backoff=BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS):
+        self.store = store
+        self.debounce, self.max_delay, self.retries = debounce, max_delay, retries
+        self.backoff, self.max_backoff = backoff, max_backoff
+        self.state = IDLE
+        self.error = None
+        self.attempts = 0
+        self.last_saved = None
+        self.last_version = None
+        self.last_result = None
+        self._persist = None
+        self._compact = False
+        self._first = None           # 모으는 중인 첫 요청 시각
+        self._due = None             # 다음 업로드 시각 (time.monotonic)
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._atexit = False
+
+    @property
+    def busy(self):
+        return self.state in (PENDING, SAVING, RETRYING)
+
+    def request(self, persist, compact=False):
+        """저장을 요청하고 바로 돌아온다. compact 면 변경이 없어도 data.csv 전체를 올린다."""
+        with self._cond:
+            now = time.monotonic()
+            self._persist = persist
+            self._compact |= compact
+            if self._first is None: self._first = now
+            if self.state != RETRYING or self._due is None:     # 다시 시도를 기다리는 중이면 그 시각을 지킨다
+                self._due = min(now + self.debounce, self._first + self.max_delay)
+            if self.state in (IDLE, FAILED): self.state, self.error = PENDING, None
+            self._cond.notify_all()
+        self.start()
+
+    def status(self):
+        with self._cond:
+            if self.state == FAILED and not self.store.dirty: self.state, self.error = IDLE, None    # 불러오기 등으로 올릴 것이 없어짐
+            due = max(self._due - time.monotonic(), 0) if self._due is not None else None
+            return SaveStatus(self.state, self.last_version, self.store.version - self.store.saved_version,
+                              self.error, self.attempts, due, self.last_saved, self.last_result)
+
+    def flush(self, timeout=None):
+        """기다리는 저장을 바로 올리고 끝날 때까지(최대 timeout 초) 기다린다. 다 올렸으면 True."""
+        with self._cond:
+            if self._due is not None: self._due = time.monotonic()
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._due is None and self.state != SAVING, timeout)
+            return self.state == IDLE
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop = False
+                self._thread = threading.Thread(target=self._run, name="write-behind-saver", daemon=True)
+                self._thread.start()
+            if not self._atexit:
+                atexit.register(self.close)
+                self._atexit = True
+        return self
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """남은 저장을 올리고(최대 timeout 초) 스레드를 멈춘다."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None: self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next()
+                if job is None: return
+                self.state = SAVING
+            persist, compact = job
+            try:
+                version, result = self.store.flush(lambda roster, config, journal: persist(roster, config, journal, compact), force=compact)
+            except Exception as e:
+                with self._cond: self._failed(e, compact)
+            else:
+                with self._cond: self._saved(version, result)
+
+    def _next(self):
+        """다음 업로드 시각까지 기다렸다가 (persist, compact) 를 돌려준다. 멈출 때 남은 것이 없으면 None."""
+        while True:
+            if self._due is None:
+                if self._stop: return None
+                self._cond.wait()
+                continue
+            wait = self._due - time.monotonic()
+            if wait > 0 and not self._stop:
+                self._cond.wait(wait)
+                continue
+            job = (self._persist, self._compact)
+            self._due = self._first = None
+            self._compact = False
+            return job
+
+    def _saved(self, version, result):
+        self.attempts, self.error = 0, None
+        self.last_saved, self.last_version, self.last_result = datetime.now(), version, result
+        self.state = PENDING if self._due is not None else IDLE
+        self._cond.notify_all()
+
+    def _failed(self, error, compact):
+        self.error = error
+        self._compact |= compact
+        delay = retry_after(error)
+        if delay is not None and self.attempts < self.retries:
+            self.attempts += 1
+            wait = min(max(delay, self.backoff * 2 ** (self.attempts - 1)), self.max_backoff)
+            self._due = max(self._due or 0, time.monotonic() + wait)
+            self._first = self._first or time.monotonic()
+            self.state = RETRYING
+        else:
+            # 다시 해도 안 되는 오류(원격이 먼저 바뀜 등)이거나 재시도를 다 썼음. 다음 요청 때 다시 올린다
+            self.attempts = 0
+            self.state = PENDING if self._due is not None else FAILED
+        self._cond.notify_all()
@@ -0,0 +1,28 @@
+"""근로자 명부 코드표와 컬럼 타입 정의."""
+import pandas as pd
+
+SPECIAL_EDU_OPTIONS = [
+    "해당없음",
+    "4. 폭발성·물반응성·자기반응성·자기발열성 물질, 자연발화성 액체·고체 및 인화성 액체의 제조 또는 취급작업",
+    "35. 허가 및 관리 대상 유해물질의 제조 또는 취급작업"
+]
+ROLES = ["안전보건관리책임자", "관리감독자", "폐기물담당자", "일반근로자"]
+HEALTH_PHASES = ["배치전(미실시)", "1차검진 완료(다음:6개월)", "정기검진(다음:1년)"]
+
+DATE_COLS = ['입사일', '최근_직무교육일', '최근_특수검진일']
+BOOL_COLS = ['퇴사여부', '특수검진_대상', '신규교육_이수', '공통8H', '과목1_온라인4H', '과목1_감독자4H', '과목2_온라인4H', '과목2_감독자4H']
+# 값이 비어 있을 때의 기본값 (에디터 CheckboxColumn 기본값과 동일)
+BOOL_DEFAULTS = {col: col == '특수검진_대상' for col in BOOL_COLS}
+
+
+def ensure_roster_schema(df):
+    """날짜/체크박스 컬럼 타입을 보장한다. 이미 맞는 타입인 컬럼은 건드리지 않는다."""
+    for col in DATE_COLS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col].astype(str), errors='coerce')
+    for col in BOOL_COLS:
+        if col not in df.columns:
+            df[col] = BOOL_DEFAULTS[col]
+        elif not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].fillna(False).astype(bool)
+    return df
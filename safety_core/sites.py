@@ -0,0 +1,212 @@
+"""여러 사업장(명부 + 부서 설정)을 각각 계산해 지표와 탭 대상자를 합친다.
+
+사업장마다 결과(SiteShard)를 원본 버전(로컬 파일의 수정시각/크기 또는 GitHub blob
+SHA), 기준일, 임박 기준 일수로 캐시한다. 버전이 바뀐 사업장만 작업 풀에서 다시 읽고 계산하며,
+합친 결과도 사업장 버전 목록이 같으면 다시 만들지 않는다.
+
+로컬 사업장 폴더는 정해 둔 root(대시보드는 SAFETY_SITES_ROOT 또는 app.py 옆 sites/) 아래만
+읽는다. 그 밖의 경로는 GitHub 'user/repo' 모양이 아니면 거부한다.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .compliance import DUE_SOON_DAYS, build_main_frame
+from .github_store import DATA_FILE, CONFIG_FILE, list_blob_shas, roster_from_csv, config_from_csv
+from .journal import JOURNAL_DIR, load_roster_journaled, read_local_journal, replay
+from .reports import TAB_COLUMNS, dashboard_counts, tab_partials
+
+SITE_COL = '사업장'
+SITES_ROOT_ENV = 'SAFETY_SITES_ROOT'
+MAX_SITES = 64           # SiteShards 가 보관하는 사업장 결과 수 (오래 안 쓴 것부터 버림)
+_REPO_NAME = re.compile(r"[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+")
+
+
+class SiteSource:
+    """사업장 하나의 원본. location 은 root 아래의 data.csv/config.csv 가 든 폴더 또는 GitHub 'user/repo'.
+
+    root 가 없으면 로컬 폴더는 쓰지 않는다.
+    """
+
+    def __init__(self, name, location, root=None):
+        self.name = name
+        self.location = location
+        self.root = root
+
+    @property
+    def key(self):
+        return (self.name, self.location)
+
+    @property
+    def path(self):
+        """root 안의 사업장 폴더 실제 경로. root 밖(절대 경로, .., 심볼릭 링크)이거나 폴더가 아니면 None."""
+        if not self.root: return None
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, self.location))
+        if path == root or os.path.commonpath([root, path]) != root or not os.path.isdir(path): return None
+        return path
+
+    @property
+    def is_local(self):
+        return self.path is not None
+
+    @property
+    def is_repo(self):
+        return bool(_REPO_NAME.fullmatch(self.location)) and not any(part in ('.', '..') for part in self.location.split('/'))
+
+    def __repr__(self):
+        return f"SiteSource({self.name!r}, {self.location!r})"
+
+
+def parse_sources(text, root=None):
+    """한 줄에 하나씩 '이름=위치' (이름 생략 시 위치의 마지막 부분) 를 읽는다. 로컬 폴더는 root 기준."""
+    sources = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'): continue
+        name, sep, location = line.partition('=')
+        if not sep: name, location = os.path.basename(line.rstrip('/\\')), line
+        sources.append(SiteSource(name.strip(), location.strip(), root))
+    return sources
+
+
+class SiteShard:
+    """사업장 하나의 계산 결과: 더할 수 있는 지표와 탭별 대상자 행."""
+
+    def __init__(self, name, version, counts, tabs, rows):
+        self.name = name
+        self.version = version
+        self.counts = counts
+        self.tabs = tabs
+        self.rows = rows
+
+
+def _local_version(path):
+    paths = [os.path.join(path, DATA_FILE), os.path.join(path, CONFIG_FILE)]
+    version = tuple((os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+    journal = os.path.join(path, JOURNAL_DIR)
+    if not os.path.isdir(journal): return version
+    stamps = sorted((root, name, os.stat(os.path.join(root, name)).st_mtime_ns) for root, _, names in os.walk(journal) for name in names)
+    return version + (tuple(stamps),)
+
+
+def _load_local(path):
+    with open(os.path.join(path, DATA_FILE), 'rb') as f: data = f.read()
+    with open(os.path.join(path, CONFIG_FILE), 'rb') as f: config = config_from_csv(f.read())
+    roster = roster_from_csv(data)
+    records = read_local_journal(path, data)
+    return (replay(roster, records) if records else roster), config
+
+
+def compute_shard(name, version, roster, config, today=None, soon_days=DUE_SOON_DAYS):
+    frame = build_main_frame(roster, config, today)
+    return SiteShard(name, version, dashboard_counts(frame, today), tab_partials(frame, today, soon_days), len(frame))
+
+
+def merge_counts(shards):
+    total = {}
+    for shard in shards:
+        for key, value in shard.counts.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def merge_tabs(shards):
+    merged = {}
+    for tab, columns in TAB_COLUMNS.items():
+        parts = [shard.tabs[tab].assign(**{SITE_COL: shard.name}) for shard in shards if len(shard.tabs[tab])]
+        merged[tab] = pd.concat(parts, ignore_index=True)[[SITE_COL] + columns] if parts else pd.DataFrame(columns=[SITE_COL] + columns)
+    return merged
+
+
+class SiteShards:
+    """사업장별 결과 캐시. refresh 는 바뀐 사업장만 다시 계산한다.
+
+    세션 간에 공유해 같은 사업장은 한 번만 계산한다. 결과와 오류는 (이름, 위치) 별로 둔다.
+    """
+
+    def __init__(self, max_workers=4, blob_cache=None, max_sites=MAX_SITES):
+        self.max_workers = max_workers
+        self.blob_cache = blob_cache
+        self.max_sites = max_sites
+        self._errors = {}
+        self._shards = OrderedDict()     # (이름, 위치) → ((위치, 버전, 기준일, 임박 일수), SiteShard)
+        self._merged = None   # (사업장 키 목록, 지표, 탭)
+        self._lock = threading.Lock()
+
+    def errors(self, sources):
+        """sources 중 마지막 refresh 에서 실패한 사업장 {이름: 예외}."""
+        return {s.name: self._errors[s.key] for s in sources if s.key in self._errors}
+
+    def _version(self, source, open_repo, check_remote):
+        """(버전, 원본). 원본은 로컬 폴더 경로, GitHub 면 (repo, shas) 이거나 캐시를 믿을 때 None."""
+        path = source.path
+        if path is not None: return _local_version(path), path
+        if not source.is_repo: raise ValueError(f"허용된 사업장 폴더 밖이거나 없는 폴더입니다: {source.location}")
+        cached = self._shards.get(source.key)
+        if cached and not check_remote:
+            return cached[0][1], None
+        repo = open_repo(source.location)
+        shas = list_blob_shas(repo)
+        return (shas.get(DATA_FILE), shas.get(CONFIG_FILE), shas.get(JOURNAL_DIR)), (repo, shas)
+
+    def _compute(self, source, version, remote, today, soon_days):
+        if isinstance(remote, str):
+            roster, config = _load_local(remote)
+        else:
+            repo, shas = remote
+            loaded, _ = load_roster_journaled(repo, self.blob_cache, shas)
+            if DATA_FILE not in loaded or CONFIG_FILE not in loaded:
+                raise ValueError(f"{DATA_FILE}/{CONFIG_FILE} 없음")
+            roster, config = loaded[DATA_FILE][1], loaded[CONFIG_FILE][1]
+        return compute_shard(source.name, version, roster, config, today, soon_days)
+
+    def refresh(self, sources, today, open_repo=None, check_remote=False, soon_days=DUE_SOON_DAYS):
+        """sources 의 결과를 최신으로 맞추고 다시 계산한 사업장 이름 목록을 돌려준다.
+
+        GitHub 사업장은 check_remote 가 참이거나 아직 결과가 없을 때만 원격 SHA 를 확인한다.
+        실패한 사업장은 errors 에 남기고 이전 결과(있으면)를 그대로 둔다.
+        """
+        with self._lock:
+            def check(source):
+                version, remote = self._version(source, open_repo, check_remote)
+                key = (source.location, version, today, soon_days)
+                cached = self._shards.get(source.key)
+                if cached and cached[0] == key: return source, None
+                return source, (key, self._compute(source, version, remote, today, soon_days))
+
+            def run(source):
+                try: return check(source)
+                except Exception as e: return source, e
+
+            recomputed = []
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources)))) as pool:
+                for source, result in pool.map(run, sources):
+                    if isinstance(result, Exception):
+                        self._errors[source.key] = result
+                        continue
+                    if result is not None:
+                        self._shards[source.key] = result
+                        recomputed.append(source.name)
+                    self._errors.pop(source.key, None)
+                    if source.key in self._shards: self._shards.move_to_end(source.key)
+            while len(self._shards) > self.max_sites:
+                self._errors.pop(self._shards.popitem(last=False)[0], None)
+            while len(self._errors) > self.max_sites: self._errors.pop(next(iter(self._errors)))
+            return recomputed
+
+    def shards(self, sources):
+        return [self._shards[s.key][1] for s in sources if s.key in self._shards]
+
+    def merged(self, sources):
+        """(지표 합계, 탭별 대상자) 를 돌려준다. 사업장 결과가 그대로면 지난번 것을 재사용."""
+        with self._lock:
+            keys = tuple((s.key, self._shards[s.key][0]) for s in sources if s.key in self._shards)
+            if self._merged is None or self._merged[0] != keys:
+                shards = self.shards(sources)
+                self._merged = (keys, merge_counts(shards), merge_tabs(shards))
+            return self._merged[1], self._merged[2]
@@ -0,0 +1,65 @@
+"""명부의 타입 있는 스냅숏(Parquet) 저장/읽기.
+
+CSV 는 사람이 고칠 수 있는 내보내기 형식으로 그대로 두고, 스냅숏은 날짜/체크박스
+컬럼 타입을 그대로 담아 문자열 파싱 없이 읽는다. pyarrow 가 없으면 사용하지 않는다.
+"""
+import io
+import json
+
+from .schema import DATE_COLS, BOOL_COLS, ensure_roster_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow 는 streamlit 의존성이지만 선택 사항으로 취급
+    pa = pq = None
+
+SNAPSHOT_FILE = "data.parquet"
+SNAPSHOT_VERSION = 1
+_META_KEY = b"safety_dashboard.snapshot"
+
+
+def snapshot_available():
+    return pq is not None
+
+
+def _to_parquet(df, meta):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = {"version": SNAPSHOT_VERSION, **meta}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(meta).encode("utf-8")})
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression="zstd")
+    return buf.getvalue()
+
+
+def _from_parquet(data):
+    table = pq.read_table(io.BytesIO(data))
+    meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+    if meta.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅숏 버전: {meta.get('version')}")
+    df = table.to_pandas()
+    df.attrs["snapshot"] = meta
+    return df
+
+
+def roster_to_snapshot(df, source_sha=None):
+    """명부를 Parquet 바이트로 만든다. source_sha 는 같은 내용으로 저장한 data.csv 의 blob SHA."""
+    df = ensure_roster_schema(df.reset_index(drop=True))
+    return _to_parquet(df, {"date_cols": DATE_COLS, "bool_cols": BOOL_COLS, "source_sha": source_sha})
+
+
+def roster_from_snapshot(data):
+    """Parquet 바이트를 명부로 읽는다. 스냅숏 정보는 df.attrs['snapshot'] 에 담긴다."""
+    return ensure_roster_schema(_from_parquet(data))
+
+
+def write_snapshot(df, path):
+    """임의의 프레임(명부/부서설정)을 타입 그대로 파일에 남긴다. 로컬 캐시용."""
+    with open(path, "wb") as f:
+        meta = {k: v for k, v in df.attrs.get("snapshot", {}).items() if k != "version"}
+        f.write(_to_parquet(df.reset_index(drop=True), meta))
+
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        return _from_parquet(f.read())
@@ -0,0 +1,233 @@
+"""프로세스 안에서 모든 세션이 함께 읽는 명부 저장소.
+
+저장소는 버전이 붙은 명부/부서설정 스냅숏 하나와, 그 버전의 검색 색인·파생 프레임을
+들고 있다. 스냅숏은 바꾸지 않고(읽기 전용으로 다룸) 세션은 고치기 시작할 때만 사본을
+만든다. 세션의 보류 변경(RosterPatch 목록)은 commit 으로 반영하며, 세션이 시작한 버전
+이후에 다른 세션이 같은 셀이나 행을 바꿨으면 ConflictError 를 내고, 아니면 최신
+스냅숏 위에 다시 적용(rebase)한다. 영구 저장(GitHub)은 commit 에 넘기는 persist 가
+저장소 잠금 안에서 하거나, flush(persist) 로 마지막 저장 이후의 버전들을 잠금 밖에서
+한 번에 저장한다(write-behind, saver.WriteBehindSaver).
+"""
+import copy
+import threading
+
+from .cache import FrameCache
+from .compact import get_cell, set_cell, concat_rosters
+from .compliance import build_main_frame
+from .deadlines import DueIndex
+from .journal import ChangeJournal
+from .name_index import RosterIndex
+from .patch import RosterPatch
+
+LOG_SIZE = 500          # rebase 에 쓰는 최근 변경 이력 개수
+
+
+class ConflictError(Exception):
+    """보류 변경이 다른 세션이 먼저 반영한 변경과 겹친다. cells 는 [(행 인덱스, 컬럼 또는 None)], 전체 교체면 None."""
+
+    def __init__(self, cells=None):
+        self.cells = cells
+        super().__init__("명부 전체가 바뀌었습니다" if cells is None else f"겹치는 변경 {len(cells)}건")
+
+
+class _Change:
+    def __init__(self, version, cells=(), deleted=(), reset=False):
+        self.version = version
+        self.cells = set(cells)             # (행 인덱스, 컬럼)
+        self.rows = {label for label, _ in self.cells}
+        self.deleted = set(deleted)
+        self.reset = reset
+
+
+class RosterStore:
+    def __init__(self, name):
+        self.name = name
+        self.version = 0
+        self.roster = None
+        self.config = None
+        self.journal = ChangeJournal()
+        self.frames = FrameCache(maxsize=4)    # (버전 키, 규칙 버전, 기준일) → (파생 프레임, 기한 색인)
+        self.saved_version = 0                 # 영구 저장(또는 불러오기)된 마지막 버전
+        self._config_version = 0
+        self._loads = 0
+        self._index = None                     # (버전, RosterIndex)
+        self._log = []
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+
+    @property
+    def dirty(self):
+        """영구 저장하지 않은 버전이 있다."""
+        return self.version != self.saved_version
+
+    def snapshot(self):
+        with self._lock:
+            return self.version, self.roster, self.config
+
+    def seed(self, roster, config):
+        """비어 있을 때만 채운다 (여러 세션이 동시에 처음 열어도 한 번)."""
+        with self._lock:
+            if self.roster is None: self.replace(roster, config)
+
+    def subscribe(self, listener):
+        """버전이 바뀔 때마다 listener(버전) 를 부른다 (잠금 안에서 부르므로 오래 걸리면 안 된다)."""
+        with self._lock:
+            if listener not in self._listeners: self._listeners.append(listener)
+
+    def frame_key(self, version, rules_version, today):
+        return (('store', self.name, version), rules_version, today)
+
+    def main_frame(self, version, roster, rules, today):
+        """버전 version(명부 roster) 의 (키, (파생 프레임, 기한 색인)). 세션들과 배치 작업이 함께 쓴다."""
+        key = self.frame_key(version, rules.version, today)
+        def build():
+            frame = build_main_frame(roster, rules, today)
+            return frame, DueIndex.build(frame)
+        return key, self.derived(key, build)
+
+    def derived(self, key, build):
+        """key 의 파생 값을 세션들이 함께 쓴다. 없으면 build() 로 한 번만 만든다."""
+        with self._lock:
+            value = self.frames.get(key)
+            if value is None:
+                value = build()
+                self.frames.put(key, value)
+            return value
+
+    def _install(self, roster, config, change):
+        self.version += 1
+        self.roster = roster
+        if config is not None and config is not self.config:
+            self.config = config
+            self._config_version = self.version
+        change.version = self.version
+        self._log = (self._log + [change])[-LOG_SIZE:]
+        for listener in self._listeners: listener(self.version)
+
+    def replace(self, roster, config, journal=None):
+        """외부(불러오기 등)에서 받은 명부로 바꾼다. 같은 원격 상태를 다시 불러온 것이면 그대로 둔다."""
+        with self._lock:
+            if (journal is not None and self.roster is not None and journal.base_sha is not None
+                    and (self.journal.base_sha, self.journal.files) == (journal.base_sha, journal.files)):
+                return False
+            self.journal = journal if journal is not None else ChangeJournal()
+            self._install(roster, config, _Change(0, reset=True))
+            self.saved_version = self.version
+            self._loads += 1
+            return True
+
+    def roster_index(self):
+        """현재 버전의 검색 색인 (처음 쓸 때 만든다)."""
+        with self._lock:
+            version, roster = self.version, self.roster
+            if self._index is not None and self._index[0] == version: return self._index[1]
+        index = RosterIndex.build(roster)
+        with self._lock:
+            if self.version == version: self._index = (version, index)
+        return index
+
+    def _rebase(self, base_version, roster, patches):
+        since = [change for change in self._log if change.version > base_version]
+        if len(since) != self.version - base_version or any(change.reset for change in since):
+            raise ConflictError()
+        cells = set().union(*(change.cells for change in since))
+        rows = set().union(*(change.rows for change in since))
+        deleted = set().union(*(change.deleted for change in since))
+        conflicts = []
+        for patch in patches:
+            conflicts += [(label, col) for label, col, _, _ in patch.changes if (label, col) in cells or label in deleted]
+            conflicts += [(label, None) for label in patch.deleted if label in rows or label in deleted]
+        if conflicts: raise ConflictError(conflicts)
+        if not any(patches): return self.roster, []
+
+        new = self.roster.copy()
+        merged, relabel = [], {}
+        for patch in patches:
+            out = RosterPatch()
+            for label, col, _, value in patch.changes:
+                label = relabel.get(label, label)
+                if label not in new.index: continue
+                out.changes.append((label, col, get_cell(new, label, col), value))
+                set_cell(new, label, col, value)
+            gone = [relabel.get(label, label) for label in patch.deleted]
+            out.deleted = [label for label in gone if label in new.index]
+            if out.deleted: new = new.drop(index=out.deleted)
+            added = [label for label in patch.added if label in roster.index]
+            if added:
+                # 다른 세션이 먼저 추가한 행과 인덱스가 겹치면 뒤 번호로 옮긴다
+                rows = roster.loc[added].copy()
+                start = max(int(new.index.max()) + 1 if len(new) else 0, 0)
+                labels = [label if label not in new.index else None for label in added]
+                for i, label in enumerate(labels):
+                    if label is None:
+                        while start in new.index or start in labels: start += 1
+                        labels[i] = start
+                        start += 1
+                relabel.update({old: label for old, label in zip(added, labels) if old != label})
+                rows.index = labels
+                new = concat_rosters(new, rows)
+                out.added = labels
+            merged.append(out)
+        return new, merged
+
+    def commit(self, base_version, roster, patches, config=None, rewrite=False, index=None, persist=None):
+        """세션의 보류 변경을 반영하고 (새 버전, persist 결과) 를 돌려준다.
+
+        roster 는 세션 사본(patches 를 이미 반영한 것), config 는 바꾼 경우에만 넘긴다.
+        rewrite 는 정렬처럼 셀 단위로 옮길 수 없는 변경이 있다는 뜻이라 버전이 같을 때만 받는다.
+        persist(roster, config, journal) 가 예외를 내면 저장소는 그대로다.
+        """
+        with self._lock:
+            if base_version == self.version:
+                new, merged = roster, list(patches)
+            elif rewrite:
+                raise ConflictError()
+            else:
+                new, merged = self._rebase(base_version, roster, patches)
+                index = None
+            if config is not None and self._config_version > base_version:
+                raise ConflictError([(None, '부서설정')])
+
+            journal = copy.deepcopy(self.journal)
+            if rewrite: journal.mark_rewrite()
+            for patch in merged: journal.record(new, patch)
+            result = persist(new, config if config is not None else self.config, journal) if persist else None
+
+            self.journal = journal
+            if any(merged) or rewrite or (config is not None and config is not self.config):
+                cells = [(label, col) for patch in merged for label, col, _, _ in patch.changes]
+                deleted = [label for patch in merged for label in patch.deleted]
+                self._install(new, config, _Change(0, cells, deleted, reset=rewrite))
+                if index is not None and index.is_for(new): self._index = (self.version, index)
+            if persist: self.saved_version = self.version      # 잠금 안에서 저장소 전체 상태를 저장했음
+            return self.version, result
+
+    def flush(self, persist, force=False):
+        """마지막 영구 저장 이후의 버전들을 persist(roster, config, journal) 한 번으로 저장한다.
+
+        persist 는 잠금 밖에서 부르므로 저장하는 동안에도 세션들은 읽고 commit 할 수 있다.
+        그사이 들어온 변경은 저장 안 한 채로 남아 다음 flush 때 저장된다. persist 가 예외를
+        내면 저장소는 그대로다. (저장한 버전, persist 결과) 를 돌려주며 저장할 것이 없으면(force 가
+        아니면) (버전, None).
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self.dirty and not force: return self.version, None
+                version, roster, config, loads = self.version, self.roster, self.config, self._loads
+                journal = copy.deepcopy(self.journal)
+                base, flushed = journal.base_sha, len(journal.pending)
+            result = persist(roster, config, journal)
+            with self._lock:
+                if self._loads != loads: return version, result     # 저장하는 동안 다른 명부를 불러옴
+                if journal.base_sha == base:
+                    # 변경 기록만 올렸으면 올린 만큼만 지우고, 그사이 쌓인 기록은 남긴다
+                    live = self.journal
+                    live.files, live.saved_records = list(journal.files), journal.saved_records
+                    live.pending = live.pending[flushed:]
+                else:
+                    # data.csv 를 새로 썼으면 그 명부 기준으로 바뀐다. 그사이 변경이 있으면 다음 저장도 통째로
+                    self.journal = journal
+                    if self.version != version: journal.mark_rewrite()
+                self.saved_version = max(self.saved_version, version)
+            return version, result
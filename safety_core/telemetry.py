@@ -0,0 +1,87 @@
+"""재실행(rerun) 한 번의 단계별 시간, 메모리, 프레임 크기 기록.
+
+mark(name) 은 이전 단계를 닫고 새 단계를 열어 스크립트 흐름을 들여쓰기 없이 나누고,
+span(name) 은 그 안의 작은 구간(GitHub 입출력 등)을 따로 잰다. 기록은 dict 하나로
+만들어 화면에 보여주거나 JSON Lines 파일에 이어 쓸 수 있다.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """프로세스의 최대 상주 메모리. 알 수 없으면 None."""
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # Linux 는 KB 단위
+
+
+def frame_size(df, deep=True):
+    return {'rows': len(df), 'cols': df.shape[1], 'bytes': int(df.memory_usage(index=True, deep=deep).sum())}
+
+
+class RunTrace:
+    def __init__(self, trigger=None):
+        self.trigger = trigger or "widget"
+        self.started = time.time()
+        self.spans = []          # (이름, 초)
+        self.frames = {}
+        self.interrupted_by = None
+        self._start = time.perf_counter()
+        self._open = None
+        self._record = None
+
+    @property
+    def finished(self):
+        return self._record is not None
+
+    def mark(self, name):
+        self._close()
+        self._open = (name, time.perf_counter())
+
+    def _close(self):
+        if self._open is None: return
+        name, start = self._open
+        self.spans.append((name, time.perf_counter() - start))
+        self._open = None
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - start))
+
+    def frame(self, name, df, deep=True):
+        if df is not None: self.frames[name] = frame_size(df, deep)
+
+    def finish(self, interrupted_by=None):
+        """기록을 마감하고 dict 로 돌려준다. 두 번째 호출부터는 처음 결과를 그대로 돌려준다."""
+        if self._record is not None: return self._record
+        self._close()
+        self.interrupted_by = interrupted_by
+        self._record = {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'trigger': self.trigger,
+            'rerun_by': interrupted_by,
+            'total_s': round(time.perf_counter() - self._start, 6),
+            'spans': [{'name': name, 's': round(seconds, 6)} for name, seconds in self.spans],
+            'frames': self.frames,
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+        return self._record
+
+
+def append_jsonl(path, record):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
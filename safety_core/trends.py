@@ -0,0 +1,237 @@
+"""저장 이력(data.csv/config.csv 커밋)으로 본 부서·의무별 준수율 추세.
+
+저장할 때마다 GitHub 저장소에 data.csv 와 config.csv(변경분 저장이면 journal/)가 커밋되므로
+커밋 이력이 곧 명부의 시간순 기록이다. 커밋마다 그 시점의 명부를 되살려 커밋 날짜 기준으로
+부서·지표별 (대상, 해당) 건수를 센다. 건수는 명부를 이루는 blob SHA 들과 날짜로 만든 키로
+TrendCache 에 남기므로 같은 내용의 커밋은 다시 계산하지 않고, 이미 본 커밋은 파일 목록도
+다시 받지 않는다.
+
+이력은 commits(known)/files(sha)/blob(sha) 세 메서드만 쓰므로 로컬 git 저장소(bare 포함,
+LocalGitHistory)와 PyGithub 저장소(GithubHistory) 어느 쪽으로도 계산할 수 있다.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from .compliance import build_main_frame
+from .github_store import DATA_FILE, CONFIG_FILE, _fetch_blob, remote_blob_shas, roster_from_csv, config_from_csv
+from .journal import journal_dir, parse_journal, replay
+from .reports import active_mask, iter_statuses
+
+TREND_COLUMNS = ['시점', '커밋', '부서', '지표', '대상', '해당']
+COUNT_COLUMNS = ['부서', '지표', '대상', '해당']
+# 지표 → (설명, 높을수록 좋은지)
+TREND_METRICS = {
+    '직무교육 초과': ("책임자/감독자·폐기물 담당자 중 직무교육 기한이 지난 비율", False),
+    '특별교육 미이수': ("특별교육 대상자 중 필수 시간을 채우지 못한 비율", False),
+    '신규교육 이수': ("법적 신규자 중 신규교육을 이수한 비율", True),
+    '특수검진 초과': ("특수검진 대상자 중 검진필요/기한 초과 비율", False),
+    '특수검진 완료': ("특수검진 대상자 중 유효한 검진이 있는 비율", True),
+}
+NO_DEPT = "(부서 없음)"
+TOTAL = "전체"
+
+
+def compliance_counts(roster, config, day):
+    """명부 한 시점의 부서·지표별 (대상, 해당) 건수. 기준일은 day."""
+    frame = build_main_frame(roster, config, day)
+    parts = []
+
+    def add(metric, target, hit):
+        dept = target['부서'].astype(object).where(target['부서'].notna(), NO_DEPT).astype(str)
+        counts = pd.DataFrame({'부서': dept, '대상': 1, '해당': hit.to_numpy(dtype=bool).astype(int)})
+        parts.append(counts.groupby('부서', sort=True)[['대상', '해당']].sum().reset_index().assign(지표=metric))
+
+    kinds = ['직무교육', '특별교육', '특수검진']
+    for kind, part in zip(kinds, iter_statuses(frame, day, kinds=kinds)):
+        status = part['상태']
+        if kind == '직무교육': add('직무교육 초과', part, status == "🔴 초과")
+        elif kind == '특별교육': add('특별교육 미이수', part, status == "🔴 미이수")
+        elif kind == '특수검진':
+            add('특수검진 초과', part, status.str.startswith("🔴"))
+            add('특수검진 완료', part, status.isin(["🟢 양호", "🟡 임박"]))
+    active = frame[active_mask(frame)]
+    new_hires = active[active['법적_신규자'].fillna(False).astype(bool)]
+    add('신규교육 이수', new_hires, new_hires['신규교육_이수'].fillna(False).astype(bool))
+    return pd.concat(parts, ignore_index=True)[COUNT_COLUMNS] if parts else pd.DataFrame(columns=COUNT_COLUMNS)
+
+
+def state_key(files, day):
+    """커밋 파일 목록({경로: blob SHA})에서 명부 상태 키. data.csv 가 없으면 None.
+
+    data.csv, config.csv 와 그 data.csv 에 딸린 저널 파일의 blob SHA 와 기준일로 만든다.
+    """
+    if DATA_FILE not in files: return None
+    prefix = journal_dir(files[DATA_FILE]) + "/"
+    journal = sorted((path, sha) for path, sha in files.items() if path.startswith(prefix) and path.endswith('.jsonl'))
+    parts = [files[DATA_FILE], files.get(CONFIG_FILE, ""), *(sha for _, sha in journal), day.isoformat()]
+    return hashlib.sha1(":".join(parts).encode("ascii")).hexdigest()
+
+
+class LocalGitHistory:
+    """로컬 git 저장소(bare 저장소도 됨)의 한 브랜치 이력. git 명령으로 읽는다."""
+
+    def __init__(self, path, branch="HEAD"):
+        self.path, self.branch = path, branch
+
+    def _git(self, *args):
+        return subprocess.run(["git", "--git-dir", self._git_dir(), *args], check=True, capture_output=True).stdout
+
+    def _git_dir(self):
+        dotgit = os.path.join(self.path, ".git")
+        return dotgit if os.path.isdir(dotgit) else self.path
+
+    def commits(self, known=()):
+        """아직 보지 않은 커밋 [(SHA, 커밋 시각)] 을 오래된 것부터."""
+        out = self._git("log", "--first-parent", "--reverse", "--format=%H %cI", self.branch).decode("ascii")
+        commits = [line.split(" ", 1) for line in out.splitlines() if line]
+        return [(sha, datetime.fromisoformat(when)) for sha, when in commits if sha not in known]
+
+    def files(self, sha):
+        """커밋 sha 의 {경로: blob SHA}."""
+        out = self._git("ls-tree", "-r", "-z", sha).decode("utf-8")
+        files = {}
+        for entry in out.split("\0"):
+            if not entry: continue
+            meta, path = entry.split("\t", 1)
+            _, kind, blob = meta.split()
+            if kind == "blob": files[path] = blob
+        return files
+
+    def blob(self, sha):
+        return self._git("cat-file", "blob", sha)
+
+
+class GithubHistory:
+    """PyGithub Repository 의 한 브랜치 이력. 커밋 목록은 새것부터 받으므로 이미 본 커밋에서 멈춘다."""
+
+    def __init__(self, repo, branch=None):
+        self.repo, self.branch = repo, branch
+
+    def commits(self, known=()):
+        fresh = []
+        for commit in self.repo.get_commits(sha=self.branch or self.repo.default_branch):
+            if commit.sha in known: break
+            fresh.append((commit.sha, commit.commit.committer.date))
+        return fresh[::-1]
+
+    def files(self, sha):
+        return remote_blob_shas(self.repo, self.repo.get_git_commit(sha))
+
+    def blob(self, sha):
+        return _fetch_blob(self.repo, sha)
+
+
+class TrendCache:
+    """이력 하나(저장소 하나)의 커밋 → (시각, 상태 키) 와 상태 키 → 건수. 세션 간에 공유된다.
+
+    directory 를 주면 커밋 목록은 commits.jsonl 에, 건수는 <상태 키>.csv 로 남겨 프로세스를
+    다시 띄워도 이미 처리한 커밋은 받지도 계산하지도 않는다.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.commits = {}          # 커밋 SHA → (커밋 시각, 상태 키 또는 None)
+        self._counts = {}
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            try:
+                with open(self._commits_path(), encoding="utf-8") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        self.commits[entry['sha']] = (datetime.fromisoformat(entry['when']), entry['key'])
+            except (OSError, ValueError, KeyError): pass
+
+    def _commits_path(self):
+        return os.path.join(self.directory, "commits.jsonl")
+
+    def _counts_path(self, key):
+        return os.path.join(self.directory, f"{key}.csv")
+
+    def add_commit(self, sha, when, key):
+        self.commits[sha] = (when, key)
+        if self.directory:
+            with open(self._commits_path(), "a", encoding="utf-8") as f:
+                f.write(json.dumps({'sha': sha, 'when': when.isoformat(), 'key': key}) + "\n")
+
+    def counts(self, key):
+        if key in self._counts: return self._counts[key]
+        if self.directory and os.path.exists(self._counts_path(key)):
+            try: counts = pd.read_csv(self._counts_path(key), dtype={'부서': str, '지표': str})
+            except (OSError, ValueError): return None
+            self._counts[key] = counts
+            return counts
+        return None
+
+    def put_counts(self, key, counts):
+        self._counts[key] = counts
+        if self.directory:
+            try: counts.to_csv(self._counts_path(key), index=False)
+            except OSError: pass
+
+
+class _Blobs:
+    """한 번 갱신하는 동안 받은 blob 과 파싱한 명부/설정을 SHA 별로 재사용한다."""
+
+    def __init__(self, history):
+        self.history = history
+        self._rosters, self._configs = {}, {}
+
+    def roster(self, files):
+        sha = files[DATA_FILE]
+        if sha not in self._rosters: self._rosters[sha] = roster_from_csv(self.history.blob(sha))
+        roster = self._rosters[sha]
+        prefix = journal_dir(sha) + "/"
+        paths = sorted(path for path in files if path.startswith(prefix) and path.endswith('.jsonl'))
+        records = [record for path in paths for record in parse_journal(self.history.blob(files[path]).decode("utf-8"))]
+        return replay(roster.copy(), records) if records else roster
+
+    def config(self, files):
+        sha = files.get(CONFIG_FILE)
+        if sha is None: return pd.DataFrame(columns=['부서명'])
+        if sha not in self._configs: self._configs[sha] = config_from_csv(self.history.blob(sha))
+        return self._configs[sha]
+
+
+def compliance_trend(history, cache, progress=None):
+    """이력의 커밋별 부서·지표 건수(TREND_COLUMNS)를 시간순으로. 새 커밋만 받아 계산한다.
+
+    progress 를 주면 계산할 때마다 progress(처리한 수, 전체 수) 를 부른다.
+    """
+    with cache.lock:
+        listed = {}
+        for sha, when in history.commits(known=cache.commits):
+            if when.tzinfo is not None: when = when.astimezone().replace(tzinfo=None)   # 서버 현지 시각으로
+            listed[sha] = history.files(sha)
+            cache.add_commit(sha, when, state_key(listed[sha], when.date()))
+        todo = {}
+        for sha, (when, key) in cache.commits.items():
+            if key is not None and key not in todo and cache.counts(key) is None: todo[key] = (sha, when)
+        blobs = _Blobs(history)
+        for done, (key, (sha, when)) in enumerate(todo.items(), 1):
+            files = listed[sha] if sha in listed else history.files(sha)
+            cache.put_counts(key, compliance_counts(blobs.roster(files), blobs.config(files), when.date()))
+            if progress: progress(done, len(todo))
+
+        parts = [cache.counts(key).assign(시점=pd.Timestamp(when), 커밋=sha[:7])
+                 for sha, (when, key) in cache.commits.items() if key is not None]
+    if not parts: return pd.DataFrame(columns=TREND_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[TREND_COLUMNS].sort_values('시점', kind='stable', ignore_index=True)
+
+
+def trend_rates(trend, metric, departments=None):
+    """지표 하나의 시점별 비율(%) 표. 열은 TOTAL(전체 부서 합) 과 departments 의 각 부서."""
+    rows = trend[trend['지표'] == metric]
+    total = rows.groupby(['시점', '커밋'], sort=False)[['대상', '해당']].sum()
+    rates = {TOTAL: total['해당'] / total['대상']}
+    for dept in departments or []:
+        part = rows[rows['부서'] == dept].set_index(['시점', '커밋'])[['대상', '해당']].reindex(total.index)
+        rates[dept] = part['해당'] / part['대상']
+    out = pd.DataFrame(rates, index=total.index).mul(100).round(1)
+    return out.reset_index(level='커밋', drop=True)
@@ -0,0 +1,115 @@
+"""시험용 가짜 GitHub 저장소. PyGithub Repository 중 safety_core 가 쓰는 메서드만 메모리로 흉내 낸다."""
+import base64
+from types import SimpleNamespace as NS
+
+from github import GithubException
+
+from safety_core.github_store import blob_sha
+
+
+class FakeRepo:
+    """브랜치 하나짜리 저장소. calls 에 API 호출 이름을 순서대로 남긴다.
+
+    failures 에 예외를 넣어 두면 다음 ref 갱신(커밋 올리기) 때 하나씩 꺼내 던진다.
+    """
+    default_branch = "main"
+    full_name = "acme/site"
+
+    def __init__(self, files=None):
+        self.blobs, self.commits, self.head = {}, {}, None
+        self.calls, self.failures = [], []
+        if files: self.head = self._commit("init", {path: self._put(content) for path, content in files.items()}, [])
+
+    # --- 시험에서 쓰는 도우미 ---
+
+    def files(self, sha=None):
+        """커밋(기본은 head)의 {경로: 내용 bytes}."""
+        return {path: self.blobs[blob] for path, blob in self.commits[sha or self.head].tree.entries.items()}
+
+    def push(self, files, message="push"):
+        """다른 곳에서 저장한 것처럼 head 위에 커밋을 하나 올린다."""
+        entries = dict(self.commits[self.head].tree.entries)
+        entries.update({path: self._put(content) for path, content in files.items()})
+        self.head = self._commit(message, entries, [self.head])
+
+    def history(self):
+        shas, sha = [], self.head
+        while sha:
+            shas.append(sha)
+            sha = (self.commits[sha].parents or [None])[0]
+        return shas[::-1]
+
+    def _put(self, content):
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        sha = blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def _commit(self, message, entries, parents):
+        sha = blob_sha(repr((message, sorted(entries.items()), parents, len(self.commits))))
+        self.commits[sha] = NS(sha=sha, message=message, parents=parents, tree=NS(sha="t" + sha, entries=entries))
+        return sha
+
+    # --- Repository API ---
+
+    def get_git_ref(self, name):
+        self.calls.append("get_git_ref")
+        if self.head is None: raise GithubException(409, {"message": "Git Repository is empty."}, None)
+        return NS(object=NS(sha=self.head), edit=lambda sha, force=False: self._edit(sha))
+
+    def _edit(self, sha):
+        self.calls.append("ref.edit")
+        if self.failures: raise self.failures.pop(0)
+        self.head = sha
+
+    def get_git_commit(self, sha):
+        self.calls.append("get_git_commit")
+        return self.commits[sha]
+
+    def get_git_tree(self, sha, recursive=False):
+        self.calls.append("get_git_tree")
+        entries = self.commits[sha[1:]].tree.entries
+        return NS(tree=[NS(path=path, sha=blob, type="blob") for path, blob in entries.items()])
+
+    def create_git_blob(self, content, encoding):
+        self.calls.append("create_git_blob")
+        return NS(sha=self._put(base64.b64decode(content) if encoding == "base64" else content))
+
+    def create_git_tree(self, elements, base_tree=None):
+        self.calls.append("create_git_tree")
+        entries = dict(base_tree.entries) if base_tree else {}
+        for element in elements:
+            spec = element._identity
+            if "content" in spec: entries[spec["path"]] = self._put(spec["content"])
+            elif spec.get("sha") is None: entries.pop(spec["path"], None)
+            else: entries[spec["path"]] = spec["sha"]
+        return NS(entries=entries)
+
+    def create_git_commit(self, message, tree, parents):
+        self.calls.append("create_git_commit")
+        return NS(sha=self._commit(message, tree.entries, [parent.sha for parent in parents]))
+
+    def create_file(self, path, message, content, branch=None):
+        self.calls.append("create_file")
+        entries = dict(self.commits[self.head].tree.entries) if self.head else {}
+        entries[path] = self._put(content)
+        self.head = self._commit(message, entries, [self.head] if self.head else [])
+
+    def get_contents(self, path, ref=None):
+        """파일이면 내용, 디렉터리면 바로 아래 항목 목록 (GitHub 처럼 하위 디렉터리는 type='dir')."""
+        self.calls.append("get_contents")
+        entries = self.commits[self.head].tree.entries if self.head else {}
+        if path in entries: return NS(path=path, sha=entries[path], type="file", decoded_content=self.blobs[entries[path]])
+        prefix = path + "/" if path else ""
+        items = {}
+        for full, blob in entries.items():
+            if not full.startswith(prefix): continue
+            name, _, rest = full[len(prefix):].partition("/")
+            items[prefix + name] = NS(path=prefix + name, name=name, sha=blob_sha(prefix + name) if rest else blob,
+                                      type="dir" if rest else "file")
+        if not items: raise GithubException(404, {"message": "Not Found"}, None)
+        return sorted(items.values(), key=lambda item: item.path)
+
+    def get_git_blob(self, sha):
+        self.calls.append("get_git_blob")
+        return NS(sha=sha, content=base64.b64encode(self.blobs[sha]).decode("ascii"), encoding="base64")
@@ -0,0 +1,149 @@
+"""compliance 의 컬럼 연산이 원래 app.py 의 행 단위 계산과 같은 결과를 내는지 data.csv 로 확인한다."""
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from safety_core.compliance import build_main_frame, derive_compliance, dday_status, health_status
+from safety_core.github_store import roster_from_csv, config_from_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- 원래 app.py 의 행 단위 함수 (get_dday_status 만 기준일을 인자로 받게 함) ---
+
+def add_days(d, days):
+    try:
+        if pd.isna(d) or str(d) == "NaT" or str(d).strip() == "": return None
+        d = pd.to_datetime(d)
+        return d + timedelta(days=days)
+    except: return None
+
+
+def calculate_job_training_date(row):
+    last_date = row.get('최근_직무교육일')
+    if pd.isna(last_date) or str(last_date) == 'NaT' or str(last_date).strip() == "": return None
+    try: last_date = pd.to_datetime(last_date)
+    except: return None
+    role = str(row.get('직책', '')).replace(" ", "").strip()
+    try:
+        if '책임자' in role: return last_date + timedelta(days=730)
+        elif '폐기물' in role: return last_date + timedelta(days=1095)
+        elif '감독자' in role: return last_date + timedelta(days=365)
+        else: return None
+    except: return None
+
+
+def calc_next_health(row):
+    if not row.get('특수검진_대상', True): return None
+    if row['검진단계'] == "배치전(미실시)" or pd.isna(row['최근_특수검진일']): return None
+    cycle = 180 if row['검진단계'] == "1차검진 완료(다음:6개월)" else 365
+    return add_days(row['최근_특수검진일'], cycle)
+
+
+def get_dday_status(target_date, today):
+    if pd.isna(target_date) or str(target_date) == 'NaT' or str(target_date).strip() == "": return "-"
+    try:
+        target_ts = pd.to_datetime(target_date)
+        today_ts = pd.Timestamp(today)
+        diff = (target_ts - today_ts).days
+        if diff < 0: return "🔴 초과"
+        elif diff < 30: return "🟡 임박"
+        else: return "🟢 양호"
+    except: return "-"
+
+
+def baseline_health_status(row, today):
+    return "🔴 검진필요" if row['검진단계'] == "배치전(미실시)" else get_dday_status(row['다음_특수검진일'], today)
+
+
+def baseline_new_hire(hired, today):
+    return (pd.Timestamp(today) - hired).days < 90 if pd.notnull(hired) else False
+
+
+# --- 준비 ---
+
+def _roster():
+    with open(os.path.join(ROOT, "data.csv"), "rb") as f: roster = roster_from_csv(f.read())
+    # 원래 코드가 받던 모양(빈칸, 공백 섞인 직책, 6개월 주기)도 몇 행 섞는다
+    extra = pd.DataFrame({
+        '성명': ["가", "나", "다", "라"],
+        '직책': ["관리 감독자", "폐기물 담당자", None, "안전보건관리 책임자"],
+        '부서': roster['부서'].iloc[:4].to_numpy(),
+        '입사일': pd.to_datetime(["2026-07-20", None, "2026-01-01", "2026-10-01"]),
+        '최근_직무교육일': pd.to_datetime(["2025-10-18", "2023-10-18", "2025-01-01", None]),
+        '검진단계': ["1차검진 완료(다음:6개월)", "정기검진(다음:1년)", "1차검진 완료(다음:6개월)", "배치전(미실시)"],
+        '최근_특수검진일': pd.to_datetime(["2026-04-21", None, "2026-01-01", "2026-01-01"]),
+        '특수검진_대상': [True, True, False, True],
+    })
+    return pd.concat([roster, extra], ignore_index=True)
+
+
+def _config():
+    with open(os.path.join(ROOT, "config.csv"), "rb") as f: return config_from_csv(f.read())
+
+
+def _boundaries(dates):
+    """다음 일정 하나를 기준으로 양호/임박 경계(30·29일 전)와 초과 경계(당일·다음날)."""
+    due = pd.to_datetime(pd.Series(dates)).dropna().min().date()
+    return [due - timedelta(days=30), due - timedelta(days=29), due, due + timedelta(days=1)]
+
+
+def _todays(roster):
+    job = roster.apply(calculate_job_training_date, axis=1)
+    health = roster.apply(calc_next_health, axis=1)
+    hired = pd.to_datetime(roster['입사일'], errors='coerce').dropna().max().date()
+    return sorted({date(2026, 10, 18), date(2024, 2, 29), *_boundaries(job), *_boundaries(health),
+                   hired + timedelta(days=89), hired + timedelta(days=90)})
+
+
+ROSTER, CONFIG = _roster(), _config()
+TODAYS = _todays(ROSTER)
+
+
+def _dates(values):
+    return pd.to_datetime(pd.Series(list(values), dtype=object)).to_numpy(dtype='datetime64[ns]')
+
+
+def test_boundaries_cover_every_status():
+    frame = build_main_frame(ROSTER, CONFIG, date(2026, 10, 18))
+    seen = set()
+    for today in TODAYS:
+        seen.update(dday_status(frame['다음_직무교육일'], today))
+        seen.update(health_status(frame, today))
+    assert {"-", "🔴 초과", "🟡 임박", "🟢 양호", "🔴 검진필요"} <= seen
+
+
+def test_next_dates_match_row_wise():
+    frame = build_main_frame(ROSTER, CONFIG, date(2026, 10, 18))
+    expected_job = _dates(frame.apply(calculate_job_training_date, axis=1))
+    expected_health = _dates(frame.apply(calc_next_health, axis=1))
+    assert pd.Series(expected_job).equals(pd.Series(frame['다음_직무교육일'].to_numpy(dtype='datetime64[ns]')))
+    assert pd.Series(expected_health).equals(pd.Series(frame['다음_특수검진일'].to_numpy(dtype='datetime64[ns]')))
+
+
+def test_derive_compliance_matches_row_wise():
+    today = date(2026, 10, 18)
+    df = derive_compliance(ROSTER.copy(), today)
+    assert pd.Series(_dates(ROSTER.apply(calculate_job_training_date, axis=1))).equals(
+        pd.Series(df['다음_직무교육일'].to_numpy(dtype='datetime64[ns]')))
+    assert pd.Series(_dates(ROSTER.apply(calc_next_health, axis=1))).equals(
+        pd.Series(df['다음_특수검진일'].to_numpy(dtype='datetime64[ns]')))
+    hired = pd.to_datetime(ROSTER['입사일'].astype(str), errors='coerce')
+    assert df['법적_신규자'].tolist() == hired.apply(lambda x: baseline_new_hire(x, today)).tolist()
+    assert df['입사연도'].equals(hired.dt.year.astype(float))
+
+
+@pytest.mark.parametrize("today", TODAYS, ids=str)
+def test_statuses_match_row_wise(today):
+    frame = build_main_frame(ROSTER, CONFIG, today)
+
+    expected = frame['다음_직무교육일'].apply(lambda d: get_dday_status(d, today))
+    assert dday_status(frame['다음_직무교육일'], today).tolist() == expected.tolist()
+
+    expected = frame.apply(lambda row: baseline_health_status(row, today), axis=1)
+    assert health_status(frame, today).tolist() == expected.tolist()
+
+    expected = frame['입사일_dt'].apply(lambda hired: baseline_new_hire(hired, today))
+    assert frame['법적_신규자'].tolist() == expected.tolist()
@@ -0,0 +1,100 @@
+"""commit_files 가 저장 한 번을 트리 1개·커밋 1개·ref 갱신 1번으로 올리는지 가짜 저장소로 확인한다."""
+import pytest
+
+from safety_core.github_store import BlobCache, StaleBaseError, blob_sha, commit_files, load_roster_files
+from safety_core.journal import load_roster_journaled
+
+from fakes import FakeRepo
+
+DATA = "성명,직책,부서\n홍길동,관리감독자,생산팀\n"
+CONFIG = "부서명,특별교육과목1\n생산팀,해당없음\n"
+
+
+def writes(repo):
+    return [call for call in repo.calls if call.startswith("create_") or call == "ref.edit"]
+
+
+def test_save_is_one_tree_one_commit_one_ref_update():
+    repo = FakeRepo({"data.csv": DATA, "config.csv": CONFIG})
+    before = repo.head
+    changed = commit_files(repo, {"data.csv": DATA + "임꺽정,일반근로자,생산팀\n", "config.csv": CONFIG,
+                                  "data.parquet": b"\x00PAR1"}, "save")
+    assert sorted(changed) == ["data.csv", "data.parquet"]
+    assert writes(repo) == ["create_git_blob", "create_git_tree", "create_git_commit", "ref.edit"]
+    assert repo.commits[repo.head].parents == [before]
+    assert repo.files()["data.csv"].decode("utf-8").endswith("임꺽정,일반근로자,생산팀\n")
+    assert repo.files()["data.parquet"] == b"\x00PAR1"
+
+
+def test_unchanged_files_make_no_commit():
+    repo = FakeRepo({"data.csv": DATA, "config.csv": CONFIG})
+    before = repo.head
+    assert commit_files(repo, {"data.csv": DATA, "config.csv": CONFIG}) == []
+    assert commit_files(repo, {"data.csv": DATA}, deleted=["journal/missing.jsonl"]) == []
+    assert writes(repo) == []
+    assert repo.head == before
+
+
+def test_deleted_paths_go_in_the_same_commit():
+    repo = FakeRepo({"data.csv": DATA, "journal/abc/1.jsonl": "{}\n"})
+    assert commit_files(repo, {"data.csv": DATA + "\n"}, deleted=["journal/abc/1.jsonl"]) == ["data.csv", "journal/abc/1.jsonl"]
+    assert writes(repo) == ["create_git_tree", "create_git_commit", "ref.edit"]
+    assert set(repo.files()) == {"data.csv"}
+
+
+def test_stale_expect_raises_without_writing():
+    repo = FakeRepo({"data.csv": DATA, "config.csv": CONFIG})
+    base = blob_sha(DATA)
+    repo.push({"data.csv": DATA + "임꺽정,일반근로자,생산팀\n"}, "someone else")
+    head = repo.head
+    repo.calls.clear()
+    with pytest.raises(StaleBaseError):
+        commit_files(repo, {"journal/x.jsonl": "{}\n"}, expect={"data.csv": base})
+    assert writes(repo) == []
+    assert repo.head == head
+    fresh = blob_sha(repo.files()["data.csv"])
+    assert commit_files(repo, {"journal/x.jsonl": "{}\n"}, expect={"data.csv": fresh}) == ["journal/x.jsonl"]
+
+
+def test_expect_none_requires_missing_remote_file():
+    repo = FakeRepo({"data.csv": DATA, "config.csv": CONFIG})
+    with pytest.raises(StaleBaseError):
+        commit_files(repo, {"data.csv": "성명\n김철수\n"}, expect={"data.csv": None})
+    assert writes(repo) == []
+    assert repo.files()["data.csv"] == DATA.encode("utf-8")
+    fresh = FakeRepo({"README.md": "명부\n"})
+    assert commit_files(fresh, {"data.csv": DATA}, expect={"data.csv": None}) == ["data.csv"]
+    assert commit_files(FakeRepo(), {"data.csv": DATA}, expect={"data.csv": None}) == ["data.csv"]
+
+
+def test_empty_repository_is_initialised_file_by_file():
+    repo = FakeRepo()
+    assert commit_files(repo, {"data.csv": DATA, "config.csv": CONFIG}) == ["data.csv", "config.csv"]
+    assert writes(repo) == ["create_file", "create_file"]
+    with pytest.raises(StaleBaseError):
+        commit_files(FakeRepo(), {"journal/x.jsonl": "{}\n"}, expect={"data.csv": blob_sha(DATA)})
+
+
+def test_unchanged_reload_is_one_request(tmp_path):
+    repo = FakeRepo({"data.csv": DATA, "config.csv": CONFIG})
+    cache = BlobCache(str(tmp_path))
+    loaded, journal = load_roster_journaled(repo, cache)
+    assert loaded["data.csv"][1]["성명"].tolist() == ["홍길동"]
+    repo.calls.clear()
+    load_roster_journaled(repo, cache)
+    assert repo.calls == ["get_contents"]
+
+
+def test_blob_cache_prunes_unreferenced_snapshots(tmp_path):
+    repo = FakeRepo({"data.csv": DATA, "config.csv": CONFIG})
+    cache = BlobCache(str(tmp_path))
+    if cache.directory is None: pytest.skip("pyarrow 없음")
+    load_roster_files(repo, cache)
+    for n in range(3):
+        repo.push({"data.csv": DATA + f"사람{n},일반근로자,생산팀\n"})
+        load_roster_files(repo, cache)
+    assert len(list(tmp_path.iterdir())) == 5
+    assert cache.prune(keep=1) == 2
+    live = {f"{blob_sha(repo.files()[path])}.parquet" for path in ("data.csv", "config.csv")}
+    assert live <= {p.name for p in tmp_path.iterdir()}
+    assert len(list(tmp_path.iterdir())) == 3
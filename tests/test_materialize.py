@@ -0,0 +1,121 @@
+"""StatusMaterializer 가 날짜가 바뀔 때 새로 임박/초과가 된 대상자만 한 번 알리는지 가짜 SMTP 로 확인한다."""
+import time
+from datetime import date
+
+import pytest
+
+from safety_core import materialize
+from safety_core.compliance import build_main_frame
+from safety_core.github_store import config_from_csv, roster_from_csv
+from safety_core.materialize import SmtpNotifier, StatusMaterializer
+from safety_core.schema import ensure_roster_schema
+
+DATA = ("성명,직책,부서,입사일,최근_직무교육일,검진단계,최근_특수검진일\n"
+        "홍길동,관리감독자,생산팀,2020-01-01,2025-01-01,배치전(미실시),\n"
+        "장길산,안전보건관리책임자,경영지원팀,2019-01-01,2024-06-01,배치전(미실시),\n")
+CONFIG = ("정렬순서,부서명,특별교육과목1,특별교육과목2,유해인자,담당관리감독자\n"
+          "1,생산팀,해당없음,해당없음,없음,홍길동\n2,경영지원팀,해당없음,해당없음,없음,-\n")
+
+
+class FakeSMTP:
+    """smtplib.SMTP 대신 보낸 메일을 outbox 에 모은다. fail 에 예외를 넣으면 다음 전송에서 던진다."""
+    outbox, log, fail = [], [], []
+
+    def __init__(self, host, port, timeout=None):
+        self.log.append(("connect", host, port))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self):
+        self.log.append(("starttls",))
+
+    def login(self, username, password):
+        self.log.append(("login", username, password))
+
+    def send_message(self, message):
+        if self.fail: raise self.fail.pop(0)
+        self.outbox.append(message)
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    monkeypatch.setattr(materialize.smtplib, "SMTP", FakeSMTP)
+    FakeSMTP.outbox, FakeSMTP.log, FakeSMTP.fail = [], [], []
+    return FakeSMTP
+
+
+class Source:
+    """source(day) → (데이터 키, 파생 프레임). key 를 바꾸면 명부가 바뀐 것."""
+
+    def __init__(self):
+        self.roster, self.config = ensure_roster_schema(roster_from_csv(DATA)), config_from_csv(CONFIG)
+        self.key, self.builds = 1, 0
+
+    def __call__(self, day):
+        self.builds += 1
+        return self.key, build_main_frame(self.roster, self.config, day)
+
+
+def test_notifier_from_env_and_send(smtp):
+    assert SmtpNotifier.from_env({}) is None
+    notifier = SmtpNotifier.from_env({'SAFETY_SMTP_HOST': "mail.local", 'SAFETY_SMTP_PORT': "2525",
+                                      'SAFETY_SMTP_USER': "bot", 'SAFETY_SMTP_PASSWORD': "pw", 'SAFETY_SMTP_STARTTLS': "1",
+                                      'SAFETY_NOTIFY_FROM': "safety@acme", 'SAFETY_NOTIFY_TO': "a@acme, b@acme,"})
+    notifier.send("제목", "본문")
+    assert smtp.log == [("connect", "mail.local", 2525), ("starttls",), ("login", "bot", "pw")]
+    message, = smtp.outbox
+    assert (message['Subject'], message['From'], message['To']) == ("제목", "safety@acme", "a@acme, b@acme")
+    assert message.get_content().strip() == "본문"
+
+
+def test_day_change_sends_new_alerts_once(smtp):
+    source, today = Source(), [date(2025, 11, 30)]
+    job = StatusMaterializer(source, notifier=SmtpNotifier("localhost", 1025, recipients=["a@acme"]), clock=lambda: today[0])
+
+    first = job.refresh()
+    assert first.delta.empty and smtp.outbox == []
+    assert job.refresh() is first and source.builds == 2       # 같은 날·같은 데이터면 상태표를 다시 만들지 않음
+
+    today[0] = date(2025, 12, 3)                                 # 홍길동 직무교육 기한(2026-01-01)이 30일 안으로
+    second = job.refresh()
+    assert second.delta[['구분', '성명', '이전_상태', '상태']].values.tolist() == [['직무교육', '홍길동', "🟢 양호", "🟡 임박"]]
+    message, = smtp.outbox
+    assert message['Subject'] == "[안전보건] 2025-12-03 임박/초과 1건"
+    assert "홍길동" in message.get_content()
+
+    source.key = 2                                               # 같은 날 명부가 바뀌어도 이미 보낸 대상자는 다시 보내지 않음
+    assert job.refresh() is not second
+    assert len(smtp.outbox) == 1 and len(job.sent) == 1
+
+
+def test_failed_send_is_retried_on_next_refresh(smtp):
+    source, today = Source(), [date(2025, 11, 30)]
+    job = StatusMaterializer(source, notifier=SmtpNotifier("localhost"), clock=lambda: today[0])
+    job.refresh()
+    smtp.fail.append(ConnectionRefusedError("no server"))
+    today[0] = date(2025, 12, 3)
+    job.refresh()
+    assert isinstance(job.last_error, ConnectionRefusedError) and smtp.outbox == []
+    source.key = 2
+    job.refresh()
+    assert job.last_error is None and len(smtp.outbox) == 1
+
+
+def test_poke_refreshes_in_background(smtp):
+    source = Source()
+    job = StatusMaterializer(source, clock=lambda: date(2025, 11, 30), poll_seconds=60).start()
+    try:
+        deadline = time.monotonic() + 5
+        while job.current is None and time.monotonic() < deadline: time.sleep(0.01)
+        assert job.current.key == 1
+        source.key = 2
+        job.poke()
+        while job.current.key != 2 and time.monotonic() < deadline: time.sleep(0.01)
+        assert job.current.key == 2
+    finally:
+        job.stop(timeout=5)
+    assert not job._thread.is_alive()
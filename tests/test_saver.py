@@ -0,0 +1,155 @@
+"""WriteBehindSaver 를 가짜 저장소에 올려 보며 요청 모으기, 재시도, 실패 표시, 마저 올리기를 확인한다."""
+import threading
+
+import pandas as pd
+from github import GithubException
+
+from safety_core.compact import compact_roster, get_cell, set_cell
+from safety_core.github_store import (DATA_FILE, CONFIG_FILE, BlobCache, StaleBaseError, blob_sha, commit_files,
+                                      config_from_csv, config_to_csv, roster_files, roster_from_csv)
+from safety_core.journal import load_roster_journaled
+from safety_core.patch import RosterPatch
+from safety_core.saver import FAILED, IDLE, PENDING, WriteBehindSaver
+from safety_core.store import RosterStore
+
+from fakes import FakeRepo
+
+DATA = ("성명,직책,부서,입사일,최근_직무교육일,검진단계\n"
+        "홍길동,관리감독자,생산팀,2020-01-01,2025-01-01,배치전(미실시)\n"
+        "임꺽정,일반근로자,생산팀,2021-01-01,,배치전(미실시)\n"
+        "장길산,안전보건관리책임자,경영지원팀,2019-01-01,2024-06-01,배치전(미실시)\n")
+CONFIG = ("정렬순서,부서명,특별교육과목1,특별교육과목2,유해인자,담당관리감독자\n"
+          "1,생산팀,해당없음,해당없음,없음,홍길동\n2,경영지원팀,해당없음,해당없음,없음,-\n")
+FAST = dict(debounce=0.05, max_delay=1, backoff=0.01)
+
+
+def setup(seed=None, **options):
+    """가짜 저장소, 그 저장소를 불러온 RosterStore, 저널 모드 persist, 저장기.
+
+    seed 를 주면 저장소를 불러오지 않고 그 CSV 로 시작한 "local" 저장소를 쓴다.
+    """
+    repo = FakeRepo({DATA_FILE: DATA, CONFIG_FILE: CONFIG})
+    if seed is None: loaded, journal = load_roster_journaled(repo, BlobCache())
+    else: loaded, journal = {DATA_FILE: (None, roster_from_csv(seed)), CONFIG_FILE: (None, config_from_csv(CONFIG))}, None
+    config = loaded[CONFIG_FILE][1]
+    store = RosterStore(repo.full_name if seed is None else "local")
+    store.replace(compact_roster(loaded[DATA_FILE][1], config['부서명']), config, journal)
+
+    def persist(data_df, config_df, journal, compact):
+        # app.py 의 push_to_github(journal_mode=True) 와 같은 순서
+        expect = {DATA_FILE: journal.base_sha}
+        if not compact and not journal.should_compact():
+            files = {CONFIG_FILE: config_to_csv(config_df)}
+            if journal.pending:
+                path, content = journal.pending_file(by="test")
+                files[path] = content
+            changed = commit_files(repo, files, expect=expect)
+            if journal.pending: journal.saved(path)
+            return changed
+        files = roster_files(data_df, config_df)
+        changed = commit_files(repo, files, deleted=journal.files, expect=expect)
+        journal.rebase(blob_sha(files[DATA_FILE]), data_df)
+        return changed
+
+    return repo, store, persist, WriteBehindSaver(store, **{**FAST, **options})
+
+
+def edit(store, label, value):
+    version, roster, _ = store.snapshot()
+    new, patch = roster.copy(), RosterPatch()
+    patch.changes.append((label, '최근_직무교육일', get_cell(new, label, '최근_직무교육일'), pd.Timestamp(value)))
+    set_cell(new, label, '최근_직무교육일', pd.Timestamp(value))
+    return store.commit(version, new, [patch])[0]
+
+
+def remote_dates(repo):
+    loaded, _ = load_roster_journaled(repo, BlobCache())
+    return [None if pd.isna(d) else str(d.date()) for d in loaded[DATA_FILE][1]['최근_직무교육일']]
+
+
+def test_quick_requests_coalesce_into_one_commit():
+    repo, store, persist, saver = setup(debounce=0.5, max_delay=5)
+    commits = len(repo.history())
+    for label, value in enumerate(["2026-01-01", "2026-02-01", "2026-03-01"]):
+        edit(store, label, value)
+        saver.request(persist)
+    assert saver.status().state == PENDING
+    assert saver.status().unsaved == 3
+    assert saver.flush(timeout=5)
+    assert len(repo.history()) == commits + 1
+    assert repo.calls.count("create_git_commit") == 1
+    assert remote_dates(repo) == ["2026-01-01", "2026-02-01", "2026-03-01"]
+    status = saver.status()
+    assert (status.state, status.unsaved, status.saved_version) == (IDLE, 0, store.version)
+    saver.close()
+
+
+def test_server_error_backs_off_and_retries():
+    repo, store, persist, saver = setup()
+    repo.failures[:] = [GithubException(502, {"message": "Bad Gateway"}, None)] * 2
+    edit(store, 1, "2026-05-05")
+    saver.request(persist)
+    assert saver.flush(timeout=5)
+    assert repo.calls.count("ref.edit") == 3
+    assert remote_dates(repo)[1] == "2026-05-05"
+    status = saver.status()
+    assert (status.state, status.attempts, status.error) == (IDLE, 0, None)
+    saver.close()
+
+
+def test_stale_base_is_reported_in_status():
+    repo, store, persist, saver = setup()
+    repo.push({DATA_FILE: DATA + "전우치,일반근로자,생산팀,2022-01-01,,배치전(미실시)\n"}, "saved elsewhere")
+    edit(store, 0, "2026-07-07")
+    saver.request(persist)
+    assert not saver.flush(timeout=5)
+    status = saver.status()
+    assert status.state == FAILED
+    assert isinstance(status.error, StaleBaseError)
+    assert (status.attempts, status.unsaved) == (0, 1)
+    assert "ref.edit" not in repo.calls
+    saver.close()
+
+
+def test_close_drains_pending_save():
+    repo, store, persist, saver = setup(debounce=60, max_delay=60)
+    edit(store, 2, "2026-09-09")
+    saver.request(persist)
+    assert saver.status().due > 30
+    thread = saver._thread
+    saver.close(timeout=5)
+    assert not thread.is_alive()
+    assert remote_dates(repo)[2] == "2026-09-09"
+    assert not store.dirty
+
+
+def test_request_during_upload_goes_in_next_commit():
+    repo, store, persist, saver = setup()
+    started, release = threading.Event(), threading.Event()
+
+    def slow(*args):
+        started.set()
+        release.wait(5)
+        return persist(*args)
+
+    edit(store, 0, "2026-01-11")
+    saver.request(slow)
+    assert started.wait(5)
+    edit(store, 1, "2026-01-12")
+    saver.request(persist)
+    release.set()
+    assert saver.flush(timeout=5)
+    assert repo.calls.count("create_git_commit") == 2
+    assert remote_dates(repo)[:2] == ["2026-01-11", "2026-01-12"]
+    saver.close()
+
+
+def test_unloaded_store_does_not_overwrite_remote_roster():
+    repo, store, persist, saver = setup(seed=DATA.split("임꺽정")[0])
+    edit(store, 0, "2026-08-08")
+    saver.request(persist, compact=True)
+    assert not saver.flush(timeout=5)
+    assert isinstance(saver.status().error, StaleBaseError)
+    assert repo.files()[DATA_FILE] == DATA.encode("utf-8")
+    assert "ref.edit" not in repo.calls
+    saver.close()
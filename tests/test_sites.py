@@ -0,0 +1,58 @@
+"""다중 사업장: 로컬 폴더는 root 아래만 읽고, 사업장 결과는 SiteShards 하나로 공유되는지 확인한다."""
+import os
+import shutil
+from datetime import date
+
+import pytest
+
+from safety_core.sites import SiteShards, parse_sources
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TODAY = date(2026, 10, 18)
+
+
+@pytest.fixture
+def sites(tmp_path):
+    """root/hq 에는 사업장 명부, root 밖 secret 에는 읽히면 안 되는 명부."""
+    root, secret = tmp_path / "sites", tmp_path / "secret"
+    for folder in (root / "hq", secret):
+        folder.mkdir(parents=True)
+        for name in ("data.csv", "config.csv"): shutil.copy(os.path.join(ROOT, name), folder / name)
+    return root, secret
+
+
+def test_local_sources_are_limited_to_root(sites):
+    root, secret = sites
+    os.symlink(secret, root / "link")
+    text = f"본사=hq\n절대={secret}\n상위=../secret\n링크=link\n없음=nowhere"
+    sources = parse_sources(text, str(root))
+    shards = SiteShards()
+    opened = []
+    assert shards.refresh(sources, TODAY, open_repo=opened.append) == ["본사"]
+    assert [shard.name for shard in shards.shards(sources)] == ["본사"]
+    assert set(shards.errors(sources)) == {"절대", "상위", "링크", "없음"}
+    assert opened == []             # 폴더 경로를 GitHub 저장소로 열려고 하지도 않음
+
+
+def test_without_root_no_local_folder_is_read(sites):
+    root, _ = sites
+    sources = parse_sources(f"본사={root / 'hq'}")
+    shards = SiteShards()
+    assert shards.refresh(sources, TODAY) == []
+    assert set(shards.errors(sources)) == {"본사"}
+
+
+def test_shards_are_shared_between_source_lists(sites):
+    root, _ = sites
+    shards = SiteShards(max_sites=2)
+    first = parse_sources("본사=hq", str(root))
+    second = parse_sources("본사=hq\n없음=nowhere", str(root))
+    assert shards.refresh(first, TODAY) == ["본사"]
+    assert shards.refresh(second, TODAY) == []          # 다른 세션의 목록이어도 같은 사업장은 다시 계산하지 않음
+    assert shards.errors(first) == {} and set(shards.errors(second)) == {"없음"}
+    counts, tabs = shards.merged(first)
+    assert counts == shards.merged(second)[0]
+    data = root / "hq" / "data.csv"
+    data.write_bytes(b"".join(data.read_bytes().splitlines(keepends=True)[:-1]))
+    assert shards.refresh(first, TODAY) == ["본사"]     # 폴더 내용이 바뀌면 다시 계산
+    assert shards.shards(first)[0].rows == 151
@@ -0,0 +1,105 @@
+"""LocalGitHistory 와 compliance_trend 를 임시 bare 저장소의 커밋 이력으로 확인한다."""
+import os
+import subprocess
+from datetime import datetime
+
+import pytest
+
+from safety_core.trends import LocalGitHistory, TrendCache, compliance_trend, trend_rates
+
+CONFIG = ("정렬순서,부서명,특별교육과목1,특별교육과목2,유해인자,담당관리감독자\n"
+          "1,생산팀,해당없음,해당없음,없음,홍길동\n2,경영지원팀,해당없음,해당없음,없음,-\n")
+COLUMNS = ["성명", "직책", "부서", "입사일", "최근_직무교육일", "신규교육_이수", "특별_공통_8H", "검진단계", "최근_특수검진일",
+           "특수검진_대상", "퇴사여부", "특별_1_이론_4H", "특별_1_실습_4H", "특별_2_이론_4H", "특별_2_실습_4H", "공통8H",
+           "과목1_온라인4H", "과목1_감독자4H", "과목2_온라인4H", "과목2_감독자4H"]
+
+
+def row(name, role, dept, trained):
+    values = dict.fromkeys(COLUMNS, "False")
+    values.update(성명=name, 직책=role, 부서=dept, 입사일="2020-01-01", 최근_직무교육일=trained, 검진단계="배치전(미실시)", 최근_특수검진일="")
+    return ",".join(values[col] for col in COLUMNS) + "\n"
+
+
+def roster(trained):
+    """홍길동(관리감독자, 1년 주기)의 최근 직무교육일만 바뀌는 두 명짜리 명부."""
+    return ",".join(COLUMNS) + "\n" + row("홍길동", "관리감독자", "생산팀", trained) + row("장길산", "안전보건관리책임자", "경영지원팀", "2024-06-01")
+
+
+# (커밋 시각, {경로: 내용}) — 세 번째 커밋은 명부와 무관한 파일만 바꾼다
+COMMITS = [
+    ("2025-06-01T09:00:00", {"data.csv": roster("2025-01-01"), "config.csv": CONFIG}),
+    ("2026-02-01T09:00:00", {"data.csv": roster("2025-01-01") + "\n"}),
+    ("2026-02-01T10:00:00", {"README.md": "명부\n"}),
+    ("2026-03-01T09:00:00", {"data.csv": roster("2026-02-15")}),
+]
+
+
+def git(cwd, *args, when=None):
+    env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t", GIT_COMMITTER_NAME="t", GIT_COMMITTER_EMAIL="t@t")
+    if when: env.update(GIT_AUTHOR_DATE=when, GIT_COMMITTER_DATE=when)
+    return subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True).stdout.decode("utf-8")
+
+
+@pytest.fixture
+def bare(tmp_path):
+    work = tmp_path / "work"
+    work.mkdir()
+    git(work, "init", "-q", "-b", "main")
+    for when, files in COMMITS:
+        for path, content in files.items(): (work / path).write_text(content, encoding="utf-8")
+        git(work, "add", "-A")
+        git(work, "commit", "-q", "-m", f"save {when}", when=when)
+    git(tmp_path, "clone", "-q", "--bare", str(work), "site.git")
+    return str(tmp_path / "site.git")
+
+
+class Counting:
+    """history 의 files/blob 호출 수를 센다."""
+
+    def __init__(self, history):
+        self.history, self.listed, self.fetched = history, 0, 0
+
+    def commits(self, known=()):
+        return self.history.commits(known)
+
+    def files(self, sha):
+        self.listed += 1
+        return self.history.files(sha)
+
+    def blob(self, sha):
+        self.fetched += 1
+        return self.history.blob(sha)
+
+
+def test_local_history_reads_bare_repository(bare):
+    history = LocalGitHistory(bare)
+    commits = history.commits()
+    assert [when.replace(tzinfo=None) for _, when in commits] == [datetime.fromisoformat(when) for when, _ in COMMITS]
+    first, last = commits[0][0], commits[-1][0]
+    assert history.commits(known={sha for sha, _ in commits[:-1]}) == commits[-1:]
+    assert set(history.files(first)) == {"data.csv", "config.csv"}
+    assert set(history.files(last)) == {"data.csv", "config.csv", "README.md"}
+    assert history.blob(history.files(last)["data.csv"]).decode("utf-8") == roster("2026-02-15")
+
+
+def test_trend_counts_each_state_once(bare, tmp_path):
+    history = Counting(LocalGitHistory(bare))
+    trend = compliance_trend(history, TrendCache(str(tmp_path / "cache")))
+    overdue = trend[trend['지표'] == '직무교육 초과'].groupby('시점')[['대상', '해당']].sum()
+    assert overdue.values.tolist() == [[2, 0], [2, 1], [2, 1], [2, 0]]
+    assert history.listed == len(COMMITS)
+    assert history.fetched == 4          # data.csv 3개 + config.csv 1개, README 만 바뀐 커밋은 다시 계산하지 않음
+
+    rates = trend_rates(trend, '직무교육 초과', ['생산팀'])
+    assert rates['전체'].tolist() == [0.0, 50.0, 50.0, 0.0]
+    assert rates['생산팀'].tolist() == [0.0, 100.0, 100.0, 0.0]
+
+
+def test_trend_cache_survives_restart(bare, tmp_path):
+    directory = str(tmp_path / "cache")
+    first = compliance_trend(LocalGitHistory(bare), TrendCache(directory))
+    history = Counting(LocalGitHistory(bare))
+    again = compliance_trend(history, TrendCache(directory))
+    assert (history.listed, history.fetched) == (0, 0)
+    assert again.equals(first)
+